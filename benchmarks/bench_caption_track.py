@@ -0,0 +1,77 @@
+"""
+Memory per segment and format time: list-of-dicts segments versus CaptionTrack.
+
+    python benchmarks/bench_caption_track.py --segments 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.caption_track import CaptionTrackBuilder
+from extractors.captions_parser import CaptionFormat, one_line_text, parse_captions_payload
+from extractors.xml_formatter import captions_to_xml
+from outputs.writers.json_writer import json_default
+
+def _raw(n):
+    # Shape of youtube-transcript-api output
+    return [{"start": i * 2.37, "duration": 2.5, "text": f"segment number {i} with some words"} for i in range(n)]
+
+def build_dicts(raw):
+    return [
+        {"start": round(r["start"], 2), "end": round(r["start"] + r["duration"], 2), "text": r["text"]}
+        for r in raw
+    ]
+
+def build_track(raw):
+    b = CaptionTrackBuilder()
+    for r in raw:
+        b.append(round(r["start"], 2), round(r["start"] + r["duration"], 2), r["text"])
+    return b.build()
+
+def _memory(fn, raw):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = fn(raw)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    return obj, size
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--segments", type=int, default=10000)
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+    raw = _raw(args.segments)
+
+    dicts, dict_bytes = _memory(build_dicts, raw)
+    track, track_bytes = _memory(build_track, raw)
+    n = args.segments
+    print(f"memory/segment: dicts={dict_bytes / n:7.1f} B  track={track_bytes / n:7.1f} B")
+
+    cases = {
+        "array": lambda s: parse_captions_payload(s, CaptionFormat.ARRAY),
+        "array_with_timestamps(json)": lambda s: json.dumps(s, default=json_default),
+        "xml_with_timestamps": lambda s: captions_to_xml(s, with_timestamps=True),
+        "one_line_text": one_line_text,
+    }
+    for name, fn in cases.items():
+        td = _time(lambda: fn(dicts), args.repeat)
+        tt = _time(lambda: fn(track), args.repeat)
+        print(f"{name:<30} dicts={td * 1000:8.2f}ms  track={tt * 1000:8.2f}ms")
+
+if __name__ == "__main__":
+    main()
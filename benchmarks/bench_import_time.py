@@ -0,0 +1,63 @@
+"""
+Startup cost of the CLI: wall time of `python src/runner.py --help` in a fresh
+interpreter, plus the slowest modules from `python -X importtime`.
+
+    python benchmarks/bench_import_time.py --rounds 10
+    python benchmarks/bench_import_time.py --max-ms 300   # exit 1 above budget
+
+yt-dlp and youtube-transcript-api are loaded on first use, so they should not
+appear in the import profile of `--help` (tests/test_import_time.py checks
+that too).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+RUNNER = os.path.join(ROOT, "src", "runner.py")
+
+def _time_help(rounds):
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, RUNNER, "--help"], check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+def _import_profile(top):
+    # -X importtime writes "import time: self [us] | cumulative | package" lines to stderr
+    code = f"import sys; sys.path.insert(0, {os.path.join(ROOT, 'src')!r}); import runner"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], check=True, capture_output=True, text=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), parts[2].rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--rounds", type=int, default=10)
+    p.add_argument("--top", type=int, default=15)
+    p.add_argument("--max-ms", type=float, default=None, help="Fail when the median exceeds this budget.")
+    args = p.parse_args()
+
+    samples = _time_help(args.rounds)
+    median = statistics.median(samples) * 1000
+    print(f"runner --help  n={len(samples):<3} median={median:8.1f}ms min={min(samples) * 1000:8.1f}ms")
+    print("\nslowest imports (cumulative):")
+    for cumulative_us, name in _import_profile(args.top):
+        print(f"  {cumulative_us / 1000:8.1f}ms {name}")
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"\nmedian {median:.1f}ms exceeds budget of {args.max_ms:.1f}ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+End-to-end pipeline throughput on replayed fixtures: items/sec, peak RSS and
+per-stage cost of a full runner.py job, with no network involved.
+
+    python benchmarks/bench_pipeline.py --videos 1000 10000 --segments 10000
+    python benchmarks/bench_pipeline.py --videos 100000 --latency 0.05 --concurrency 32
+    python benchmarks/bench_pipeline.py --fixtures recorded/ --videos 5000 -- --languages all
+
+Fixtures are synthetic (--templates videos of --segments segments each)
+unless --fixtures points at a directory written by `runner.py --record`.
+Either way every video of the job is served from one of them, so job size is
+independent of what was recorded. Arguments after `--` go to runner.py.
+
+Each run appends a line to --results (NDJSON) and is compared with the last
+earlier run there that had the same settings, so a change can be measured by
+running the benchmark before and after it.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.transport import write_synthetic_fixtures
+
+RUNNER = os.path.join(os.path.dirname(__file__), "..", "src", "runner.py")
+
+def _git_rev():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _write_inputs(path, videos):
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(videos):
+            f.write(f"https://www.youtube.com/watch?v=bench{n:07d}\n")
+
+def _run(args, fixtures, inputs, outdir):
+    """
+    One runner.py job; returns (metrics summary, peak RSS in MB, wall seconds).
+    """
+    cmd = [
+        sys.executable,
+        RUNNER,
+        inputs,
+        "--replay", fixtures,
+        "--replay-latency", str(args.latency),
+        "--replay-error-rate", str(args.error_rate),
+        "--replay-throttle-rate", str(args.throttle_rate),
+        "--concurrency", str(args.concurrency),
+        "--export", args.export,
+        "--out", outdir,
+    ] + args.runner_args
+    with open(os.path.join(outdir, "runner.log"), "w", encoding="utf-8") as log:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 gives this child's own rusage (RUSAGE_CHILDREN would be the max over all runs)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - t0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise SystemExit(f"runner.py exited with {proc.returncode}; see {os.path.join(outdir, 'runner.log')}")
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    metrics_path = next(
+        os.path.join(outdir, n) for n in os.listdir(outdir) if n.endswith("_metrics.json")
+    )
+    with open(metrics_path, "r", encoding="utf-8") as f:
+        return json.load(f), rss_mb, wall
+
+def _settings(args, videos):
+    return {
+        "videos": videos,
+        "segments": None if args.fixtures else args.segments,
+        "templates": None if args.fixtures else args.templates,
+        "fixtures": os.path.abspath(args.fixtures) if args.fixtures else None,
+        "latency": args.latency,
+        "errorRate": args.error_rate,
+        "throttleRate": args.throttle_rate,
+        "concurrency": args.concurrency,
+        "export": args.export,
+        "runnerArgs": args.runner_args,
+    }
+
+def _previous(results, settings):
+    if not results or not os.path.exists(results):
+        return None
+    last = None
+    with open(results, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                if entry.get("settings") == settings:
+                    last = entry
+    return last
+
+def _delta(now, before):
+    if now is None or not before:
+        return ""
+    return f" ({(now - before) / before * 100:+.1f}%)"
+
+def _report(entry, previous):
+    before = previous or {}
+    print(
+        f"videos={entry['settings']['videos']} items={entry['items']} wall={entry['wallSeconds']:.1f}s "
+        f"items/s={entry['itemsPerSecond']:.1f}{_delta(entry['itemsPerSecond'], before.get('itemsPerSecond'))} "
+        f"peakRSS={entry['peakRssMb']:.0f}MB{_delta(entry['peakRssMb'], before.get('peakRssMb'))}"
+    )
+    if previous:
+        print(f"  compared with {previous.get('label') or previous.get('gitRev')} at {previous['startedAt']}")
+    total = sum(s["totalSeconds"] for s in entry["stages"].values()) or 1.0
+    print(f"  {'stage':<18}{'count':>9}{'mean ms':>11}{'p95 ms':>10}{'total s':>10}{'share':>8}")
+    for name, s in sorted(entry["stages"].items(), key=lambda kv: -kv[1]["totalSeconds"]):
+        mean = s["meanSeconds"] * 1000 if s["meanSeconds"] is not None else 0.0
+        p95 = s["p95Seconds"] * 1000 if s["p95Seconds"] is not None else 0.0
+        old = before.get("stages", {}).get(name, {}).get("meanSeconds")
+        print(
+            f"  {name:<18}{s['count']:>9}{mean:>11.3f}{p95:>10.2f}{s['totalSeconds']:>10.2f}"
+            f"{s['totalSeconds'] / total * 100:>7.1f}%{_delta(s['meanSeconds'], old)}"
+        )
+
+def main():
+    argv = sys.argv[1:]
+    runner_args = []
+    if "--" in argv:
+        i = argv.index("--")
+        argv, runner_args = argv[:i], argv[i + 1:]
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--videos", type=int, nargs="+", default=[1000], help="Job sizes to run, one job each.")
+    p.add_argument("--segments", type=int, default=10000, help="Segments per synthetic transcript.")
+    p.add_argument("--templates", type=int, default=8, help="Distinct synthetic videos the job cycles through.")
+    p.add_argument("--fixtures", default=None, help="Replay a `runner.py --record` directory instead.")
+    p.add_argument("--latency", type=float, default=0.0, help="Synthetic seconds per upstream request.")
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--throttle-rate", type=float, default=0.0)
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--export", default="ndjson", choices=["json", "csv", "ndjson", "parquet", "arrow", "all"])
+    p.add_argument("--results", default="bench_pipeline_results.ndjson", help="NDJSON history of runs.")
+    p.add_argument("--label", default=None, help="Name for this run in the history (default: git revision).")
+    p.add_argument("--keep", action="store_true", help="Keep the work directory (outputs and logs).")
+    args = p.parse_args(argv)
+    args.runner_args = runner_args
+
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        fixtures = args.fixtures
+        if fixtures is None:
+            fixtures = os.path.join(workdir, "fixtures")
+            t0 = time.perf_counter()
+            write_synthetic_fixtures(fixtures, videos=args.templates, segments=args.segments)
+            print(f"fixtures: {args.templates} x {args.segments} segments in {time.perf_counter() - t0:.1f}s")
+        for videos in args.videos:
+            inputs = os.path.join(workdir, f"inputs_{videos}.txt")
+            _write_inputs(inputs, videos)
+            outdir = os.path.join(workdir, f"out_{videos}")
+            os.makedirs(outdir)
+            summary, rss_mb, wall = _run(args, fixtures, inputs, outdir)
+            settings = _settings(args, videos)
+            entry = {
+                "label": args.label,
+                "gitRev": _git_rev(),
+                "startedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "settings": settings,
+                "items": summary["items"],
+                "wallSeconds": round(wall, 3),
+                "itemsPerSecond": summary["itemsPerSecond"],
+                "peakRssMb": round(rss_mb, 1),
+                "stages": summary["stages"],
+            }
+            _report(entry, _previous(args.results, settings))
+            if args.results:
+                with open(args.results, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            if not args.keep:
+                # Outputs of a large job are big; only the numbers are kept
+                shutil.rmtree(outdir)
+    finally:
+        if args.keep:
+            print(f"work directory: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Per-video metadata latency with a fresh yt_dlp.YoutubeDL per call versus one
+reused instance (what YouTubeClient does per worker thread).
+
+    python benchmarks/bench_ydl_reuse.py dQw4w9WgXcQ 9bZkp7q19f0 --rounds 3
+    python benchmarks/bench_ydl_reuse.py --setup-only --rounds 200
+
+--setup-only skips the network and measures just constructing and tearing
+down the instance, i.e. the fixed cost reuse removes.
+"""
+import argparse
+import statistics
+import time
+
+import yt_dlp
+
+OPTS = {"quiet": True, "no_warnings": True, "skip_download": True, "extract_flat": True}
+
+def _fresh(url):
+    with yt_dlp.YoutubeDL(OPTS) as ydl:
+        if url:
+            ydl.extract_info(url, download=False)
+
+def _reused_factory():
+    ydl = yt_dlp.YoutubeDL(OPTS)
+
+    def run(url):
+        if url:
+            ydl.extract_info(url, download=False)
+
+    return run, ydl
+
+def _measure(fn, urls, rounds):
+    samples = []
+    for _ in range(rounds):
+        for url in urls:
+            t0 = time.perf_counter()
+            fn(url)
+            samples.append(time.perf_counter() - t0)
+    return samples
+
+def _report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<8} n={len(samples):<5} mean={statistics.mean(samples) * 1000:8.2f}ms "
+          f"median={statistics.median(samples) * 1000:8.2f}ms p95={p95 * 1000:8.2f}ms")
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("video_ids", nargs="*")
+    p.add_argument("--rounds", type=int, default=3)
+    p.add_argument("--setup-only", action="store_true")
+    args = p.parse_args()
+    if args.setup_only:
+        urls = [None]
+    elif args.video_ids:
+        urls = [f"https://www.youtube.com/watch?v={v}" for v in args.video_ids]
+    else:
+        p.error("pass video ids or --setup-only")
+
+    # Warm up imports/extractor registry so neither side pays it
+    _fresh(None)
+    reused, ydl = _reused_factory()
+    try:
+        _report("fresh", _measure(_fresh, urls, args.rounds))
+        _report("reused", _measure(reused, urls, args.rounds))
+    finally:
+        ydl.close()
+
+if __name__ == "__main__":
+    main()
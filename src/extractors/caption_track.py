@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union, overload
+
+class Segment(NamedTuple):
+    start: float
+    end: float
+    text: str
+
+class CaptionTrack:
+    """
+    Columnar caption segments: `array('d')` start/end columns plus one text
+    buffer sliced by offsets. A 10k-segment track is a handful of objects
+    instead of 10k dicts; iteration yields lightweight `Segment` tuples.
+    """
+
+    __slots__ = ("starts", "ends", "_text", "_offsets")
+
+    def __init__(
+        self,
+        starts: Optional[array] = None,
+        ends: Optional[array] = None,
+        text: str = "",
+        offsets: Optional[array] = None,
+    ) -> None:
+        self.starts = starts if starts is not None else array("d")
+        self.ends = ends if ends is not None else array("d")
+        self._text = text
+        # offsets[i]:offsets[i + 1] is segment i's text; always len(self) + 1 entries
+        self._offsets = offsets if offsets is not None else array("q", [0])
+        if not (len(self.starts) == len(self.ends) == len(self._offsets) - 1):
+            raise ValueError("CaptionTrack columns have mismatched lengths")
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Any]) -> "CaptionTrack":
+        """
+        Build from `{"start", "end", "text"}` dicts (the legacy layout) or
+        `Segment` tuples.
+        """
+        if isinstance(segments, CaptionTrack):
+            return segments
+        builder = CaptionTrackBuilder()
+        for s in segments:
+            if isinstance(s, tuple):
+                builder.append(s[0], s[1], s[2])
+            else:
+                builder.append(s.get("start", 0.0), s.get("end", 0.0), s.get("text", ""))
+        return builder.build()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CaptionTrack":
+        return cls(array("d", data["starts"]), array("d", data["ends"]), data["text"], array("q", data["offsets"]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Compact JSON-friendly form (used by the on-disk cache).
+        """
+        return {
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "text": self._text,
+            "offsets": self._offsets.tolist(),
+        }
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text_at(self, i: int) -> str:
+        return self._text[self._offsets[i] : self._offsets[i + 1]]
+
+    def texts(self) -> Iterator[str]:
+        text, offs = self._text, self._offsets
+        for i in range(len(self.starts)):
+            yield text[offs[i] : offs[i + 1]]
+
+    def __iter__(self) -> Iterator[Segment]:
+        return map(Segment, self.starts, self.ends, self.texts())
+
+    @overload
+    def __getitem__(self, key: int) -> Segment: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> "CaptionTrack": ...
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Segment, "CaptionTrack"]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return CaptionTrack.from_segments(self[i] for i in range(start, stop, step))
+            stop = max(start, stop)
+            base = self._offsets[start]
+            offsets = array("q", (o - base for o in self._offsets[start : stop + 1]))
+            return CaptionTrack(
+                self.starts[start:stop],
+                self.ends[start:stop],
+                self._text[base : self._offsets[stop]],
+                offsets,
+            )
+        n = len(self)
+        if key < 0:
+            key += n
+        if not 0 <= key < n:
+            raise IndexError("CaptionTrack index out of range")
+        return Segment(self.starts[key], self.ends[key], self.text_at(key))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CaptionTrack):
+            return NotImplemented
+        return (
+            self.starts == other.starts
+            and self.ends == other.ends
+            and list(self.texts()) == list(other.texts())
+        )
+
+    def __repr__(self) -> str:
+        return f"CaptionTrack({len(self)} segments)"
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        The `array_with_timestamps` payload: [{"start", "end", "text"}, ...].
+        """
+        return [{"start": s, "end": e, "text": t} for s, e, t in zip(self.starts, self.ends, self.texts())]
+
+    def json_columns(self) -> Tuple[Tuple[str, ...], Tuple[Iterable[Any], ...]]:
+        """
+        Field names and columns of the `array_with_timestamps` payload; the
+        streaming writers encode it from these (see
+        outputs.writers.json_writer.iter_json_chunks).
+        """
+        return ("start", "end", "text"), (self.starts, self.ends, self.texts())
+
+    # For plain json.dump(default=json_default) callers
+    to_json_value = to_records
+
+class CaptionTrackBuilder:
+    """
+    Accumulates segments and produces a CaptionTrack with a single join.
+    """
+
+    __slots__ = ("_starts", "_ends", "_parts", "_offsets", "_pos")
+
+    def __init__(self) -> None:
+        self._starts = array("d")
+        self._ends = array("d")
+        self._parts: List[str] = []
+        self._offsets = array("q", [0])
+        self._pos = 0
+
+    def append(self, start: float, end: float, text: str) -> None:
+        text = str(text)
+        self._starts.append(float(start))
+        self._ends.append(float(end))
+        self._parts.append(text)
+        self._pos += len(text)
+        self._offsets.append(self._pos)
+
+    def build(self) -> CaptionTrack:
+        return CaptionTrack(self._starts, self._ends, "".join(self._parts), self._offsets)
+
+def as_track(segments: Any) -> CaptionTrack:
+    """
+    Accept either a CaptionTrack or the legacy list-of-dicts layout.
+    """
+    if isinstance(segments, CaptionTrack):
+        return segments
+    return CaptionTrack.from_segments(segments or [])
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .caption_track import CaptionTrack, as_track
+from .xml_formatter import CaptionXML
 
 class CaptionFormat:
     ARRAY = "array"
@@ -9,20 +13,19 @@ class CaptionFormat:
     XML_TS = "xml_with_timestamps"
     ONE_LINE = "one_line_text"
 
-def parse_captions_payload(segments: List[Dict[str, Any]], fmt: str):
+    ALL = (ARRAY, ARRAY_TS, XML, XML_TS, ONE_LINE)
+
+def parse_captions_payload(segments: Any, fmt: str):
     """
-    Convert normalized caption segments into the requested payload.
+    Convert normalized caption segments (a CaptionTrack or list of dicts) into
+    the requested payload.
     - array: ["text", ...]
     - array_with_timestamps: [{"start": float, "end": float, "text": str}, ...]
     """
     if fmt == CaptionFormat.ARRAY:
-        return [s.get("text", "") for s in segments]
+        return list(as_track(segments).texts())
     elif fmt == CaptionFormat.ARRAY_TS:
-        # Ensure only the needed keys and correct types
-        out = []
-        for s in segments:
-            out.append({"start": float(s["start"]), "end": float(s["end"]), "text": str(s["text"])})
-        return out
+        return as_track(segments).to_records()
     elif fmt in (CaptionFormat.XML, CaptionFormat.XML_TS, CaptionFormat.ONE_LINE):
         # Those are assembled elsewhere (xml_formatter / one_line_text)
         # Here we just return the raw to allow downstream formatters to handle
@@ -30,13 +33,69 @@ def parse_captions_payload(segments: List[Dict[str, Any]], fmt: str):
     else:
         raise ValueError(f"Unsupported caption format: {fmt}")
 
-def one_line_text(segments: List[Dict[str, Any]]) -> str:
+def one_line_text(segments: Any) -> str:
     """
     Joins all texts into a single line with spaces, removing internal newlines.
     """
     tokens = []
-    for s in segments:
-        t = (s.get("text") or "").replace("\n", " ").strip()
+    for text in as_track(segments).texts():
+        t = text.replace("\n", " ").strip()
         if t:
             tokens.append(t)
-    return " ".join(tokens)
\ No newline at end of file
+    return " ".join(tokens)
+
+
+def render_captions(segments: Any, fmt: str) -> Any:
+    """
+    Final payload for one format. For array_with_timestamps the CaptionTrack
+    itself is returned; the streaming writers encode it from its columns,
+    without per-segment dicts. XML formats return a CaptionXML, which the
+    streaming writers render element by element into the output.
+    """
+    track = as_track(segments)
+    if fmt in (CaptionFormat.XML, CaptionFormat.XML_TS):
+        return CaptionXML(track, with_timestamps=(fmt == CaptionFormat.XML_TS))
+    if fmt == CaptionFormat.ONE_LINE:
+        return one_line_text(track)
+    if fmt == CaptionFormat.ARRAY_TS:
+        return track
+    return parse_captions_payload(track, fmt)
+
+def render_formats(segments: Any, formats: List[str]) -> Dict[str, Any]:
+    """
+    Render every requested format from the same normalized segments.
+    """
+    track = as_track(segments)
+    return {fmt: render_captions(track, fmt) for fmt in formats}
+
+def _timed_track(payload: Any) -> Optional[CaptionTrack]:
+    if isinstance(payload, dict) and CaptionFormat.ARRAY_TS in payload:
+        payload = payload[CaptionFormat.ARRAY_TS]
+    if isinstance(payload, list) and payload and all(isinstance(s, dict) and "start" in s for s in payload):
+        return CaptionTrack.from_segments(payload)
+    return None
+
+def tracks_from_item(item: Dict[str, Any]) -> Iterator[Tuple[Optional[str], CaptionTrack]]:
+    """
+    Recover (language, track) pairs from an exported item. Only captions
+    exported with timestamps (array_with_timestamps, alone or among several
+    formats) can be recovered; CSV cells are JSON-decoded first.
+    """
+    captions = item.get("captions")
+    language = item.get("language")
+    if isinstance(captions, str):
+        try:
+            captions = json.loads(captions)
+            if isinstance(language, str) and language.startswith("["):
+                language = json.loads(language)
+        except ValueError:
+            return
+    if isinstance(language, list) and isinstance(captions, dict):
+        for code in language:
+            track = _timed_track(captions.get(code))
+            if track is not None:
+                yield code, track
+        return
+    track = _timed_track(captions)
+    if track is not None:
+        yield language or None, track
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import Iterable, Iterator, List, Optional
+
+from .caption_track import CaptionTrack, CaptionTrackBuilder, Segment
+
+# `merge` values for PostProcessor: which tracks get overlap removal
+MERGE_OFF = "off"
+MERGE_AUTO = "auto"
+MERGE_ALL = "all"
+MERGE_MODES = (MERGE_OFF, MERGE_AUTO, MERGE_ALL)
+
+# Longest repeated run (in words) looked for between neighbouring segments;
+# rolling auto-captions repeat at most a line, and the bound keeps the pass linear
+MAX_OVERLAP_WORDS = 24
+# A single shared word ("... said no" / "no way ...") is speech, not overlap
+MIN_OVERLAP_WORDS = 2
+
+def _overlap(previous: List[str], current: List[str]) -> int:
+    """
+    Length of the longest suffix of `previous` that is a prefix of `current`
+    (0 when shorter than MIN_OVERLAP_WORDS).
+    """
+    if not current:
+        return 0
+    first = current[0]
+    for k in range(min(len(previous), len(current), MAX_OVERLAP_WORDS), MIN_OVERLAP_WORDS - 1, -1):
+        # Cheap first-word test before comparing slices
+        if previous[-k] == first and previous[-k:] == current[:k]:
+            return k
+    return 0
+
+def merge_overlaps(segments: Iterable[Segment]) -> Iterator[Segment]:
+    """
+    Remove the rolling overlap of auto-generated captions in one pass: words a
+    segment repeats from the end of the previous ones are dropped, a segment
+    with nothing new (or a repeat of the previous segment) only extends the
+    previous one's end, and a segment still showing when the next one starts
+    is cut at that start, so the output neither repeats text nor overlaps in
+    time. Whitespace inside merged texts is collapsed.
+    """
+    pending: Optional[Segment] = None
+    tail: List[str] = []
+    last: List[str] = []
+    for start, end, text in segments:
+        words = text.split()
+        if pending is None:
+            if words:
+                pending, tail = Segment(start, end, " ".join(words)), words[-MAX_OVERLAP_WORDS:]
+                last = words
+            continue
+        repeat, last = words == last, words
+        fresh = [] if repeat else words[_overlap(tail, words):]
+        if not fresh:
+            if end > pending.end:
+                pending = pending._replace(end=end)
+            continue
+        if pending.start < start < pending.end:
+            pending = pending._replace(end=start)
+        yield pending
+        pending = Segment(max(start, pending.end), max(end, pending.end), " ".join(fresh))
+        tail = (tail + fresh)[-MAX_OVERLAP_WORDS:]
+    if pending is not None:
+        yield pending
+
+def rechunk(
+    segments: Iterable[Segment], *, max_seconds: Optional[float] = None, max_chars: Optional[int] = None
+) -> Iterator[Segment]:
+    """
+    Group consecutive segments into windows of at most `max_seconds` (first
+    start to last end) and `max_chars` (texts joined by spaces); each window
+    keeps the start of its first segment and the latest end. A segment that
+    alone exceeds a limit becomes a window of its own.
+    """
+    start = end = 0.0
+    parts: List[str] = []
+    chars = 0
+    for s, e, text in segments:
+        text = text.strip()
+        if not text:
+            continue
+        if parts and (
+            (max_seconds is not None and max(e, end) - start > max_seconds)
+            or (max_chars is not None and chars + 1 + len(text) > max_chars)
+        ):
+            yield Segment(start, end, " ".join(parts))
+            parts = []
+        if not parts:
+            start, end, chars = s, e, len(text)
+        else:
+            end, chars = max(end, e), chars + 1 + len(text)
+        parts.append(text)
+    if parts:
+        yield Segment(start, end, " ".join(parts))
+
+class PostProcessor:
+    """
+    Caption clean-up between fetching a track and rendering it: overlap
+    removal (`merge`: off, or for auto-generated tracks only, or for all) and
+    then re-chunking into windows of `max_seconds` / `max_chars`. Both steps
+    stream segment by segment into a single CaptionTrackBuilder.
+    """
+
+    def __init__(
+        self, *, merge: str = MERGE_AUTO, max_seconds: Optional[float] = None, max_chars: Optional[int] = None
+    ) -> None:
+        if merge not in MERGE_MODES:
+            raise ValueError(f"merge must be one of {', '.join(MERGE_MODES)}")
+        self.merge = merge
+        self.max_seconds = max_seconds
+        self.max_chars = max_chars
+
+    @property
+    def enabled(self) -> bool:
+        return self.merge != MERGE_OFF or self.max_seconds is not None or self.max_chars is not None
+
+    def __call__(self, track: CaptionTrack, auto: bool) -> CaptionTrack:
+        if not self.enabled:
+            return track
+        segments: Iterable[Segment] = track
+        if self.merge == MERGE_ALL or (self.merge == MERGE_AUTO and auto):
+            segments = merge_overlaps(segments)
+        if self.max_seconds is not None or self.max_chars is not None:
+            segments = rechunk(segments, max_seconds=self.max_seconds, max_chars=self.max_chars)
+        if segments is track:
+            return track
+        builder = CaptionTrackBuilder()
+        for start, end, text in segments:
+            builder.append(start, end, text)
+        return builder.build()
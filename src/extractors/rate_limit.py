@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+LOG = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# youtube-transcript-api / yt-dlp exceptions are matched by name so this module
+# does not need to import either library.
+_PERMANENT_ERRORS = {
+    "TranscriptsDisabled",
+    "NoTranscriptFound",
+    "NoTranscriptAvailable",
+    "VideoUnavailable",
+    "VideoUnplayable",
+    "InvalidVideoId",
+    "NotTranslatable",
+    "TranslationLanguageNotAvailable",
+    "CookiePathInvalid",
+    "FailedToCreateConsentCookie",
+}
+_THROTTLE_ERRORS = {"TooManyRequests", "IpBlocked", "RequestBlocked"}
+_THROTTLE_MARKERS = ("http error 429", "status code 429", "too many requests", "rate limit", "rate-limit")
+_TRANSIENT_MARKERS = (
+    "timed out",
+    "timeout",
+    "connection",
+    "temporarily",
+    "http error 5",
+    "server error",
+    "service unavailable",
+)
+
+# Error kinds reported on failed items
+PERMANENT = "permanent"
+TRANSIENT = "transient"
+THROTTLED = "throttled"
+
+def is_throttled(exc: BaseException) -> bool:
+    if type(exc).__name__ in _THROTTLE_ERRORS:
+        return True
+    msg = str(exc).lower()
+    return any(m in msg for m in _THROTTLE_MARKERS)
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Throttling and network-level failures are worth retrying; missing or
+    disabled transcripts and unavailable videos are not.
+    """
+    if type(exc).__name__ in _PERMANENT_ERRORS:
+        return False
+    if is_throttled(exc) or isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    msg = str(exc).lower()
+    return any(m in msg for m in _TRANSIENT_MARKERS)
+
+def classify_error(exc: BaseException) -> str:
+    """
+    PERMANENT (retrying cannot help), THROTTLED (429 / blocked) or TRANSIENT
+    (network-level); failures nothing recognizes count as permanent.
+    """
+    if type(exc).__name__ in _PERMANENT_ERRORS:
+        return PERMANENT
+    if is_throttled(exc):
+        return THROTTLED
+    return TRANSIENT if is_retryable(exc) else PERMANENT
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most `burst`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        *,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._stamp = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                # Tolerance guards against float drift spinning on ~1e-16 waits
+                if self._tokens >= 1.0 - 1e-9:
+                    self._tokens = max(0.0, self._tokens - 1.0)
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            self._sleep(wait)
+
+class AIMDLimiter:
+    """
+    Caps the number of in-flight requests and adapts the cap additively on
+    success (+`increase` per window of `limit` successes) and multiplicatively
+    on throttling or when latency exceeds `latency_target`. Network errors
+    shrink it more gently (`error_decrease`). Decreases are
+    applied at most once per `cooldown` seconds, so one burst of 429s from
+    concurrent requests only halves the window once.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        *,
+        minimum: int = 1,
+        maximum: Optional[int] = None,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        error_decrease: float = 0.75,
+        latency_target: Optional[float] = None,
+        cooldown: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum if maximum is not None else initial)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.increase = increase
+        self.decrease = decrease
+        self.error_decrease = error_decrease
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self._clock = clock
+        self._last_decrease = float("-inf")
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def on_success(self, latency: float) -> None:
+        if self.latency_target is not None and latency > self.latency_target:
+            self._backoff("latency %.2fs above target" % latency)
+            return
+        with self._cond:
+            self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            self._cond.notify_all()
+
+    def on_throttle(self) -> None:
+        self._backoff("throttled")
+
+    def on_error(self) -> None:
+        self._backoff("transient error", self.error_decrease)
+
+    def _backoff(self, reason: str, factor: Optional[float] = None) -> None:
+        with self._cond:
+            now = self._clock()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            old = self.limit
+            self.limit = max(float(self.minimum), self.limit * (self.decrease if factor is None else factor))
+        LOG.info("Concurrency window %.1f -> %.1f (%s)", old, self.limit, reason)
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: attempt n waits uniformly in
+    [0, min(max_delay, base_delay * 2**n)].
+    """
+
+    def __init__(self, *, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 30.0) -> None:
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        return rng.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+class RateController:
+    """
+    Shared gate for every upstream call: a token bucket for requests per second
+    (optional), an AIMD in-flight window and per-kind retry policies, e.g.
+    separate budgets for "metadata" and "captions".
+    """
+
+    def __init__(
+        self,
+        *,
+        limiter: AIMDLimiter,
+        bucket: Optional[TokenBucket] = None,
+        retries: Optional[Dict[str, RetryPolicy]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.limiter = limiter
+        self.bucket = bucket
+        self.retries = retries or {}
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"calls": 0, "retries": 0, "throttled": 0, "gave_up": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def call(self, kind: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        policy = self.retries.get(kind) or RetryPolicy(attempts=1)
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            self.limiter.acquire()
+            self._count("calls")
+            start = self._clock()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:  # noqa: BLE001
+                self.limiter.release()
+                if is_throttled(e):
+                    self._count("throttled")
+                    self.limiter.on_throttle()
+                elif is_retryable(e):
+                    self.limiter.on_error()
+                attempt += 1
+                if not is_retryable(e) or attempt >= policy.attempts:
+                    if is_retryable(e):
+                        self._count("gave_up")
+                    raise
+                with self._lock:
+                    delay = policy.delay(attempt - 1, self._rng)
+                self._count("retries")
+                LOG.debug("Retrying %s call in %.2fs after %s (attempt %d/%d)", kind, delay, e, attempt + 1, policy.attempts)
+                self._sleep(delay)
+                continue
+            self.limiter.release()
+            self.limiter.on_success(self._clock() - start)
+            return result
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from .youtube_client import parse_video_id
+
+LOG = logging.getLogger(__name__)
+
+_COLLECTION_RE = re.compile(
+    r"(?:https?://)?(?:www\.|m\.)?youtube\.com/(?:playlist\?(?:[^#]*&)?list=|channel/|c/|user/|@)"
+)
+
+# Channel -> tabs -> videos is as deep as YouTube nests
+MAX_DEPTH = 3
+
+def is_collection_url(url: str) -> bool:
+    """
+    Playlist or channel URL (a watch URL with `&list=` is still one video).
+    """
+    return parse_video_id(url) is None and bool(_COLLECTION_RE.match(url.strip()))
+
+def watch_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+class FixtureExtractor:
+    """
+    Offline stand-in for YouTubeClient.flat_entries: serves flat entries page
+    by page from a fixture mapping collection URL -> list of pages (lists of
+    entries), given as a dict or a JSON file. `fetched` records every
+    (url, page) handed out, so tests can check how far expansion has run.
+    """
+
+    def __init__(self, pages: Union[str, Dict[str, List[List[Dict[str, Any]]]]]) -> None:
+        if isinstance(pages, str):
+            with open(pages, "r", encoding="utf-8") as f:
+                pages = json.load(f)
+        self.pages = pages
+        self.fetched: List[Tuple[str, int]] = []
+
+    def flat_entries(self, url: str) -> Iterator[Dict[str, Any]]:
+        if url not in self.pages:
+            raise LookupError(f"no fixture for {url}")
+        for i, page in enumerate(self.pages[url]):
+            self.fetched.append((url, i))
+            yield from page
+
+def _entry_url(entry: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (nested collection URL, video id) of a flat entry; one of them is None.
+    """
+    url = entry.get("url") or entry.get("webpage_url") or ""
+    if entry.get("_type") == "playlist" or entry.get("ie_key") == "YoutubeTab" or is_collection_url(url):
+        return url or None, None
+    return None, parse_video_id(url) or entry.get("id")
+
+def _expand(url: str, extractor: Any, seen: Any, visited: Set[str], depth: int) -> Iterator[str]:
+    visited.add(url)
+    try:
+        entries = iter(extractor.flat_entries(url))
+        entry = next(entries, None)
+    except Exception as e:  # noqa: BLE001
+        LOG.error("Could not expand %s: %s", url, e)
+        # Passed on so the failure still shows up as an item
+        yield url
+        return
+    count = 0
+    while entry is not None:
+        nested, video_id = _entry_url(entry)
+        if nested is not None:
+            if depth + 1 < MAX_DEPTH and nested not in visited:
+                yield from _expand(nested, extractor, seen, visited, depth + 1)
+        elif video_id and video_id not in seen:
+            seen.add(video_id)
+            count += 1
+            yield watch_url(video_id)
+        try:
+            entry = next(entries, None)
+        except Exception as e:  # noqa: BLE001
+            LOG.warning("Expansion of %s stopped after %d videos: %s", url, count, e)
+            return
+    LOG.info("Expanded %s: %d new videos", url, count)
+
+def expand_sources(inputs: Iterable[str], extractor: Any, seen: Optional[Any] = None) -> Iterator[str]:
+    """
+    Lazily turn inputs into video URLs. Playlist and channel URLs are expanded
+    through `extractor.flat_entries(url)`, one page at a time as the consumer
+    pulls, so processing starts before expansion finishes. A video id that was
+    already produced (by any source, in any URL form) is dropped; inputs that
+    are neither collections nor parseable video URLs pass through to get an
+    error record. `seen` is the set of produced ids: a plain set by default,
+    or anything with `in` and `add()` (a more compact or probabilistic one).
+    """
+    if seen is None:
+        seen = set()
+    visited: Set[str] = set()
+    for url in inputs:
+        if is_collection_url(url):
+            if url not in visited:
+                yield from _expand(url, extractor, seen, visited, 0)
+            continue
+        video_id = parse_video_id(url)
+        if video_id is not None:
+            if video_id in seen:
+                continue
+            seen.add(video_id)
+        yield url
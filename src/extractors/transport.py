@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+# yt-dlp (with its extractor registry) and youtube-transcript-api are imported
+# on first use, so `--help`, short jobs and replayed runs skip that cost.
+_yt_dlp: Any = None
+_transcript_api: Any = None
+
+def _ytdlp() -> Any:
+    global _yt_dlp
+    if _yt_dlp is None:
+        import yt_dlp
+
+        _yt_dlp = yt_dlp
+    return _yt_dlp
+
+def _transcripts() -> Any:
+    global _transcript_api
+    if _transcript_api is None:
+        import youtube_transcript_api
+
+        _transcript_api = youtube_transcript_api
+    return _transcript_api
+
+# A transport answers the three kinds of upstream request YouTubeClient makes:
+#   list_transcripts(video_id) -> iterable of transcripts (.language_code,
+#       .is_generated, .fetch() -> [{"text", "start", "duration"}, ...])
+#   video_info(video_id)       -> yt-dlp info dict
+#   extract_flat(url)          -> yt-dlp flat playlist/channel info ("entries")
+# plus close(). Rate limiting, retries, caching and metrics stay in the client.
+
+class LiveTransport:
+    """
+    The real upstream. yt-dlp instances are long-lived, one per thread, so
+    extractor setup and the HTTP session (with its connection pool) are paid
+    once per worker rather than once per video.
+    """
+
+    def __init__(self) -> None:
+        self._ydl_opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "skip_download": True,
+            "extract_flat": True,
+        }
+        self._local = threading.local()
+        self._ydls: List[Any] = []
+        self._ydls_lock = threading.Lock()
+
+    def _ydl(self) -> Any:
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = _ytdlp().YoutubeDL(self._ydl_opts)
+            self._local.ydl = ydl
+            with self._ydls_lock:
+                self._ydls.append(ydl)
+        return ydl
+
+    def list_transcripts(self, video_id: str) -> Iterable[Any]:
+        return _transcripts().YouTubeTranscriptApi.list_transcripts(video_id)
+
+    def video_info(self, video_id: str) -> Dict[str, Any]:
+        return self._ydl().extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+
+    def extract_flat(self, url: str) -> Dict[str, Any]:
+        return self._ydl().extract_info(url, download=False, process=False)
+
+    def close(self) -> None:
+        with self._ydls_lock:
+            ydls, self._ydls = self._ydls, []
+        for ydl in ydls:
+            ydl.close()
+        self._local = threading.local()
+
+# Fixture layout shared by recording and replay:
+#   videos/<videoId>.json  {"listing": [{"language", "auto"}] | error,
+#                           "tracks": {"<language>:<0|1 auto>": raw segments | error},
+#                           "info": yt-dlp info dict | error}
+#   collections/<hash>.json {"url": ..., "entries": [...]} | error
+# where an error is {"error": {"type": exception class name, "message": ...}}.
+
+def _track_key(language: str, auto: bool) -> str:
+    return f"{language}:{int(bool(auto))}"
+
+def _collection_name(url: str) -> str:
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=10).hexdigest()
+
+def _error(exc: BaseException) -> Dict[str, Any]:
+    return {"error": {"type": type(exc).__name__, "message": str(exc)}}
+
+_ERROR_TYPES: Dict[str, type] = {}
+
+def _raise_recorded(value: Any) -> Any:
+    """
+    Re-raise a recorded error under its original class name (which is all
+    rate_limit's classifiers look at); anything else is returned as is.
+    """
+    if isinstance(value, dict) and set(value) == {"error"}:
+        name = value["error"]["type"]
+        cls = _ERROR_TYPES.get(name)
+        if cls is None:
+            cls = _ERROR_TYPES[name] = type(name, (Exception,), {})
+        raise cls(value["error"]["message"])
+    return value
+
+def _write_json(path: str, value: Any) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(value, f, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+class _RecordedTranscript:
+    def __init__(self, recorder: "RecordingTransport", video_id: str, inner: Any) -> None:
+        self._recorder = recorder
+        self._video_id = video_id
+        self._inner = inner
+        self.language_code = inner.language_code
+        self.is_generated = inner.is_generated
+
+    def fetch(self) -> Any:
+        key = _track_key(self.language_code, self.is_generated)
+        try:
+            raw = self._inner.fetch()
+        except Exception as e:
+            err = _error(e)
+            self._recorder._update(self._video_id, lambda fx: fx.setdefault("tracks", {}).update({key: err}))
+            raise
+        records = [dict(r) for r in raw]
+        self._recorder._update(self._video_id, lambda fx: fx.setdefault("tracks", {}).update({key: records}))
+        return records
+
+class RecordingTransport:
+    """
+    Passes every request through to `inner` (normally LiveTransport) and saves
+    the responses, and the errors, as replay fixtures under `directory`.
+    """
+
+    def __init__(self, inner: Any, directory: str) -> None:
+        self.inner = inner
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "videos"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "collections"), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _update(self, video_id: str, change: Callable[[Dict[str, Any]], Any]) -> None:
+        path = os.path.join(self.directory, "videos", f"{video_id}.json")
+        with self._lock:
+            fixture: Dict[str, Any] = {}
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    fixture = json.load(f)
+            change(fixture)
+            _write_json(path, fixture)
+
+    def list_transcripts(self, video_id: str) -> List[Any]:
+        try:
+            listing = list(self.inner.list_transcripts(video_id))
+        except Exception as e:
+            err = _error(e)
+            self._update(video_id, lambda fx: fx.update(listing=err))
+            raise
+        summary = [{"language": t.language_code, "auto": t.is_generated} for t in listing]
+        self._update(video_id, lambda fx: fx.update(listing=summary))
+        return [_RecordedTranscript(self, video_id, t) for t in listing]
+
+    def video_info(self, video_id: str) -> Dict[str, Any]:
+        try:
+            info = self.inner.video_info(video_id)
+        except Exception as e:
+            err = _error(e)
+            self._update(video_id, lambda fx: fx.update(info=err))
+            raise
+        self._update(video_id, lambda fx: fx.update(info=info))
+        return info
+
+    def extract_flat(self, url: str) -> Dict[str, Any]:
+        path = os.path.join(self.directory, "collections", _collection_name(url) + ".json")
+        try:
+            info = self.inner.extract_flat(url)
+            # Recording is not about speed: read every page so the fixture is whole
+            entries = list(info.get("entries") or ())
+        except Exception as e:
+            with self._lock:
+                _write_json(path, _error(e))
+            raise
+        with self._lock:
+            _write_json(path, {"url": url, "entries": entries})
+        return dict(info, entries=entries)
+
+    def close(self) -> None:
+        self.inner.close()
+
+class _ReplayTranscript:
+    def __init__(self, replay: "ReplayTransport", fixture: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        self._replay = replay
+        self._fixture = fixture
+        self.language_code = entry["language"]
+        self.is_generated = entry["auto"]
+
+    def fetch(self) -> List[Dict[str, Any]]:
+        self._replay._simulate("fetch")
+        key = _track_key(self.language_code, self.is_generated)
+        tracks = self._fixture.get("tracks", {})
+        if key not in tracks:
+            raise LookupError(f"replay: no recorded track {key}")
+        return _raise_recorded(tracks[key])
+
+class ReplayTransport:
+    """
+    Serves recorded fixtures from `directory` without touching the network.
+    A video without a fixture of its own is served from a recorded one picked
+    by a stable hash of its id, so a handful of recordings can stand in for
+    jobs of any size. Every call waits `latency` seconds (mean, +-50% jitter);
+    `error_rate` and `throttle_rate` are the chances a call fails with a
+    connection reset or a 429 (seeded, so runs are repeatable).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.directory = directory
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._sleep = sleep
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        videos_dir = os.path.join(directory, "videos")
+        names = os.listdir(videos_dir) if os.path.isdir(videos_dir) else []
+        self._names = sorted(n[:-5] for n in names if n.endswith(".json"))
+        self._known = set(self._names)
+        self._fixtures: Dict[str, Dict[str, Any]] = {}
+
+    def _simulate(self, what: str) -> None:
+        with self._lock:
+            roll = self._rng.random()
+            jitter = self._rng.random()
+        if self.latency > 0:
+            self._sleep(self.latency * (0.5 + jitter))
+        if roll < self.throttle_rate:
+            _raise_recorded({"error": {"type": "TooManyRequests", "message": f"replay: injected 429 on {what}"}})
+        if roll < self.throttle_rate + self.error_rate:
+            raise ConnectionError(f"replay: injected connection reset on {what}")
+
+    def _fixture(self, video_id: str) -> Dict[str, Any]:
+        if video_id in self._known:
+            name = video_id
+        elif self._names:
+            digest = hashlib.blake2b(video_id.encode("utf-8"), digest_size=8).digest()
+            name = self._names[int.from_bytes(digest, "big") % len(self._names)]
+        else:
+            raise LookupError(f"replay: no fixtures in {self.directory}")
+        fixture = self._fixtures.get(name)
+        if fixture is None:
+            with open(os.path.join(self.directory, "videos", f"{name}.json"), "r", encoding="utf-8") as f:
+                fixture = json.load(f)
+            # Bounded by the number of recordings, not by job size
+            self._fixtures[name] = fixture
+        return fixture
+
+    def list_transcripts(self, video_id: str) -> List[Any]:
+        self._simulate("list")
+        fixture = self._fixture(video_id)
+        listing = _raise_recorded(fixture.get("listing", []))
+        return [_ReplayTranscript(self, fixture, entry) for entry in listing]
+
+    def video_info(self, video_id: str) -> Dict[str, Any]:
+        self._simulate("info")
+        info = _raise_recorded(self._fixture(video_id).get("info") or {})
+        return dict(info, id=video_id)
+
+    def extract_flat(self, url: str) -> Dict[str, Any]:
+        self._simulate("flat")
+        path = os.path.join(self.directory, "collections", _collection_name(url) + ".json")
+        if not os.path.exists(path):
+            raise LookupError(f"replay: no recorded collection {url}")
+        with open(path, "r", encoding="utf-8") as f:
+            return _raise_recorded(json.load(f))
+
+    def close(self) -> None:
+        pass
+
+def write_synthetic_fixtures(
+    directory: str, *, videos: int = 8, segments: int = 1000, languages: Iterable[str] = ("en",), seed: int = 0
+) -> List[str]:
+    """
+    Generate replay fixtures for `videos` made-up videos with `segments`
+    caption segments per language; returns their ids. For benchmarks and
+    tests, where a recording of real videos is not at hand.
+    """
+    rng = random.Random(seed)
+    words = ["the", "model", "data", "network", "we", "will", "see", "how", "this", "works", "today", "and"]
+    os.makedirs(os.path.join(directory, "videos"), exist_ok=True)
+    ids = []
+    for n in range(videos):
+        video_id = f"synth{n:06d}"
+        langs = list(languages)
+        tracks = {}
+        for i, lang in enumerate(langs):
+            start = 0.0
+            raw = []
+            for _ in range(segments):
+                duration = round(rng.uniform(1.0, 4.0), 2)
+                text = " ".join(rng.choice(words) for _ in range(rng.randint(3, 9)))
+                raw.append({"text": text, "start": round(start, 2), "duration": duration})
+                start += duration
+            tracks[_track_key(lang, i > 0)] = raw
+        _write_json(
+            os.path.join(directory, "videos", f"{video_id}.json"),
+            {
+                "listing": [{"language": lang, "auto": i > 0} for i, lang in enumerate(langs)],
+                "tracks": tracks,
+                "info": {
+                    "id": video_id,
+                    "title": f"Synthetic video {n}",
+                    "uploader": "Synthetic",
+                    "channel_id": "UCsynthetic",
+                    "duration": int(start),
+                    "upload_date": "20240101",
+                    "thumbnail": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+                },
+            },
+        )
+        ids.append(video_id)
+    return ids
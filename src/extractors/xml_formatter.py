@@ -1,20 +1,69 @@
 from __future__ import annotations
 
 import html
-from typing import List, Dict, Any
+from typing import Any, Iterator, TextIO
 
-def captions_to_xml(segments: List[Dict[str, Any]], *, with_timestamps: bool) -> str:
+from .caption_track import as_track
+
+def iter_captions_xml(segments: Any, *, with_timestamps: bool) -> Iterator[str]:
+    """
+    Minimal caption XML, one element at a time. Accepts a CaptionTrack or a
+    list of segment dicts.
+    """
+    track = as_track(segments)
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<captions>'
+    escape = html.escape
+    if with_timestamps:
+        for start, end, text in track:
+            yield f'\n  <c start="{start:.2f}" end="{end:.2f}">{escape(text)}</c>'
+    else:
+        for text in track.texts():
+            yield f"\n  <c>{escape(text)}</c>"
+    yield "\n</captions>"
+
+def write_captions_xml(fp: TextIO, segments: Any, *, with_timestamps: bool) -> None:
+    """
+    Stream minimal caption XML into a file handle or buffer, one element at a
+    time. Accepts a CaptionTrack or a list of segment dicts.
+    """
+    fp.writelines(iter_captions_xml(segments, with_timestamps=with_timestamps))
+
+def captions_to_xml(segments: Any, *, with_timestamps: bool) -> str:
     """
     Minimal XML (not TTML/WebVTT) that captures the text and optional timing.
+    Accepts a CaptionTrack or a list of segment dicts.
+    """
+    return "".join(iter_captions_xml(segments, with_timestamps=with_timestamps))
+
+class CaptionXML:
     """
-    parts = ['<?xml version="1.0" encoding="UTF-8"?>', "<captions>"]
-    for s in segments:
-        text = html.escape(str(s.get("text", "")))
-        if with_timestamps:
-            parts.append(
-                f'  <c start="{float(s.get("start", 0.0)):.2f}" end="{float(s.get("end", 0.0)):.2f}">{text}</c>'
-            )
-        else:
-            parts.append(f"  <c>{text}</c>")
-    parts.append("</captions>")
-    return "\n".join(parts)
\ No newline at end of file
+    XML caption payload rendered when it is written: the streaming writers
+    encode it element by element from `text_chunks()`, so the document is
+    never held as one string. `str()` builds it for everything else.
+    """
+
+    __slots__ = ("track", "with_timestamps")
+
+    def __init__(self, segments: Any, *, with_timestamps: bool) -> None:
+        self.track = as_track(segments)
+        self.with_timestamps = with_timestamps
+
+    def text_chunks(self) -> Iterator[str]:
+        return iter_captions_xml(self.track, with_timestamps=self.with_timestamps)
+
+    def __str__(self) -> str:
+        return "".join(self.text_chunks())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CaptionXML):
+            return self.with_timestamps == other.with_timestamps and self.track == other.track
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"CaptionXML({len(self.track)} segments)"
+
+    # For plain json.dump(default=json_default) callers
+    to_json_value = __str__
+
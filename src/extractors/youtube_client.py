@@ -1,22 +1,43 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
-import yt_dlp
+from .cache import TranscriptCache, captions_key, listing_key, metadata_key, track_key
+from .caption_track import CaptionTrack, CaptionTrackBuilder, as_track
+from .rate_limit import RateController
+from .transport import LiveTransport
 
 LOG = logging.getLogger(__name__)
 
+# `languages` value for fetch_caption_tracks: every language the video has
+ALL_LANGUAGES = "all"
+
 _YT_URL_RE = re.compile(
-    r"(?:https?://)?(?:www\.)?(?:m\.)?(?:youtube\.com/watch\?v=|youtube\.com/embed/|youtu\.be/)([A-Za-z0-9_-]{6,})"
+    r"(?:https?://)?(?:www\.)?(?:m\.)?"
+    r"(?:youtube\.com/(?:watch\?(?:[^#]*&)?v=|embed/|shorts/|live/|v/)|youtube-nocookie\.com/embed/|youtu\.be/)"
+    r"([A-Za-z0-9_-]{6,})"
 )
 
+def listing_signature(listing: List[Dict[str, Any]]) -> str:
+    """
+    Short, order-independent digest of a transcript listing summary
+    ([{"language", "auto"}, ...]); changes when a track is added or removed.
+    """
+    entries = sorted("%s:%d" % (e["language"], bool(e["auto"])) for e in listing)
+    return hashlib.blake2b("\n".join(entries).encode("utf-8"), digest_size=8).hexdigest()
+
 def parse_video_id(url: str) -> Optional[str]:
     """
-    Extract a YouTube video id from common URL patterns.
+    Extract a YouTube video id from common URL patterns (watch, with `v=`
+    anywhere in the query, youtu.be, embed, shorts, live), so every form of
+    one video maps to the same id.
     """
     m = _YT_URL_RE.search(url)
     return m.group(1) if m else None
@@ -24,24 +45,87 @@ def parse_video_id(url: str) -> Optional[str]:
 class YouTubeClient:
     """
     Thin wrapper around youtube-transcript-api and yt-dlp for metadata.
+    An optional `cache` short-circuits both calls for recently seen videos, and
+    an optional `rate` controller throttles and retries every upstream request.
+
+    Upstream requests go through `transport` (see extractors.transport):
+    LiveTransport by default, or a recording/replaying one for offline runs
+    and benchmarks. Call `close()` when done.
+
+    Multi-language fetches run track downloads on a shared pool of
+    `track_workers` threads.
+
+    With `metrics` (a pipeline.metrics.Metrics), upstream stages are timed as
+    "metadata", "list_transcripts" and "fetch", and cache lookups are counted.
     """
 
-    def __init__(self) -> None:
-        self._ydl_opts = {
-            "quiet": True,
-            "no_warnings": True,
-            "skip_download": True,
-            "extract_flat": True,
-        }
+    def __init__(
+        self,
+        *,
+        cache: Optional[TranscriptCache] = None,
+        rate: Optional[RateController] = None,
+        metrics: Optional[Any] = None,
+        track_workers: int = 4,
+        transport: Optional[Any] = None,
+    ) -> None:
+        self.transport = transport if transport is not None else LiveTransport()
+        self.cache = cache
+        self.rate = rate
+        self.metrics = metrics
+        self.track_workers = track_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+
+    def close(self) -> None:
+        self.transport.close()
+        self._local = threading.local()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _stage(self, name: str) -> Any:
+        return self.metrics.stage(name) if self.metrics is not None else nullcontext()
+
+    def _cache_get(self, kind: str, key: str) -> Optional[Any]:
+        if self.cache is None:
+            return None
+        value = self.cache.get(key)
+        if self.metrics is not None:
+            self.metrics.inc("cache_lookups", kind=kind, result="hit" if value is not None else "miss")
+        return value
 
     def video_metadata(self, video_id: str) -> Dict[str, Any]:
         """
         Returns a normalized metadata dict. Fails gracefully.
         """
-        url = f"https://www.youtube.com/watch?v={video_id}"
+        cached = self._cache_get("metadata", metadata_key(video_id))
+        if cached is not None:
+            return cached
+        meta = self._fetch_metadata(video_id)
+        if meta and self.cache is not None:
+            self.cache.put(metadata_key(video_id), meta)
+        return meta
+
+    def _call(self, kind: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.rate is None:
+            return fn(*args)
+        return self.rate.call(kind, fn, *args)
+
+    def flat_entries(self, url: str) -> Iterator[Dict[str, Any]]:
+        """
+        Entries of a playlist or channel through yt-dlp's flat extraction
+        (ids and URLs only, no per-video lookups). The entries iterator is
+        lazy: yt-dlp fetches each continuation page as it is consumed.
+        """
+        with self._stage("expand"):
+            info = self._call("metadata", self.transport.extract_flat, url)
+        yield from info.get("entries") or ()
+
+    def _fetch_metadata(self, video_id: str) -> Dict[str, Any]:
         try:
-            with yt_dlp.YoutubeDL(self._ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+            with self._stage("metadata"):
+                info = self._call("metadata", self.transport.video_info, video_id)
             # Normalize some fields
             upload_date_iso = None
             if "upload_date" in info and info["upload_date"]:
@@ -65,32 +149,97 @@ class YouTubeClient:
 
     def fetch_captions(
         self, video_id: str, preferred_lang: Optional[str] = None
-    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str], Optional[bool]]:
+    ) -> Tuple[CaptionTrack, Optional[str], Optional[bool]]:
         """
         Returns (segments, language, has_auto_captions).
-        Each segment: {"start": float_seconds, "end": float_seconds, "text": str}
+        Segments come back as a columnar CaptionTrack (start/end seconds + text).
+        """
+        cached = self._cache_get("captions", captions_key(video_id, preferred_lang))
+        if cached is not None:
+            if "track" in cached:
+                track = CaptionTrack.from_dict(cached["track"])
+            else:
+                # Entries written before the columnar layout
+                track = as_track(cached["segments"])
+            return track, cached["language"], cached["auto"]
+        track, lang, auto = self._fetch_captions(video_id, preferred_lang)
+        if self.cache is not None:
+            self.cache.put(
+                captions_key(video_id, preferred_lang),
+                {"track": track.to_dict(), "language": lang, "auto": auto},
+            )
+        return track, lang, auto
+
+    def _list_transcripts(self, video_id: str) -> Any:
+        fresh = getattr(self._local, "fresh", None)
+        if fresh is not None and fresh[0] == video_id:
+            # Listed by listing_signature(refresh=True) just before this fetch
+            self._local.fresh = None
+            return fresh[1]
+        with self._stage("list_transcripts"):
+            listing = self._call("captions", self.transport.list_transcripts, video_id)
+        summary = [{"language": t.language_code, "auto": t.is_generated} for t in listing]
+        # Remembered per thread so listing_signature() right after a fetch is free
+        self._local.listing = (video_id, summary)
+        if self.cache is not None:
+            self.cache.put(listing_key(video_id), summary)
+        return listing
+
+    def listing_signature(self, video_id: str, *, refresh: bool = False) -> Optional[str]:
+        """
+        Signature of the video's transcript listing. Reuses the listing this
+        thread just fetched, or the cached one, unless `refresh` is set, which
+        always lists upstream; the fresh listing is then kept for this thread's
+        next fetch of the same video, so a re-fetch after a changed signature
+        does not list it again. None when the video cannot be listed.
         """
+        if not refresh:
+            last = getattr(self._local, "listing", None)
+            if last is not None and last[0] == video_id:
+                return listing_signature(last[1])
+            cached = self._cache_get("captions", listing_key(video_id))
+            if cached is not None:
+                return listing_signature(cached)
+        self._local.fresh = None
+        try:
+            listing = self._list_transcripts(video_id)
+        except Exception as e:  # noqa: BLE001
+            LOG.debug("Transcript listing failed for %s: %s", video_id, e)
+            return None
+        if refresh:
+            self._local.fresh = (video_id, listing)
+        return listing_signature(self._local.listing[1])
+
+    def _fetch_track(self, transcript: Any) -> CaptionTrack:
+        with self._stage("fetch"):
+            raw = self._call("captions", transcript.fetch)
+        # Normalize to start/end/text columns
+        builder = CaptionTrackBuilder()
+        for r in raw:
+            start = float(r.get("start", 0.0))
+            dur = float(r.get("duration", 0.0))
+            builder.append(round(start, 2), round(start + dur, 2), r.get("text", ""))
+        return builder.build()
+
+    def _fetch_captions(
+        self, video_id: str, preferred_lang: Optional[str]
+    ) -> Tuple[CaptionTrack, Optional[str], Optional[bool]]:
         try:
             # get_transcript prefers a language; list_transcripts for more control
-            transcripts = YouTubeTranscriptApi.list_transcripts(video_id)
+            transcripts = self._list_transcripts(video_id)
 
             transcript = None
             lang = None
             auto = None
 
             if preferred_lang:
-                # Try exact language first
-                try:
-                    transcript = transcripts.find_manually_created_transcript([preferred_lang])
+                # Try exact language first, manually created before generated
+                matches = [t for t in transcripts if t.language_code == preferred_lang]
+                matches.sort(key=lambda t: bool(t.is_generated))
+                if matches:
+                    transcript = matches[0]
                     lang = transcript.language_code
-                    auto = False
-                except Exception:
-                    try:
-                        transcript = transcripts.find_generated_transcript([preferred_lang])
-                        lang = transcript.language_code
-                        auto = True
-                    except Exception:
-                        transcript = None
+                    auto = bool(transcript.is_generated)
 
             if transcript is None:
                 # Fall back to any manually created transcript
@@ -104,17 +253,73 @@ class YouTubeClient:
                     lang = transcript.language_code
                     auto = transcript.is_generated
 
-            raw = transcript.fetch()
-            # Normalize to {start,end,text}
-            segments: List[Dict[str, Any]] = []
-            for r in raw:
-                start = float(r.get("start", 0.0))
-                dur = float(r.get("duration", 0.0))
-                end = start + dur
-                segments.append({"start": round(start, 2), "end": round(end, 2), "text": r.get("text", "")})
-            return segments, lang, auto
-        except (TranscriptsDisabled, NoTranscriptFound):
-            raise
+            return self._fetch_track(transcript), lang, auto
         except Exception as e:  # noqa: BLE001
-            LOG.error("Unexpected caption fetch error for %s: %s", video_id, e)
-            raise
\ No newline at end of file
+            # By name: replayed errors are stand-ins for youtube-transcript-api's
+            if type(e).__name__ not in ("TranscriptsDisabled", "NoTranscriptFound"):
+                LOG.error("Unexpected caption fetch error for %s: %s", video_id, e)
+            raise
+
+    def fetch_caption_tracks(
+        self, video_id: str, languages: Union[str, List[str]]
+    ) -> Dict[str, Tuple[CaptionTrack, bool]]:
+        """
+        Several languages from one listing: returns {language: (track, auto)}
+        in request order (listing order for ALL_LANGUAGES), preferring the
+        manually created track of each language. Languages the video does not
+        have are simply absent. Tracks are fetched concurrently; a failed fetch
+        raises, as in `fetch_captions`.
+        """
+        cached_listing = self._cache_get("captions", listing_key(video_id))
+        if cached_listing is not None:
+            available: Dict[str, bool] = {}
+            for e in cached_listing:
+                if available.get(e["language"], True):
+                    available[e["language"]] = e["auto"]
+            hits: Dict[str, Tuple[CaptionTrack, bool]] = {}
+            for lang in self._wanted(list(available), languages):
+                cached = self._cache_get("captions", track_key(video_id, lang))
+                if cached is None:
+                    break
+                hits[lang] = (CaptionTrack.from_dict(cached), available[lang])
+            else:
+                return hits
+
+        listing = self._list_transcripts(video_id)
+        by_lang: Dict[str, Any] = {}
+        for t in listing:
+            current = by_lang.get(t.language_code)
+            if current is None or (current.is_generated and not t.is_generated):
+                by_lang[t.language_code] = t
+
+        wanted = self._wanted(list(by_lang), languages)
+        tracks: Dict[str, CaptionTrack] = {}
+        todo = []
+        for lang in wanted:
+            cached = self._cache_get("captions", track_key(video_id, lang))
+            if cached is not None:
+                tracks[lang] = CaptionTrack.from_dict(cached)
+            else:
+                todo.append(lang)
+        if len(todo) == 1:
+            tracks[todo[0]] = self._fetch_track(by_lang[todo[0]])
+        elif todo:
+            futures = {lang: self._track_pool().submit(self._fetch_track, by_lang[lang]) for lang in todo}
+            for lang, fut in futures.items():
+                tracks[lang] = fut.result()
+        if self.cache is not None:
+            for lang in todo:
+                self.cache.put(track_key(video_id, lang), tracks[lang].to_dict())
+        return {lang: (tracks[lang], by_lang[lang].is_generated) for lang in wanted}
+
+    @staticmethod
+    def _wanted(available: List[str], languages: Union[str, List[str]]) -> List[str]:
+        if languages == ALL_LANGUAGES:
+            return available
+        return [lang for lang in languages if lang in available]
+
+    def _track_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.track_workers, thread_name_prefix="track")
+            return self._pool
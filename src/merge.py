@@ -0,0 +1,124 @@
+import argparse
+import heapq
+import itertools
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+# Local imports
+try:
+    from outputs.exporters import csv_row, make_row_writer
+    from outputs.readers import iter_records
+except ImportError:
+    # Support running via `python src/merge.py` from repo root
+    sys.path.append(os.path.dirname(__file__))
+    from outputs.exporters import csv_row, make_row_writer
+    from outputs.readers import iter_records
+
+LOG = logging.getLogger("merge")
+
+# A runner output is one input-ordered run, plus a second one when the
+# end-of-run retry pass appended records; many more means unordered output.
+MAX_RUNS = 4
+
+def _keyed(path: str) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    for row in iter_records(path):
+        try:
+            index = int(row["inputIndex"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{path}: record without inputIndex; was it written by runner.py?") from e
+        yield index, row.get("createdAt") or "", row
+
+def _runs(path: str) -> List[Iterator[Tuple[int, str, Dict[str, Any]]]]:
+    """
+    Split a file into its input-ordered runs. One pass finds where `inputIndex`
+    drops; each run then re-reads the file lazily, so memory stays flat.
+    """
+    bounds = [0]
+    last = -1
+    count = 0
+    for index, _, _ in _keyed(path):
+        if index < last:
+            bounds.append(count)
+            if len(bounds) > MAX_RUNS:
+                raise ValueError(f"{path}: records are not in input order (written with --completion-order?)")
+        last = index
+        count += 1
+    bounds.append(count)
+    return [itertools.islice(_keyed(path), a, b) for a, b in zip(bounds, bounds[1:])]
+
+def merge_records(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming k-way merge of shard outputs into one input-ordered sequence.
+    Each file is already ordered by `inputIndex` (apart from a retry-pass tail,
+    merged in as a run of its own), so only one record per run is held at a
+    time. Records are de-duplicated by video id (the raw URL for
+    invalid inputs), keeping the first in input order.
+    """
+    seen: Set[str] = set()
+    runs = [run for p in paths for run in _runs(p)]
+    for _, _, row in heapq.merge(*runs, key=lambda t: (t[0], t[1])):
+        key = row.get("videoId") or row.get("videoUrl") or ""
+        if key in seen:
+            continue
+        seen.add(key)
+        yield row
+
+def kind_for(path: str) -> str:
+    for ext, kind in ((".ndjson", "ndjson"), (".csv", "csv"), (".json", "json")):
+        if path.endswith(ext):
+            return kind
+    raise ValueError(f"Cannot tell the output format of {path}; use .json, .ndjson or .csv")
+
+def merge_files(paths: List[str], out: str) -> int:
+    kind = kind_for(out)
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    fp = open(out, "w", encoding="utf-8", newline="" if kind == "csv" else None)
+    writer = make_row_writer(kind, fp, has_rows=False, header=None)
+    count = 0
+    try:
+        for row in merge_records(paths):
+            writer.write(csv_row(row) if kind == "csv" else row)
+            count += 1
+    finally:
+        writer.close()
+    return count
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Merge the outputs of `runner.py --shard i/N` runs into one ordered, de-duplicated file."
+    )
+    p.add_argument(
+        "inputs",
+        nargs="+",
+        help="Shard outputs (.json, .ndjson, .csv, optionally .gz/.zst, or a shard .manifest.json).",
+    )
+    p.add_argument(
+        "--out",
+        required=True,
+        help="Merged output file; its extension (.json, .ndjson, .csv) selects the format.",
+    )
+    p.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging level.",
+    )
+    return p.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    try:
+        count = merge_files(args.inputs, args.out)
+    except ValueError as e:
+        LOG.error("%s", e)
+        sys.exit(2)
+    LOG.info("Merged %d records from %d files into %s", count, len(args.inputs), os.path.abspath(args.out))
+
+if __name__ == "__main__":
+    main()
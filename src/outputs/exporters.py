@@ -1,13 +1,50 @@
 from __future__ import annotations
 
 import csv
-import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, TextIO
 
-from .writers.json_writer import write_json_file
-from .writers.csv_writer import write_csv_file
-from .writers.ndjson_writer import write_ndjson_file
+from .writers.json_writer import write_json_file, iter_json_chunks, make_encoder, JSONArrayWriter
+from .writers.csv_writer import write_csv_file, CSVStreamWriter
+from .writers.ndjson_writer import write_ndjson_file, NDJSONWriter
+from .writers.parquet_writer import ColumnarExportWriter
+from .sharding import ShardedOutput, ShardPolicy
+
+CSV_COLUMNS = [
+    "videoId",
+    "videoUrl",
+    "inputIndex",
+    "title",
+    "channelId",
+    "channelName",
+    "language",
+    "hasAutoCaptions",
+    "listingSignature",
+    "captionFormat",
+    "optionsKey",
+    "captions",
+    "duration",
+    "publishedAt",
+    "thumbnailUrl",
+    "requestedFormat",
+    "error",
+    "errorKind",
+    "createdAt",
+]
+
+_CSV_ENCODER = make_encoder()
+
+def csv_row(r: Dict[str, Any]) -> Dict[str, Any]:
+    # stringify captions (which could be array/object/XML/CaptionTrack) and any
+    # other structured field (per-language flags, format lists) as JSON
+    norm = dict(r)
+    for key, value in r.items():
+        if hasattr(value, "text_chunks"):
+            # XML payloads are plain text in CSV, as before
+            norm[key] = "".join(value.text_chunks())
+        elif isinstance(value, (dict, list)) or hasattr(value, "json_columns"):
+            norm[key] = "".join(iter_json_chunks(_CSV_ENCODER, value))
+    return norm
 
 class ExportCoordinator:
     """
@@ -38,36 +75,139 @@ class ExportCoordinator:
             # still write header with common fields
             with open(path, "w", encoding="utf-8", newline="") as f:
                 writer = csv.writer(f)
-                writer.writerow(
-                    [
-                        "videoId",
-                        "videoUrl",
-                        "title",
-                        "channelId",
-                        "channelName",
-                        "language",
-                        "hasAutoCaptions",
-                        "captionFormat",
-                        "captions",
-                        "duration",
-                        "publishedAt",
-                        "thumbnailUrl",
-                        "requestedFormat",
-                        "error",
-                        "createdAt",
-                    ]
-                )
+                writer.writerow(CSV_COLUMNS)
             return path
 
-        norm_rows: List[Dict[str, Any]] = []
-        for r in rows:
-            # stringify captions (which could be array/object/XML)
-            captions = r.get("captions")
-            if isinstance(captions, (dict, list)):
-                captions = json.dumps(captions, ensure_ascii=False)
-            norm = dict(r)
-            norm["captions"] = captions
-            norm_rows.append(norm)
-
-        write_csv_file(path, norm_rows)
-        return path
\ No newline at end of file
+        write_csv_file(path, [csv_row(r) for r in rows])
+        return path
+
+    def open_stream(
+        self,
+        kinds: Iterable[str],
+        *,
+        resume_offsets: Optional[Dict[str, Any]] = None,
+        shards: Optional[ShardPolicy] = None,
+    ) -> "ExportStream":
+        """
+        Opens incremental writers for the given kinds ("json", "csv", "ndjson",
+        "compact_json", "parquet", "arrow"). Rows are appended as they are produced, so memory does
+        not grow with job size and a crash keeps everything written so far.
+        With `resume_offsets`, existing files are truncated to those byte
+        offsets and appended to instead of being recreated. With `shards`, the
+        row-oriented kinds are written as rotated, optionally compressed shards
+        plus a manifest (see outputs.sharding).
+        """
+        return ExportStream(self, kinds, resume_offsets=resume_offsets, shards=shards)
+
+class ExportStream:
+    """
+    Fans each row out to every open streaming writer. Use as a context manager
+    or call `close()` to finalize the files.
+    """
+
+    def __init__(
+        self,
+        coordinator: ExportCoordinator,
+        kinds: Iterable[str],
+        *,
+        resume_offsets: Optional[Dict[str, Any]] = None,
+        shards: Optional[ShardPolicy] = None,
+    ) -> None:
+        self.paths: Dict[str, str] = {}
+        self._files: Dict[str, TextIO] = {}
+        self._writers: Dict[str, Any] = {}
+        resume_offsets = resume_offsets or {}
+        base = os.path.join(coordinator.outdir, coordinator.basename)
+        suffixes = {"json": ".json", "compact_json": "_compact.json", "ndjson": ".ndjson", "csv": ".csv"}
+        self._columnar: Dict[str, ColumnarExportWriter] = {}
+        self._sharded: Dict[str, ShardedOutput] = {}
+        for kind in kinds:
+            if kind in ("parquet", "arrow"):
+                columnar = ColumnarExportWriter(base, fmt=kind, resume=resume_offsets.get(kind))
+                self.paths[kind] = columnar.paths["videos"]
+                self._columnar[kind] = columnar
+                continue
+            if kind not in suffixes:
+                self.close()
+                raise ValueError(f"Unsupported export kind: {kind}")
+            if shards is not None:
+                stem, ext = os.path.splitext(base + suffixes[kind])
+                sharded = ShardedOutput(
+                    stem,
+                    ext,
+                    lambda fp, has_rows, header, kind=kind: make_row_writer(kind, fp, has_rows=has_rows, header=header),
+                    shards,
+                    resume=resume_offsets.get(kind),
+                )
+                self.paths[kind] = sharded.manifest_path
+                self._sharded[kind] = sharded
+                self._writers[kind] = sharded
+                continue
+            path = base + suffixes[kind]
+            append = kind in resume_offsets and os.path.exists(path)
+            if append:
+                header = _read_csv_header(path) if kind == "csv" and resume_offsets[kind] else None
+                os.truncate(path, resume_offsets[kind])
+                fp = open(path, "a", encoding="utf-8", newline="" if kind == "csv" else None)
+            else:
+                header = None
+                fp = open(path, "w", encoding="utf-8", newline="" if kind == "csv" else None)
+            self.paths[kind] = path
+            self._files[kind] = fp
+            self._writers[kind] = make_row_writer(kind, fp, has_rows=None if append else False, header=header)
+
+    def write(self, row: Dict[str, Any], segments: Any = None) -> None:
+        """
+        `segments` (the item's CaptionTrack) feeds the segment-level table of
+        columnar exports; row-oriented writers only use `row`.
+        """
+        for kind, writer in self._writers.items():
+            writer.write(csv_row(row) if kind == "csv" else row)
+        for columnar in self._columnar.values():
+            columnar.write(row, segments)
+
+    def sync(self) -> Dict[str, Any]:
+        """
+        Flushes every output to stable storage and returns the byte offset of
+        each, suitable for a resume checkpoint.
+        """
+        offsets: Dict[str, Any] = {}
+        for kind, fp in self._files.items():
+            fp.flush()
+            os.fsync(fp.fileno())
+            offsets[kind] = fp.tell()
+        for kind, sharded in self._sharded.items():
+            offsets[kind] = sharded.sync()
+        for kind, columnar in self._columnar.items():
+            # Columnar files cannot be appended to; the checkpoint counts parts and rows
+            offsets[kind] = columnar.sync()
+        return offsets
+
+    def close(self) -> None:
+        writers, self._writers = self._writers, {}
+        columnar, self._columnar = self._columnar, {}
+        self._files = {}
+        self._sharded = {}
+        for writer in list(writers.values()) + list(columnar.values()):
+            writer.close()
+
+    def __enter__(self) -> "ExportStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+def make_row_writer(kind: str, fp: TextIO, *, has_rows: Optional[bool], header: Optional[List[str]]) -> Any:
+    """
+    Row writer for `kind`. `has_rows` is False for a fresh file, True/None when
+    appending after earlier rows (None: let the writer inspect `fp`).
+    """
+    if kind in ("json", "compact_json"):
+        return JSONArrayWriter(fp, compact=(kind == "compact_json"), append=has_rows is not False, has_rows=has_rows)
+    if kind == "ndjson":
+        return NDJSONWriter(fp)
+    return CSVStreamWriter(fp, default_fieldnames=CSV_COLUMNS, fieldnames=header)
+
+def _read_csv_header(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return next(csv.reader(f), [])
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+from typing import Any, Dict, Iterator, TextIO
+
+from .sharding import open_text
+
+_CHUNK = 1 << 16
+
+# Payloads of these caption formats are plain text in CSV rather than JSON
+_TEXT_FORMATS = ("xml", "xml_with_timestamps", "one_line_text")
+# Columns that are JSON in CSV when structured (lists, per-language objects)
+_JSON_COLUMNS = ("language", "hasAutoCaptions", "captionFormat", "requestedFormat")
+# Empty in CSV but "" rather than null in the JSON outputs
+_STRING_COLUMNS = ("videoId", "videoUrl")
+
+def iter_json_array(fp: TextIO) -> Iterator[Any]:
+    """
+    Stream the elements of a top-level JSON array without loading the whole
+    document, decoding one element at a time from a sliding buffer.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    started = False
+    eof = False
+    while True:
+        # Skip whitespace and separators between elements
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if not started and pos < len(buf):
+            if buf[pos] != "[":
+                raise ValueError("expected a JSON array")
+            started = True
+            pos += 1
+            continue
+        if started and pos < len(buf) and buf[pos] == "]":
+            return
+        if pos < len(buf):
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    raise
+            else:
+                # A number at the buffer's edge may be cut short; make sure it is terminated
+                if end < len(buf) or eof:
+                    yield value
+                    pos = end
+                    continue
+        if eof:
+            if started or buf[pos:].strip():
+                raise ValueError("unterminated JSON array")
+            return
+        chunk = fp.read(_CHUNK)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+def _number(value: str) -> Any:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+def csv_record(row: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Undo `csv_row` for the runner's columns (see exporters.CSV_COLUMNS): JSON
+    fields are decoded, numbers and booleans parsed and empty cells made null,
+    so a record read from CSV matches the one read from JSON. Other columns
+    stay strings.
+    """
+    record: Dict[str, Any] = dict(row)
+    for key, value in row.items():
+        if not isinstance(value, str) or key in _STRING_COLUMNS:
+            continue
+        if value == "":
+            record[key] = None
+        elif key in ("inputIndex", "duration"):
+            record[key] = _number(value)
+        elif key == "hasAutoCaptions" and value in ("True", "False"):
+            record[key] = value == "True"
+        elif key in _JSON_COLUMNS and value[0] in "[{":
+            record[key] = json.loads(value)
+    captions = row.get("captions")
+    if captions and record.get("captionFormat") not in _TEXT_FORMATS:
+        record["captions"] = json.loads(captions)
+    return record
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the rows of an export file: JSON array, NDJSON or CSV, optionally
+    gzip/zstd-compressed, or a shard manifest (`*.manifest.json`), whose shards
+    are read in order. CSV rows are converted back to the JSON field types
+    (`csv_record`).
+    """
+    if path.endswith(".manifest.json"):
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        directory = os.path.dirname(path)
+        for shard in manifest["shards"]:
+            yield from iter_records(os.path.join(directory, shard["path"]))
+        return
+    stem = path
+    for suffix in (".gz", ".zst"):
+        if stem.endswith(suffix):
+            stem = stem[: -len(suffix)]
+    with open_text(path) as f:
+        if stem.endswith(".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif stem.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield csv_record(row)
+        elif stem.endswith(".json"):
+            yield from iter_json_array(f)
+        else:
+            raise ValueError(f"Unrecognized export file: {path}")
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import csv
+import glob
+import hashlib
+import io
+import json
+import os
+import re
+import zlib
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+def _zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd compression requires the zstandard package (pip install zstandard)") from e
+    return zstandard
+
+def open_text(path: str) -> TextIO:
+    """
+    Open a (possibly compressed, possibly multi-member) output file for reading.
+    """
+    if path.endswith(".gz"):
+        import gzip
+
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    if path.endswith(".zst"):
+        reader = _zstd().ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+        return io.TextIOWrapper(io.BufferedReader(reader), encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+class ShardPolicy:
+    """
+    When to rotate to a new shard and how to compress each one. Limits of
+    None mean unbounded; `max_bytes` counts bytes on disk (after compression).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_records: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        compression: Optional[str] = None,
+        level: Optional[int] = None,
+    ) -> None:
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.level = level
+
+class _DiskSink:
+    """
+    Raw shard file that tracks its size and SHA-256 as bytes go to disk.
+    """
+
+    def __init__(self, path: str, *, resume_offset: Optional[int] = None) -> None:
+        self.path = path
+        self.sha = hashlib.sha256()
+        if resume_offset is None:
+            self.raw = open(path, "wb")
+            self.size = 0
+        else:
+            os.truncate(path, resume_offset)
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    self.sha.update(block)
+            self.raw = open(path, "ab")
+            self.size = resume_offset
+
+    def write(self, data: bytes) -> None:
+        if data:
+            self.raw.write(data)
+            self.sha.update(data)
+            self.size += len(data)
+
+    def sync(self) -> None:
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+
+    def close(self) -> None:
+        self.raw.close()
+
+class _Compressor(io.RawIOBase):
+    """
+    Streaming compression into a _DiskSink. `end_member()` closes the current
+    gzip member / zstd frame; concatenated members are still one valid file,
+    so a shard can be truncated back to any member boundary and appended to.
+    """
+
+    def __init__(self, sink: _DiskSink, compression: Optional[str], level: Optional[int]) -> None:
+        super().__init__()
+        self._sink = sink
+        self._compression = compression
+        self._level = level
+        self._c: Any = None
+
+    def writable(self) -> bool:
+        return True
+
+    def _new(self) -> Any:
+        if self._compression == "gzip":
+            level = self._level if self._level is not None else 6
+            return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        level = self._level if self._level is not None else 3
+        return _zstd().ZstdCompressor(level=level).compressobj()
+
+    def write(self, b: Any) -> int:
+        data = bytes(b)
+        if self._compression is None:
+            self._sink.write(data)
+        else:
+            if self._c is None:
+                self._c = self._new()
+            self._sink.write(self._c.compress(data))
+        return len(data)
+
+    def end_member(self) -> None:
+        if self._c is not None:
+            self._sink.write(self._c.flush())
+            self._c = None
+
+class _Shard:
+    def __init__(self, index: int, path: str, sink: _DiskSink, text: TextIO, compressor: _Compressor, writer: Any, records: int) -> None:
+        self.index = index
+        self.path = path
+        self.sink = sink
+        self.text = text
+        self.compressor = compressor
+        self.writer = writer
+        self.records = records
+
+class ShardedOutput:
+    """
+    Writes one export kind as a series of shards `<base>-00000<ext>[.gz|.zst]`,
+    rotating by record count or on-disk size, and keeps
+    `<base><ext>.manifest.json` listing each finished shard's record count,
+    size and SHA-256 so downstream loaders can ingest shards in parallel.
+
+    `writer_factory(fp, resumed_rows, header)` builds the row writer for each
+    shard (JSON array, NDJSON, CSV); each shard is a self-contained file.
+    """
+
+    def __init__(
+        self,
+        base: str,
+        ext: str,
+        writer_factory: Callable[[TextIO, bool, Optional[List[str]]], Any],
+        policy: ShardPolicy,
+        *,
+        resume: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.base = base
+        self.ext = ext
+        self.policy = policy
+        self._factory = writer_factory
+        self.manifest_path = f"{base}{ext}.manifest.json"
+        self.shards: List[Dict[str, Any]] = []
+        self._next = 0
+        self._current: Optional[_Shard] = None
+        if resume is not None:
+            self._resume(resume)
+
+    def _path(self, index: int) -> str:
+        return f"{self.base}-{index:05d}{self.ext}{COMPRESSION_SUFFIXES[self.policy.compression]}"
+
+    def _resume(self, cp: Dict[str, int]) -> None:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                done = json.load(f).get("shards", [])
+            self.shards = [s for s in done if s["index"] < cp["shard"]]
+        # Anything past the checkpoint is redone
+        pattern = re.compile(re.escape(os.path.basename(self.base)) + r"-(\d{5})")
+        for path in glob.glob(f"{self.base}-*{self.ext}*"):
+            m = pattern.match(os.path.basename(path))
+            if m and int(m.group(1)) > cp["shard"]:
+                os.remove(path)
+        self._next = cp["shard"]
+        path = self._path(cp["shard"])
+        if cp["offset"] and os.path.exists(path):
+            self._open(resume_offset=cp["offset"], records=cp["records"])
+
+    def _open(self, *, resume_offset: Optional[int] = None, records: int = 0) -> _Shard:
+        index = self._next
+        self._next += 1
+        path = self._path(index)
+        sink = _DiskSink(path, resume_offset=resume_offset)
+        header = None
+        if resume_offset is not None and self.ext == ".csv":
+            # The shard's own header line decides the column order for appended rows
+            with open_text(path) as f:
+                header = next(csv.reader(f), None)
+        compressor = _Compressor(sink, self.policy.compression, self.policy.level)
+        text = io.TextIOWrapper(io.BufferedWriter(compressor, 1 << 16), encoding="utf-8", newline="")
+        writer = self._factory(text, records > 0, header)
+        self._current = _Shard(index, path, sink, text, compressor, writer, records)
+        return self._current
+
+    def write(self, row: Dict[str, Any]) -> None:
+        shard = self._current or self._open()
+        shard.writer.write(row)
+        shard.records += 1
+        p = self.policy
+        if (p.max_records and shard.records >= p.max_records) or (p.max_bytes and shard.sink.size >= p.max_bytes):
+            self._finish()
+
+    def _finish(self) -> None:
+        shard, self._current = self._current, None
+        if shard is None:
+            return
+        shard.writer.close()  # writes the footer and flushes through the text layer
+        shard.compressor.end_member()
+        shard.sink.sync()
+        shard.sink.close()
+        self.shards.append(
+            {
+                "index": shard.index,
+                "path": os.path.basename(shard.path),
+                "records": shard.records,
+                "bytes": shard.sink.size,
+                "sha256": shard.sink.sha.hexdigest(),
+            }
+        )
+        self._write_manifest(complete=False)
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Make everything written so far durable and return a checkpoint that
+        `resume=` accepts.
+        """
+        shard = self._current
+        if shard is None:
+            return {"shard": self._next, "offset": 0, "records": 0}
+        shard.text.flush()
+        shard.compressor.end_member()
+        shard.sink.sync()
+        return {"shard": shard.index, "offset": shard.sink.size, "records": shard.records}
+
+    def _write_manifest(self, *, complete: bool) -> None:
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "compression": self.policy.compression,
+                    "complete": complete,
+                    "records": sum(s["records"] for s in self.shards),
+                    "shards": self.shards,
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp, self.manifest_path)
+
+    def close(self) -> None:
+        if self._current is None and not self.shards:
+            # Always leave at least one (empty but valid) shard behind
+            self._open()
+        self._finish()
+        self._write_manifest(complete=True)
+
+    @property
+    def paths(self) -> List[str]:
+        return [os.path.join(os.path.dirname(self.base), s["path"]) for s in self.shards]
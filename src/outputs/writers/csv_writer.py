@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import csv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, TextIO
 
 def write_csv_file(path: str, rows: List[Dict[str, Any]]) -> None:
     # Determine columns from union of keys, ordered by first row
@@ -19,4 +19,41 @@ def write_csv_file(path: str, rows: List[Dict[str, Any]]) -> None:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         for r in rows:
-            writer.writerow({k: r.get(k) for k in fieldnames})
\ No newline at end of file
+            writer.writerow({k: r.get(k) for k in fieldnames})
+
+class CSVStreamWriter:
+    """
+    Streams rows to an open CSV file. Columns are fixed by the first row (rows
+    are expected to share one layout), or by `default_fieldnames` if no row is
+    ever written. Passing `fieldnames` continues a file whose header was
+    already written.
+    """
+
+    def __init__(
+        self,
+        fp: TextIO,
+        *,
+        default_fieldnames: Optional[Sequence[str]] = None,
+        fieldnames: Optional[Sequence[str]] = None,
+    ) -> None:
+        self._fp = fp
+        self._default_fieldnames = list(default_fieldnames or [])
+        self._writer: Optional[csv.DictWriter] = None
+        if fieldnames:
+            self._writer = csv.DictWriter(fp, fieldnames=list(fieldnames), extrasaction="ignore")
+        self.count = 0
+
+    def _start(self, fieldnames: Sequence[str]) -> None:
+        self._writer = csv.DictWriter(self._fp, fieldnames=list(fieldnames), extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self._writer is None:
+            self._start(row.keys())
+        self._writer.writerow(row)
+        self.count += 1
+
+    def close(self) -> None:
+        if self._writer is None:
+            self._start(self._default_fieldnames)
+        self._fp.close()
@@ -1,8 +1,209 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+import math
+import re
+from array import array
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+# Stands in for a streamed value while the rest of its row is encoded; the
+# id keeps it from matching any caption text
+_MARK = "\x00streamed:%x:%d\x00"
+_MARKED = re.compile(r'"\\u0000streamed:([0-9a-f]+):(\d+)\\u0000"')
+
+def json_default(obj: Any) -> Any:
+    """
+    `default=` hook for json: objects such as CaptionTrack expose
+    `to_json_value()` and are serialized through it. The streaming writers
+    (iter_json_chunks) encode them piece by piece instead.
+    """
+    to_json_value = getattr(obj, "to_json_value", None)
+    if to_json_value is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_json_value()
+
+def make_encoder(*, indent: Optional[int] = None, compact: bool = False) -> json.JSONEncoder:
+    return json.JSONEncoder(
+        ensure_ascii=False,
+        indent=indent,
+        separators=(",", ":") if compact else None,
+        default=json_default,
+    )
+
+def _float(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "Infinity" if value > 0 else "-Infinity"
+    return float.__repr__(value)
+
+def _swap_streamed(obj: Any, found: List[Any]) -> Any:
+    # Replaces streamed values (top level or inside dicts) by markers; dicts are
+    # only copied on the way to one
+    if hasattr(obj, "json_columns") or hasattr(obj, "text_chunks"):
+        found.append(obj)
+        return _MARK % (id(found), len(found) - 1)
+    if isinstance(obj, dict):
+        swapped = None
+        for key, value in obj.items():
+            new = _swap_streamed(value, found)
+            if new is not value:
+                if swapped is None:
+                    swapped = dict(obj)
+                swapped[key] = new
+        return obj if swapped is None else swapped
+    return obj
+
+def _iter_columns(encoder: json.JSONEncoder, value: Any, line_indent: str) -> Iterator[str]:
+    """
+    A columnar value as the JSON list of records it stands for, one chunk per
+    record, encoded straight from the columns with `encoder`'s settings.
+    `line_indent` is the indentation of the line the value starts on.
+    """
+    names, columns = value.json_columns()
+    string = encode_basestring_ascii if encoder.ensure_ascii else encode_basestring
+
+    def scalar(v: Any) -> str:
+        if isinstance(v, str):
+            return string(v)
+        if isinstance(v, float):
+            return _float(v)
+        return encoder.encode(v)
+
+    encoded = []
+    for column in columns:
+        if isinstance(column, array) and column.typecode in "fd" and math.isfinite(sum(column)):
+            # float repr is what json writes for finite floats
+            encoded.append(map(float.__repr__, column))
+        else:
+            encoded.append(map(scalar, column))
+
+    indent = encoder.indent
+    record_sep = encoder.item_separator
+    if indent is None:
+        opening, field_sep, closing, end = "{", record_sep, "}", "]"
+    else:
+        step = " " * indent if isinstance(indent, int) else indent
+        outer, inner = "\n" + line_indent + step, "\n" + line_indent + step * 2
+        opening, field_sep, closing = outer + "{" + inner, record_sep + inner, outer + "}"
+        end = "\n" + line_indent + "]"
+    fields = field_sep.join((string(name) + encoder.key_separator).replace("%", "%%") + "%s" for name in names)
+    record = opening + fields + closing
+    following = record_sep + record
+    yield "["
+    first = True
+    for values in zip(*encoded):
+        if first:
+            first = False
+            yield record % values
+        else:
+            yield following % values
+    yield "]" if first else end
+
+def _iter_text(encoder: json.JSONEncoder, value: Any) -> Iterator[str]:
+    """
+    A text value as one JSON string, escaped piece by piece from its chunks.
+    """
+    string = encode_basestring_ascii if encoder.ensure_ascii else encode_basestring
+    yield '"'
+    for piece in value.text_chunks():
+        yield string(piece)[1:-1]
+    yield '"'
+
+def _spliced(encoder: json.JSONEncoder, chunks: Iterable[str], found: List[Any]) -> Iterator[str]:
+    tag = "%x" % id(found)
+    line_indent = ""
+    for chunk in chunks:
+        pos = 0
+        for m in _MARKED.finditer(chunk):
+            if m.group(1) != tag:
+                continue
+            before = chunk[pos : m.start()]
+            if "\n" in before:
+                after = before.rsplit("\n", 1)[1]
+                line_indent = after[: len(after) - len(after.lstrip())]
+            yield before
+            value = found[int(m.group(2))]
+            if hasattr(value, "json_columns"):
+                yield from _iter_columns(encoder, value, line_indent)
+            else:
+                yield from _iter_text(encoder, value)
+            pos = m.end()
+        rest = chunk[pos:] if pos else chunk
+        if encoder.indent is not None and "\n" in rest:
+            after = rest.rsplit("\n", 1)[1]
+            line_indent = after[: len(after) - len(after.lstrip())]
+        yield rest
+
+def iter_json_chunks(encoder: json.JSONEncoder, obj: Any) -> Iterable[str]:
+    """
+    Encoded pieces of `obj`, for `fp.writelines`, so no full document string is
+    ever built. Objects with `json_columns()` (CaptionTrack) are encoded record
+    by record from their columns, without the per-record dicts
+    `to_json_value()` would build, and objects with `text_chunks()`
+    (CaptionXML) as one string escaped piece by piece, without rendering the
+    whole document first; the output is the same either way.
+    """
+    found: List[Any] = []
+    obj = _swap_streamed(obj, found)
+    chunks = encoder.iterencode(obj)
+    return _spliced(encoder, chunks, found) if found else chunks
 
 def write_json_file(path: str, data: Any) -> None:
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+        json.dump(data, f, ensure_ascii=False, indent=2, default=json_default)
+
+class JSONArrayWriter:
+    """
+    Incrementally writes a JSON array to `fp`, one element per `write` call,
+    streaming each element's encoded chunks straight into the file.
+    Output is byte-identical to `json.dump(rows, fp, indent=indent)`; with
+    `compact` it uses `separators=(",", ":")` and no indentation.
+    With `append`, `fp` is positioned just after the last element of an array
+    written earlier (opening bracket included) and writing continues from there;
+    pass `has_rows` when `fp.tell()` cannot tell (e.g. a compressed stream).
+    """
+
+    def __init__(
+        self,
+        fp: TextIO,
+        *,
+        indent: Optional[int] = 2,
+        compact: bool = False,
+        append: bool = False,
+        has_rows: Optional[bool] = None,
+    ) -> None:
+        self._fp = fp
+        self._indent = None if compact else indent
+        self._encoder = make_encoder(indent=self._indent, compact=compact)
+        self._pad = "\n" + " " * self._indent if self._indent is not None else ""
+        if self._indent is not None:
+            self._sep = ","
+        else:
+            self._sep = "," if compact else ", "
+        self.count = 0
+        if append:
+            self._has_rows = fp.tell() > len("[") if has_rows is None else has_rows
+        else:
+            self._has_rows = False
+            fp.write("[")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        fp = self._fp
+        if self._has_rows:
+            fp.write(self._sep)
+        if self._indent is None:
+            fp.writelines(iter_json_chunks(self._encoder, row))
+        else:
+            # Re-indent one level; JSON strings never contain raw newlines
+            fp.write(self._pad)
+            pad = self._pad
+            for chunk in iter_json_chunks(self._encoder, row):
+                fp.write(chunk.replace("\n", pad) if "\n" in chunk else chunk)
+        self._has_rows = True
+        self.count += 1
+
+    def close(self) -> None:
+        self._fp.write("\n]" if self._has_rows and self._indent is not None else "]")
+        self._fp.close()
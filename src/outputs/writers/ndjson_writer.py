@@ -1,9 +1,30 @@
 from __future__ import annotations
 
-import json
-from typing import Dict, Any, Iterable
+from typing import Dict, Any, Iterable, TextIO
+
+from .json_writer import iter_json_chunks, make_encoder
 
 def write_ndjson_file(path: str, rows: Iterable[Dict[str, Any]]) -> None:
     with open(path, "w", encoding="utf-8") as f:
+        writer = NDJSONWriter(f)
         for r in rows:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
\ No newline at end of file
+            writer.write(r)
+
+class NDJSONWriter:
+    """
+    Appends one JSON document per line to `fp`, writing encoded chunks directly
+    instead of building each line as a string first.
+    """
+
+    def __init__(self, fp: TextIO) -> None:
+        self._fp = fp
+        self._encoder = make_encoder()
+        self.count = 0
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._fp.writelines(iter_json_chunks(self._encoder, row))
+        self._fp.write("\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._fp.close()
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import glob
+import os
+from array import array
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# pyarrow is optional; it is only imported when a columnar export is requested.
+_pa: Any = None
+
+def _pyarrow() -> Any:
+    global _pa
+    if _pa is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("Parquet/Arrow export requires pyarrow (pip install pyarrow)") from e
+        _pa = pyarrow
+    return _pa
+
+def _dict_string() -> Any:
+    pa = _pyarrow()
+    return pa.dictionary(pa.int32(), pa.string())
+
+def video_schema() -> Any:
+    pa = _pyarrow()
+    return pa.schema(
+        [
+            ("videoId", _dict_string()),
+            ("videoUrl", pa.string()),
+            ("inputIndex", pa.int64()),
+            ("title", pa.string()),
+            ("channelId", _dict_string()),
+            ("channelName", _dict_string()),
+            ("language", _dict_string()),
+            ("hasAutoCaptions", pa.bool_()),
+            ("listingSignature", pa.string()),
+            ("captionFormat", _dict_string()),
+            ("optionsKey", _dict_string()),
+            ("duration", pa.float64()),
+            ("publishedAt", pa.string()),
+            ("thumbnailUrl", pa.string()),
+            ("error", _dict_string()),
+            ("errorKind", _dict_string()),
+            ("createdAt", pa.string()),
+            ("segmentCount", pa.int32()),
+        ]
+    )
+
+def segment_schema() -> Any:
+    pa = _pyarrow()
+    return pa.schema(
+        [
+            ("videoId", _dict_string()),
+            ("language", _dict_string()),
+            ("idx", pa.int32()),
+            ("start", pa.float64()),
+            ("end", pa.float64()),
+            ("text", pa.string()),
+        ]
+    )
+
+def _scalar(value: Any) -> Any:
+    # Multi-format / multi-language items carry lists or dicts here
+    if isinstance(value, (list, tuple)):
+        return ",".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return None
+    return value
+
+def _read_part(path: str) -> Any:
+    pa = _pyarrow()
+    if path.endswith(".parquet"):
+        return pa.parquet.read_table(path)
+    with pa.ipc.open_file(path) as reader:
+        return reader.read_all()
+
+class _PartWriter:
+    """
+    Writes one table as a directory of part files. Rows are buffered until
+    there are `row_group_size` of them, which are then written as a part.
+    `checkpoint()` writes the rows still buffered as the last part, so
+    everything written so far is readable; that part is rewritten by later
+    checkpoints until it fills up, instead of every checkpoint leaving a
+    small part behind. `resume=(parts, rows)` continues from a checkpoint.
+    """
+
+    def __init__(
+        self, directory: str, schema: Any, *, fmt: str, row_group_size: int, resume: Optional[Tuple[int, int]] = None
+    ) -> None:
+        self.directory = directory
+        self.schema = schema
+        self.fmt = fmt
+        self.row_group_size = row_group_size
+        self.part = 0
+        self._columns: Dict[str, Any] = {}
+        self._reset_buffer()
+        os.makedirs(directory, exist_ok=True)
+        if resume is not None:
+            self._resume(*resume)
+
+    def _reset_buffer(self) -> None:
+        # Float segment columns extend straight from CaptionTrack's array('d')
+        self._columns = {f.name: array("d") if f.name in ("start", "end") else [] for f in self.schema}
+        self.buffered = 0
+
+    def _resume(self, parts: int, rows: int) -> None:
+        # Parts past the checkpoint hold rows written after it; the last
+        # checkpointed part is cut back to its checkpointed rows and buffered
+        # again, to be rewritten by the next checkpoint
+        for path in sorted(glob.glob(os.path.join(self.directory, "part-*"))):
+            number = int(os.path.basename(path)[5:10])
+            if path.endswith(".tmp"):
+                os.remove(path)
+                continue
+            if number == parts and rows:
+                table = _read_part(path).slice(0, rows)
+                self.extend({name: table.column(name).to_pylist() for name in self._columns}, table.num_rows)
+            if number >= parts:
+                os.remove(path)
+        self.part = parts
+
+    def extend(self, columns: Dict[str, Any], n: int) -> None:
+        for name, values in columns.items():
+            self._columns[name].extend(values)
+        self.buffered += n
+        if self.buffered >= self.row_group_size:
+            self._write_part()
+            self.part += 1
+            self._reset_buffer()
+
+    def _path(self) -> str:
+        ext = "parquet" if self.fmt == "parquet" else "arrow"
+        return os.path.join(self.directory, f"part-{self.part:05d}.{ext}")
+
+    def _write_part(self) -> None:
+        pa = _pyarrow()
+        table = pa.Table.from_arrays(
+            [pa.array(self._columns[f.name], type=f.type) for f in self.schema], schema=self.schema
+        )
+        path = self._path()
+        tmp = path + ".tmp"
+        if self.fmt == "parquet":
+            pa.parquet.write_table(
+                table, tmp, row_group_size=self.row_group_size, use_dictionary=True, compression="zstd"
+            )
+        else:
+            with pa.ipc.new_file(tmp, self.schema) as writer:
+                writer.write_table(table, max_chunksize=self.row_group_size)
+        # Replaced whole, so a checkpointed part is never seen half-rewritten
+        os.replace(tmp, path)
+
+    def checkpoint(self) -> Tuple[int, int]:
+        """
+        Make every row written so far readable; returns (complete parts,
+        rows in the last part), the resume point for this table.
+        """
+        if self.buffered:
+            self._write_part()
+        return self.part, self.buffered
+
+    def close(self) -> None:
+        if self.buffered:
+            self._write_part()
+            self.part += 1
+            self._reset_buffer()
+
+class ColumnarExportWriter:
+    """
+    Streams items into two columnar tables (Parquet or Arrow IPC):
+    `<base>_videos/` with one row per video and `<base>_segments/` with one row
+    per caption segment (videoId, language, idx, start, end, text). Strings that repeat
+    (ids, languages, formats, errors) are dictionary-encoded, and rows are
+    written in row-group batches so memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        base: str,
+        *,
+        fmt: str = "parquet",
+        row_group_size: int = 64_000,
+        resume: Union[None, int, Dict[str, Any]] = None,
+    ) -> None:
+        if fmt not in ("parquet", "arrow"):
+            raise ValueError(f"Unsupported columnar format: {fmt}")
+        self.paths = {"videos": f"{base}_videos", "segments": f"{base}_segments"}
+        if isinstance(resume, int):
+            # Checkpoints of jobs started before tables resumed by row count
+            resume = {"videos": (resume, 0), "segments": (resume, 0)}
+        self._videos = _PartWriter(
+            self.paths["videos"],
+            video_schema(),
+            fmt=fmt,
+            row_group_size=row_group_size,
+            resume=tuple(resume["videos"]) if resume is not None else None,
+        )
+        self._segments = _PartWriter(
+            self.paths["segments"],
+            segment_schema(),
+            fmt=fmt,
+            row_group_size=row_group_size,
+            resume=tuple(resume["segments"]) if resume is not None else None,
+        )
+        self.count = 0
+
+    def write(self, row: Dict[str, Any], segments: Any = None) -> None:
+        """
+        `segments` is the item's CaptionTrack, or a {language: CaptionTrack}
+        dict for multi-language items; each track's rows carry its language.
+        """
+        if isinstance(segments, dict):
+            tracks = list(segments.items())
+        elif segments is not None:
+            tracks = [(_scalar(row.get("language")), segments)]
+        else:
+            tracks = []
+        n = sum(len(track) for _, track in tracks)
+        video_id = row.get("videoId") or ""
+        self._videos.extend(
+            {
+                "videoId": [video_id],
+                "videoUrl": [row.get("videoUrl")],
+                "inputIndex": [row.get("inputIndex")],
+                "title": [row.get("title")],
+                "channelId": [row.get("channelId")],
+                "channelName": [row.get("channelName")],
+                "language": [_scalar(row.get("language"))],
+                "hasAutoCaptions": [row.get("hasAutoCaptions") if isinstance(row.get("hasAutoCaptions"), bool) else None],
+                "listingSignature": [row.get("listingSignature")],
+                "captionFormat": [_scalar(row.get("captionFormat"))],
+                "optionsKey": [row.get("optionsKey")],
+                "duration": [float(row["duration"]) if row.get("duration") is not None else None],
+                "publishedAt": [row.get("publishedAt")],
+                "thumbnailUrl": [row.get("thumbnailUrl")],
+                "error": [row.get("error")],
+                "errorKind": [row.get("errorKind")],
+                "createdAt": [row.get("createdAt")],
+                "segmentCount": [n],
+            },
+            1,
+        )
+        for lang, track in tracks:
+            k = len(track)
+            if k:
+                self._segments.extend(
+                    {
+                        "videoId": [video_id] * k,
+                        "language": [lang] * k,
+                        "idx": range(k),
+                        "start": track.starts,
+                        "end": track.ends,
+                        "text": track.texts(),
+                    },
+                    k,
+                )
+        self.count += 1
+
+    def sync(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Make everything written so far readable; returns each table's (parts,
+        rows) checkpoint, the resume point for this writer.
+        """
+        return {"videos": self._videos.checkpoint(), "segments": self._segments.checkpoint()}
+
+    def close(self) -> None:
+        self._videos.close()
+        self._segments.close()
+
+def read_table(directory: str) -> Any:
+    """
+    Concatenate every part in a `<base>_videos` / `<base>_segments` directory.
+    """
+    pa = _pyarrow()
+    paths = sorted(glob.glob(os.path.join(directory, "part-*")))
+    tables = [_read_part(path) for path in paths if not path.endswith(".tmp")]
+    return pa.concat_tables(tables) if tables else None
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+DEAD_LETTER_SUFFIX = "_dead_letter.ndjson"
+
+# Item fields kept for each dead letter; `videoUrl` makes the file valid input
+_FIELDS = ("videoUrl", "videoId", "inputIndex", "error", "errorKind")
+
+class DeadLetterQueue:
+    """
+    NDJSON file of items that failed for reasons worth retrying (transient or
+    throttled). Lines are flushed as they are added, so the file survives a
+    crash and can be fed back to runner.py as an input list. The file is only
+    created once the first failure arrives.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.count = 0
+        self._fp: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    def add(self, item: Dict[str, Any], *, attempts: int = 1) -> None:
+        entry = {k: item.get(k) for k in _FIELDS}
+        entry["attempts"] = attempts
+        entry["failedAt"] = time.time()
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._fp is None:
+                self._fp = open(self.path, "w", encoding="utf-8")
+            self._fp.write(line)
+            self._fp.flush()
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """
+        Close the file and return its entries, leaving the queue empty so the
+        retry pass can re-add what fails again. The file is removed once read.
+        """
+        self.close()
+        if not os.path.exists(self.path):
+            return []
+        entries = list(read_dead_letters(self.path))
+        os.remove(self.path)
+        self.count = 0
+        return entries
+
+def read_dead_letters(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
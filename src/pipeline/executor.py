@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import itertools
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Iterable, Iterator, Optional, Set, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def run_parallel(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    workers: int,
+    ordered: bool = True,
+    max_pending: Optional[int] = None,
+) -> Iterator[R]:
+    """
+    Apply `fn` to every item on a pool of `workers` threads and yield the results.
+
+    The input is consumed lazily: at most `max_pending` items (default 2x workers)
+    are submitted ahead of the consumer. With `ordered` results come back in input
+    order, otherwise in completion order. `fn` is expected to turn per-item failures
+    into results itself; anything it raises propagates to the caller.
+    """
+    workers = max(1, int(workers))
+    if workers == 1:
+        # No pool needed; keeps tracebacks and debugging simple
+        for item in items:
+            yield fn(item)
+        return
+
+    window = max(workers, max_pending or workers * 2)
+    source = iter(items)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+    try:
+        if ordered:
+            queue: Deque[Future] = deque(pool.submit(fn, it) for it in itertools.islice(source, window))
+            while queue:
+                head = queue.popleft()
+                # Refill before blocking so the pool stays saturated
+                for it in itertools.islice(source, 1):
+                    queue.append(pool.submit(fn, it))
+                yield head.result()
+        else:
+            pending: Set[Future] = {pool.submit(fn, it) for it in itertools.islice(source, window)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for it in itertools.islice(source, len(done)):
+                    pending.add(pool.submit(fn, it))
+                for fut in done:
+                    yield fut.result()
+    finally:
+        # Consumer may stop early (error, KeyboardInterrupt); drop queued work
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import io
+import math
+import sys
+from array import array
+from typing import Iterator, List, Set, Union
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# 2**64 / golden ratio, for Fibonacci hashing of packed ids
+_FIB = 0x9E3779B97F4A7C15
+
+def read_lines(path: str) -> Iterator[str]:
+    """
+    Stripped, non-empty lines of a text file, or of stdin for "-", read lazily
+    so a consumer can start before the input is complete. Gzip input is
+    recognised by its magic bytes rather than the file name, so compressed
+    stdin works too.
+    """
+    raw = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        head = raw.peek(2)[:2] if hasattr(raw, "peek") else b""
+        stream = gzip.GzipFile(fileobj=raw, mode="rb") if head == GZIP_MAGIC else raw
+        text = io.TextIOWrapper(stream, encoding="utf-8")
+        try:
+            for line in text:
+                line = line.strip()
+                if line:
+                    yield line
+        finally:
+            # Detach so that stdin itself is never closed
+            text.detach()
+            if stream is not raw:
+                stream.close()
+    finally:
+        if path != "-":
+            raw.close()
+
+class SeenSet:
+    """
+    Exact set of input keys. Canonical 11-character video ids are packed into
+    64-bit integers and kept in an open-addressing table (an array of
+    unsigned 64-bit slots, at most half full), which costs 16-32 bytes per id
+    against roughly 90 for a set of strings. Other keys go to a plain set.
+    `add()` returns whether the key was new.
+    """
+
+    def __init__(self) -> None:
+        self._slots = array("Q", bytes(8 * 1024))
+        self._mask = len(self._slots) - 1
+        self._used = 0
+        # 0 marks an empty slot, so the id that packs to 0 is tracked apart
+        self._zero = False
+        self._other: Set[str] = set()
+
+    @staticmethod
+    def _packed(key: str) -> Union[int, str]:
+        if len(key) == 11:
+            try:
+                raw = base64.urlsafe_b64decode(key + "=")
+            except ValueError:
+                return key
+            # The last character carries 4 bits; keep only ids that round-trip
+            if base64.urlsafe_b64encode(raw)[:11].decode("ascii") == key:
+                return int.from_bytes(raw, "big")
+        return key
+
+    def _slot(self, value: int) -> int:
+        i = ((value * _FIB) >> 20) & self._mask
+        slots = self._slots
+        while slots[i] and slots[i] != value:
+            i = (i + 1) & self._mask
+        return i
+
+    def _grow(self) -> None:
+        old = self._slots
+        self._slots = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._slots) - 1
+        for value in old:
+            if value:
+                self._slots[self._slot(value)] = value
+
+    def __contains__(self, key: str) -> bool:
+        packed = self._packed(key)
+        if isinstance(packed, str):
+            return packed in self._other
+        if packed == 0:
+            return self._zero
+        return self._slots[self._slot(packed)] == packed
+
+    def add(self, key: str) -> bool:
+        packed = self._packed(key)
+        if isinstance(packed, str):
+            if packed in self._other:
+                return False
+            self._other.add(packed)
+            return True
+        if packed == 0:
+            new, self._zero = not self._zero, True
+            return new
+        i = self._slot(packed)
+        if self._slots[i]:
+            return False
+        self._slots[i] = packed
+        self._used += 1
+        if 2 * self._used > len(self._slots):
+            self._grow()
+        return True
+
+    def __len__(self) -> int:
+        return self._used + int(self._zero) + len(self._other)
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic seen-set for inputs too large to remember
+    exactly: memory is set by `capacity` and `error_rate` (about 29 bits per
+    key at 1e-6) however many lines go through. A false positive makes a new
+    key look seen, so with probability about `error_rate` per input a video
+    is skipped; keys are hashed deterministically, so a resumed run skips the
+    same ones.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 1e-6) -> None:
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate between 0 and 1")
+        self.bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.bits / capacity * math.log(2))))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        array = self._array
+        return all(array[p >> 3] >> (p & 7) & 1 for p in self._positions(key))
+
+    def add(self, key: str) -> bool:
+        array = self._array
+        new = False
+        for p in self._positions(key):
+            byte = array[p >> 3]
+            if not byte >> (p & 7) & 1:
+                array[p >> 3] = byte | 1 << (p & 7)
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __len__(self) -> int:
+        return self.count
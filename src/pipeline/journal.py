@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Set
+
+LOG = logging.getLogger(__name__)
+
+JOB_FILE = "job.json"
+JOURNAL_FILE = "journal.ndjson"
+
+def save_job_settings(jobdir: str, settings: Dict[str, Any]) -> None:
+    os.makedirs(jobdir, exist_ok=True)
+    tmp = os.path.join(jobdir, JOB_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(settings, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, os.path.join(jobdir, JOB_FILE))
+
+def load_job_settings(jobdir: str) -> Dict[str, Any]:
+    with open(os.path.join(jobdir, JOB_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+class JobJournal:
+    """
+    Append-only progress journal for a checkpointed job directory.
+
+    Completed item keys are buffered in memory and committed in batches: every
+    `sync_every` items or `sync_interval` seconds, the caller flushes its outputs
+    and passes their byte offsets to `commit`, which appends one line with the
+    batch's keys and those offsets, then fsyncs. On resume, outputs are truncated
+    back to the last committed offsets, so anything written after the last
+    commit is simply redone.
+    """
+
+    def __init__(
+        self,
+        jobdir: str,
+        *,
+        sync_every: int = 200,
+        sync_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = os.path.join(jobdir, JOURNAL_FILE)
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+        self._clock = clock
+        self.done: Set[str] = set()
+        self.offsets: Dict[str, int] = {}
+        self.complete = False
+        self._load()
+        self._pending: List[str] = []
+        self._last_sync = clock()
+        self._fp = open(self.path, "a", encoding="utf-8")
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-write; everything before it is valid
+                    LOG.warning("Ignoring truncated journal entry in %s", self.path)
+                    break
+                self.done.update(rec.get("done", []))
+                if "offsets" in rec:
+                    self.offsets = rec["offsets"]
+                if rec.get("complete"):
+                    self.complete = True
+
+    def mark_done(self, key: str) -> None:
+        self._pending.append(key)
+
+    def sync_due(self) -> bool:
+        return len(self._pending) >= self.sync_every or (
+            bool(self._pending) and self._clock() - self._last_sync >= self.sync_interval
+        )
+
+    def commit(self, offsets: Dict[str, int]) -> None:
+        """
+        Record pending keys as durable. `offsets` must describe outputs that were
+        already flushed to disk, so the journal never points past real data.
+        """
+        self._append({"done": self._pending, "offsets": offsets, "ts": time.time()})
+        self.done.update(self._pending)
+        self.offsets = dict(offsets)
+        self._pending = []
+        self._last_sync = self._clock()
+
+    def mark_complete(self) -> None:
+        """
+        Record that every item is done and the outputs were finalized (closing
+        brackets written), so a later --resume has nothing left to do.
+        """
+        self._append({"complete": True, "ts": time.time()})
+        self.complete = True
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        self._fp.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+
+    def close(self) -> None:
+        self._fp.close()
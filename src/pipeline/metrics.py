@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Seconds; covers formatting/export (sub-ms) through slow yt-dlp extractions (tens of s)
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROM_PREFIX = "yt_transcripts"
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _prom_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 6) if value is not None else None
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram (Prometheus layout: `counts[i]` holds
+    observations <= `buckets[i]`, the last slot is +Inf).
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate by linear interpolation inside the bucket holding rank q.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if seen + c >= rank and c:
+                lo = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lo
+                return lo + (self.buckets[i] - lo) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+class Metrics:
+    """
+    Thread-safe run metrics: per-stage latency histograms, labelled counters
+    and gauges. Workers record into it directly; `summary()` and
+    `prometheus()` render a consistent snapshot. With `profiler` set (a
+    pipeline.profiling.StageProfiler), every `stage()` block also goes
+    through its sampling profiler.
+    """
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started = clock()
+        self._stages: Dict[str, Histogram] = {}
+        self._counters: Dict[LabelKey, float] = {}
+        self._gauges: Dict[LabelKey, float] = {}
+        self.profiler: Optional[Any] = None
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time the enclosed block as one observation of stage `name` (recorded
+        even if the block raises).
+        """
+        profiling = self.profiler.stage(name) if self.profiler is not None else nullcontext()
+        t0 = self._clock()
+        try:
+            with profiling:
+                yield
+        finally:
+            self.observe(name, self._clock() - t0)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = self._clock() - self.started
+            stages = {}
+            for name, h in sorted(self._stages.items()):
+                stages[name] = {
+                    "count": h.count,
+                    "totalSeconds": round(h.sum, 6),
+                    "meanSeconds": round(h.sum / h.count, 6) if h.count else None,
+                    "p50Seconds": _round(h.quantile(0.5)),
+                    "p95Seconds": _round(h.quantile(0.95)),
+                    "p99Seconds": _round(h.quantile(0.99)),
+                }
+            counters: Dict[str, Any] = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                label = ",".join(f"{k}={v}" for k, v in labels)
+                counters.setdefault(name, {})[label or "total"] = value
+            gauges: Dict[str, Any] = {}
+            for (name, labels), value in sorted(self._gauges.items()):
+                label = ",".join(f"{k}={v}" for k, v in labels)
+                gauges.setdefault(name, {})[label or "value"] = value
+            items = sum(v for (name, _), v in self._counters.items() if name == "items")
+        return {
+            "elapsedSeconds": round(elapsed, 3),
+            "items": items,
+            "itemsPerSecond": round(items / elapsed, 3) if elapsed > 0 else None,
+            "stages": stages,
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+    def prometheus(self) -> str:
+        """
+        Prometheus text exposition format, for node_exporter's textfile collector.
+        """
+        lines: List[str] = []
+        with self._lock:
+            elapsed = self._clock() - self.started
+            name = f"{PROM_PREFIX}_stage_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for stage, h in sorted(self._stages.items()):
+                labels = (("stage", stage),)
+                cumulative = 0
+                for bound, c in zip(list(h.buckets) + [float("inf")], h.counts):
+                    cumulative += c
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_prom_labels(labels, ('le', le))} {cumulative}")
+                lines.append(f"{name}_sum{_prom_labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{_prom_labels(labels)} {h.count}")
+            typed = set()
+            for (metric, labels), value in sorted(self._counters.items()):
+                full = f"{PROM_PREFIX}_{metric}_total"
+                if full not in typed:
+                    lines.append(f"# TYPE {full} counter")
+                    typed.add(full)
+                lines.append(f"{full}{_prom_labels(labels)} {value}")
+            for (metric, labels), value in sorted(self._gauges.items()):
+                full = f"{PROM_PREFIX}_{metric}"
+                if full not in typed:
+                    lines.append(f"# TYPE {full} gauge")
+                    typed.add(full)
+                lines.append(f"{full}{_prom_labels(labels)} {value}")
+        lines.append(f"# TYPE {PROM_PREFIX}_elapsed_seconds gauge")
+        lines.append(f"{PROM_PREFIX}_elapsed_seconds {elapsed}")
+        return "\n".join(lines) + "\n"
+
+class MetricsReporter:
+    """
+    Writes `<base>_metrics.json` (run summary) and `<base>.prom` (Prometheus
+    textfile) every `interval` seconds via `maybe_write()` and once more at the
+    end. Files are replaced atomically so readers never see a partial file.
+    `collect` runs before each write to refresh gauges from other components.
+    """
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        base: str,
+        *,
+        interval: float = 30.0,
+        collect: Optional[Callable[[Metrics], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.metrics = metrics
+        self.json_path = f"{base}_metrics.json"
+        self.prom_path = f"{base}.prom"
+        self.interval = interval
+        self._collect = collect
+        self._clock = clock
+        self._last = clock()
+
+    def maybe_write(self) -> None:
+        if self.interval > 0 and self._clock() - self._last >= self.interval:
+            self.write()
+
+    def write(self, *, final: bool = False) -> None:
+        if self._collect is not None:
+            self._collect(self.metrics)
+        summary = self.metrics.summary()
+        summary["final"] = final
+        _replace(self.json_path, json.dumps(summary, indent=2))
+        _replace(self.prom_path, self.metrics.prometheus())
+        self._last = self._clock()
+
+def _replace(path: str, text: str) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
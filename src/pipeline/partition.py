@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Tuple
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse an `i/N` shard spec (0-based: shards 0/4 .. 3/4).
+    """
+    try:
+        index_s, count_s = value.split("/")
+        index, count = int(index_s), int(count_s)
+    except ValueError as e:
+        raise ValueError(f"shard must look like i/N, got {value!r}") from e
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"shard index must be in 0..{count - 1}, got {value!r}")
+    return index, count
+
+def shard_of(key: str, count: int) -> int:
+    """
+    Stable shard for `key`: the same key lands on the same shard on every
+    machine and every run (unlike `hash()`, which is salted per process).
+    """
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
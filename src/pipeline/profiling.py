@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import cProfile
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PROFILE_SUFFIX = "_profile.txt"
+
+# Allocations of the profiling machinery itself (including the stage context
+# managers) are left out of allocation reports
+_OWN_FRAMES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "*/contextlib.py"),
+    tracemalloc.Filter(False, "*/pipeline/metrics.py"),
+)
+
+def _where(filename: str, lineno: int) -> str:
+    parts = filename.replace("\\", "/").split("/")
+    return "/".join(parts[-2:]) + f":{lineno}"
+
+def _function(key: Tuple[str, int, str]) -> str:
+    filename, lineno, name = key
+    if filename == "~":
+        # Built-ins: pstats keys them as ("~", 0, "<built-in method ...>")
+        return name
+    return f"{name} ({_where(filename, lineno)})"
+
+class StageProfiler:
+    """
+    Sampled cProfile and tracemalloc per pipeline stage, driven by
+    Metrics.stage (set `metrics.profiler`). A `sample` fraction of stage calls
+    is profiled, one at a time across threads, so a long job stays close to
+    its unprofiled speed while every stage still collects enough calls. For
+    each sampled call cProfile runs on the calling thread and tracemalloc
+    traces allocations for the duration of the call; the snapshot at its end
+    holds what the stage allocated and kept (allocations by other threads in
+    that window are included too).
+    """
+
+    def __init__(
+        self, *, sample: float = 0.01, memory: bool = True, top: int = 12, seed: Optional[int] = None
+    ) -> None:
+        if not 0 < sample <= 1:
+            raise ValueError("sample must be in (0, 1]")
+        self.sample = sample
+        self.memory = memory
+        self.top = top
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # Held while a sampled call runs: profilers and tracemalloc do not nest
+        self._active = threading.Lock()
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._calls: Dict[str, int] = {}
+        self._sampled: Dict[str, int] = {}
+        self._seconds: Dict[str, float] = {}
+        self._peak: Dict[str, int] = {}
+        self._allocations: Dict[str, Dict[str, List[int]]] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        with self._lock:
+            self._calls[name] = self._calls.get(name, 0) + 1
+            take = self._rng.random() < self.sample
+        if not take or not self._active.acquire(blocking=False):
+            yield
+            return
+        try:
+            with self._lock:
+                profile = self._profiles.get(name)
+                if profile is None:
+                    profile = self._profiles[name] = cProfile.Profile()
+            tracing = self.memory and not tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.start()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler (a debugger, `python -m cProfile`) owns the hook
+                profile = None
+            t0 = time.perf_counter()
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - t0
+                if profile is not None:
+                    profile.disable()
+                snapshot, peak = None, 0
+                if tracing:
+                    snapshot = tracemalloc.take_snapshot().filter_traces(_OWN_FRAMES)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                self._record(name, elapsed, snapshot, peak)
+        finally:
+            self._active.release()
+
+    def _record(self, name: str, elapsed: float, snapshot: Optional[tracemalloc.Snapshot], peak: int) -> None:
+        with self._lock:
+            self._sampled[name] = self._sampled.get(name, 0) + 1
+            self._seconds[name] = self._seconds.get(name, 0.0) + elapsed
+            if snapshot is None:
+                return
+            self._peak[name] = max(self._peak.get(name, 0), peak)
+            allocations = self._allocations.setdefault(name, {})
+            for stat in snapshot.statistics("lineno")[: self.top * 4]:
+                frame = stat.traceback[0]
+                entry = allocations.setdefault(_where(frame.filename, frame.lineno), [0, 0])
+                entry[0] += stat.size
+                entry[1] += stat.count
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        {stage: {"calls", "sampled", "profiledSeconds", "peakBytes",
+        "functions": [(function, own s, cumulative s, calls)],
+        "allocations": [(file:line, bytes, blocks)]}}, busiest stage first.
+        """
+        with self._lock:
+            stages = sorted(self._sampled, key=lambda s: -self._seconds[s])
+            result: Dict[str, Any] = {}
+            for name in stages:
+                functions = []
+                profile = self._profiles.get(name)
+                if profile is not None:
+                    try:
+                        stats = pstats.Stats(profile).stats  # type: ignore[attr-defined]
+                    except TypeError:
+                        # Never enabled: no stats to load
+                        stats = {}
+                    ranked = sorted(stats.items(), key=lambda kv: -kv[1][2])[: self.top]
+                    functions = [
+                        (_function(key), round(tt, 6), round(ct, 6), nc) for key, (_, nc, tt, ct, _) in ranked
+                    ]
+                allocations = sorted(self._allocations.get(name, {}).items(), key=lambda kv: -kv[1][0])
+                result[name] = {
+                    "calls": self._calls[name],
+                    "sampled": self._sampled[name],
+                    "profiledSeconds": round(self._seconds[name], 6),
+                    "peakBytes": self._peak.get(name),
+                    "functions": functions,
+                    "allocations": [(where, size, count) for where, (size, count) in allocations[: self.top]],
+                }
+        return result
+
+    def report(self) -> str:
+        lines = [f"Stage profile: {self.sample:.1%} of stage calls sampled", ""]
+        for name, s in self.summary().items():
+            per_call = s["profiledSeconds"] / s["sampled"] * 1000
+            peak = f", peak {s['peakBytes'] / 1024:.1f} KiB traced" if s["peakBytes"] is not None else ""
+            lines.append(
+                f"== {name}: {s['sampled']}/{s['calls']} calls sampled, "
+                f"{s['profiledSeconds']:.3f}s profiled ({per_call:.2f} ms/call){peak}"
+            )
+            if s["functions"]:
+                lines.append(f"  {'own s':>9} {'cum s':>9} {'calls':>8}  function")
+                for function, tt, ct, nc in s["functions"]:
+                    lines.append(f"  {tt:>9.4f} {ct:>9.4f} {nc:>8}  {function}")
+            if s["allocations"]:
+                lines.append(f"  {'KiB':>9} {'blocks':>9}  allocated and kept, by line")
+                for where, size, count in s["allocations"]:
+                    lines.append(f"  {size / 1024:>9.1f} {count:>9}  {where}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def write(self, base: str) -> str:
+        """
+        Dump one `<base>_profile_<stage>.pstats` per profiled stage (for
+        `python -m pstats` or snakeviz) and the text report to
+        `<base>_profile.txt`; returns the report's path.
+        """
+        with self._lock:
+            profiles = dict(self._profiles)
+        for name, profile in profiles.items():
+            profile.dump_stats(f"{base}_profile_{name}.pstats")
+        path = base + PROFILE_SUFFIX
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.report())
+        os.replace(tmp, path)
+        return path
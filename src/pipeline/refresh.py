@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, Set, Tuple
+
+# Outcomes of Refresher.check(); everything but UNCHANGED is re-fetched
+UNCHANGED = "unchanged"
+NEW = "new"
+ERRORED = "errored"
+STALE = "stale"
+OPTIONS_CHANGED = "options_changed"
+UNSIGNED = "unsigned"
+LISTING_CHANGED = "listing_changed"
+
+def parse_created_at(value: Any) -> Optional[float]:
+    """
+    `createdAt` ("2025-11-10T17:05:22.123456Z", naive UTC) as a Unix timestamp.
+    """
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value[:-1] if value.endswith("Z") else value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def options_key(options: Dict[str, Any]) -> str:
+    """
+    Short digest of the options that shape a record (formats, languages,
+    metadata, post-processing), stored as its `optionsKey`: records made
+    under different settings never compare equal.
+    """
+    canonical = json.dumps(options, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).hexdigest()
+
+def _plain(value: Any) -> Any:
+    # CaptionTrack payloads (array_with_timestamps) compare as their records
+    to_json = getattr(value, "to_json_value", None)
+    if to_json is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_json()
+
+class PriorEntry(NamedTuple):
+    offset: int
+    length: int
+    errored: bool
+    created: Optional[float]
+    signature: Optional[str]
+    options_key: Optional[str]
+
+class PreviousRun:
+    """
+    Index over a previous run's NDJSON output: one streaming pass records, per
+    videoId, the line's byte range and the few fields refresh decisions need.
+    Full records are read back on demand, so memory stays small per video.
+    Later lines win when a video appears more than once.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._entries: Dict[str, PriorEntry] = {}
+        self._lock = threading.Lock()
+        self._fp = open(path, "rb")
+        offset = 0
+        for line in self._fp:
+            if line.strip():
+                try:
+                    rec = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}: not an NDJSON export (offset {offset}): {e}") from e
+                video_id = rec.get("videoId")
+                if video_id:
+                    self._entries[video_id] = PriorEntry(
+                        offset,
+                        len(line),
+                        rec.get("error") is not None,
+                        parse_created_at(rec.get("createdAt")),
+                        rec.get("listingSignature"),
+                        rec.get("optionsKey"),
+                    )
+            offset += len(line)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, video_id: str) -> bool:
+        return video_id in self._entries
+
+    def get(self, video_id: str) -> Optional[PriorEntry]:
+        return self._entries.get(video_id)
+
+    def video_ids(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def record(self, entry: PriorEntry) -> Dict[str, Any]:
+        with self._lock:
+            self._fp.seek(entry.offset)
+            line = self._fp.read(entry.length)
+        return json.loads(line)
+
+    def close(self) -> None:
+        self._fp.close()
+
+class Refresher:
+    """
+    Decides, per video, whether a previous run's record can be reused: only
+    when it succeeded, is younger than `max_age` seconds, was produced with
+    the same output options (`options_key`; records from before the key
+    existed count as changed), and the video's transcript
+    listing still has the recorded signature (one listing call instead of a
+    metadata lookup plus caption downloads). Keeps the counts for the diff
+    summary.
+    """
+
+    def __init__(
+        self,
+        previous: PreviousRun,
+        *,
+        max_age: float,
+        options_key: str,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.previous = previous
+        self.max_age = max_age
+        self.options_key = options_key
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._seen: Set[str] = set()
+        self.counts: Dict[str, int] = {}
+        self.content_changed = 0
+
+    def _count(self, outcome: str, video_id: str) -> None:
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+            self._seen.add(video_id)
+
+    def check(
+        self, video_id: str, listing_signature: Callable[[str], Optional[str]]
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Returns (outcome, prior record); the record is only loaded for
+        UNCHANGED. `listing_signature(video_id)` is called only for records
+        that pass every other check.
+        """
+        entry = self.previous.get(video_id)
+        if entry is None:
+            outcome = NEW
+        elif entry.errored:
+            outcome = ERRORED
+        elif entry.created is None or self._clock() - entry.created > self.max_age:
+            outcome = STALE
+        elif entry.options_key != self.options_key:
+            outcome = OPTIONS_CHANGED
+        elif entry.signature is None:
+            outcome = UNSIGNED
+        elif listing_signature(video_id) != entry.signature:
+            outcome = LISTING_CHANGED
+        else:
+            outcome = UNCHANGED
+        self._count(outcome, video_id)
+        if outcome == UNCHANGED:
+            assert entry is not None
+            return outcome, self.previous.record(entry)
+        return outcome, None
+
+    def compare(self, video_id: str, item: Dict[str, Any]) -> None:
+        """
+        Note whether a re-fetched item's captions differ from the prior record.
+        """
+        entry = self.previous.get(video_id)
+        if entry is None or entry.errored or item.get("error") is not None:
+            return
+        if self.previous.record(entry).get("captions") != json.loads(json.dumps(item.get("captions"), default=_plain)):
+            with self._lock:
+                self.content_changed += 1
+
+    def summary(self) -> Dict[str, Any]:
+        counts = dict(self.counts)
+        unchanged = counts.pop(UNCHANGED, 0)
+        new = counts.pop(NEW, 0)
+        with self._lock:
+            removed = sum(1 for v in self.previous.video_ids() if v not in self._seen)
+        return {
+            "previous": len(self.previous),
+            "unchanged": unchanged,
+            "refetched": counts,
+            "new": new,
+            "removed": removed,
+            "contentChanged": self.content_changed,
+        }
@@ -1,100 +1,520 @@
 import argparse
+import itertools
 import json
 import logging
 import os
+import shutil
 import sys
 import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
 
 # Local imports
 try:
-    from extractors.youtube_client import YouTubeClient, parse_video_id
-    from extractors.captions_parser import (
-        CaptionFormat,
-        parse_captions_payload,
-        one_line_text,
+    from extractors.youtube_client import ALL_LANGUAGES, YouTubeClient, parse_video_id
+    from extractors.captions_parser import CaptionFormat, render_formats, tracks_from_item
+    from extractors.caption_track import CaptionTrack
+    from extractors.cache import TranscriptCache
+    from extractors.postprocess import MERGE_MODES, MERGE_OFF, PostProcessor
+    from extractors.sources import expand_sources
+    from extractors.transport import LiveTransport, RecordingTransport, ReplayTransport
+    from extractors.rate_limit import (
+        PERMANENT,
+        THROTTLED,
+        TRANSIENT,
+        AIMDLimiter,
+        RateController,
+        RetryPolicy,
+        TokenBucket,
+        classify_error,
     )
-    from extractors.xml_formatter import captions_to_xml
     from outputs.exporters import ExportCoordinator
+    from outputs.sharding import ShardPolicy
+    from pipeline.dead_letter import DEAD_LETTER_SUFFIX, DeadLetterQueue
+    from pipeline.executor import run_parallel
+    from pipeline.ingest import BloomFilter, SeenSet, read_lines
+    from pipeline.journal import JOURNAL_FILE, JobJournal, load_job_settings, save_job_settings
+    from pipeline.metrics import Metrics, MetricsReporter
+    from pipeline.partition import parse_shard, shard_of
+    from pipeline.profiling import StageProfiler
+    from pipeline.refresh import PreviousRun, Refresher, options_key
+    from search.index import IndexWriter
 except ImportError:
     # Support running via `python src/runner.py` from repo root
     sys.path.append(os.path.dirname(__file__))
-    from extractors.youtube_client import YouTubeClient, parse_video_id
-    from extractors.captions_parser import (
-        CaptionFormat,
-        parse_captions_payload,
-        one_line_text,
+    from extractors.youtube_client import ALL_LANGUAGES, YouTubeClient, parse_video_id
+    from extractors.captions_parser import CaptionFormat, render_formats, tracks_from_item
+    from extractors.caption_track import CaptionTrack
+    from extractors.cache import TranscriptCache
+    from extractors.postprocess import MERGE_MODES, MERGE_OFF, PostProcessor
+    from extractors.sources import expand_sources
+    from extractors.transport import LiveTransport, RecordingTransport, ReplayTransport
+    from extractors.rate_limit import (
+        PERMANENT,
+        THROTTLED,
+        TRANSIENT,
+        AIMDLimiter,
+        RateController,
+        RetryPolicy,
+        TokenBucket,
+        classify_error,
     )
-    from extractors.xml_formatter import captions_to_xml
     from outputs.exporters import ExportCoordinator
+    from outputs.sharding import ShardPolicy
+    from pipeline.dead_letter import DEAD_LETTER_SUFFIX, DeadLetterQueue
+    from pipeline.executor import run_parallel
+    from pipeline.ingest import BloomFilter, SeenSet, read_lines
+    from pipeline.journal import JOURNAL_FILE, JobJournal, load_job_settings, save_job_settings
+    from pipeline.metrics import Metrics, MetricsReporter
+    from pipeline.partition import parse_shard, shard_of
+    from pipeline.profiling import StageProfiler
+    from pipeline.refresh import PreviousRun, Refresher, options_key
+    from search.index import IndexWriter
 
 LOG = logging.getLogger("runner")
 
-def load_urls(urls_or_path: List[str]) -> List[str]:
+# Arguments that define a checkpointed job and are restored by --resume
+JOB_SETTINGS = (
+    "inputs",
+    "fmt",
+    "language",
+    "languages",
+    "no_metadata",
+    "export",
+    "shard",
+    "rotate_records",
+    "rotate_mb",
+    "compress",
+    "compress_level",
+    "index",
+    "since",
+    "max_age",
+    "bloom_capacity",
+    "bloom_error_rate",
+    "merge_overlaps",
+    "chunk_seconds",
+    "chunk_chars",
+)
+JOB_BASENAME = "youtube_transcripts"
+# Copy of stdin ("-") inputs kept in a job directory, so --resume reads them again
+JOB_STDIN = "stdin.txt"
+
+# One CaptionTrack, or {language: CaptionTrack} for --languages runs
+Segments = Union[None, CaptionTrack, Dict[str, CaptionTrack]]
+
+def load_urls(inputs: List[str]) -> Iterator[str]:
+    """
+    Lazily yields the input URLs. Each input is a URL, a path to a text file
+    with one URL per line (gzip'd or not), or "-" for stdin. A line holding a
+    JSON object (a dead-letter file, or a previous run's NDJSON output)
+    contributes its `videoUrl`; malformed ones are skipped with a warning.
+    Duplicates are dropped later, by video id, in
+    expand_sources.
+    """
+    for arg in inputs:
+        if arg != "-" and not os.path.exists(arg):
+            yield arg
+            continue
+        for line in read_lines(arg):
+            if line.startswith("{"):
+                try:
+                    url = json.loads(line).get("videoUrl")
+                except ValueError as e:
+                    # A truncated last line of an interrupted run, for instance
+                    LOG.warning("Skipping malformed JSON line in %s: %s (%.80s)", arg, e, line)
+                    continue
+                if url:
+                    yield url
+            else:
+                yield line
+
+def url_key(url: str) -> str:
+    """
+    Identity of an input in the job journal: its video id, or the raw URL when
+    no id can be parsed (those items still produce an INVALID_URL record).
+    """
+    return parse_video_id(url) or url
+
+def output_options_key(
+    *,
+    formats: List[str],
+    language: Optional[str],
+    languages: Optional[Union[str, List[str]]] = None,
+    metadata: bool = True,
+    postprocess: Optional[PostProcessor] = None,
+) -> str:
     """
-    Accepts list of URLs or a single file path. If a path is given and exists,
-    load line-separated URLs from it.
+    `optionsKey` of the records a run with these settings produces; `--since`
+    only reuses a previous record when its key matches.
     """
-    if len(urls_or_path) == 1 and os.path.exists(urls_or_path[0]):
-        path = urls_or_path[0]
-        with open(path, "r", encoding="utf-8") as f:
-            lines = [ln.strip() for ln in f.readlines()]
-        return [ln for ln in lines if ln]
-    # Otherwise treat them as URLs
-    return urls_or_path
+    clean = postprocess if postprocess is not None and postprocess.enabled else None
+    return options_key(
+        {
+            "formats": list(formats),
+            "language": language,
+            "languages": languages,
+            "metadata": metadata,
+            "merge": clean.merge if clean is not None else MERGE_OFF,
+            "chunkSeconds": clean.max_seconds if clean is not None else None,
+            "chunkChars": clean.max_chars if clean is not None else None,
+        }
+    )
 
 def build_item_schema(
     *,
     video_id: str,
     video_url: str,
     meta: Dict[str, Any],
-    language: Optional[str],
-    has_auto: Optional[bool],
-    caption_format: str,
+    language: Union[None, str, List[str]],
+    has_auto: Union[None, bool, Dict[str, bool]],
+    caption_format: Union[str, List[str]],
     captions_payload: Any,
     error: Optional[str],
+    input_index: Optional[int] = None,
+    listing_signature: Optional[str] = None,
+    error_kind: Optional[str] = None,
+    options_key: Optional[str] = None,
 ) -> Dict[str, Any]:
     created_at = datetime.utcnow().isoformat() + "Z"
     return {
         "videoId": video_id,
         "videoUrl": video_url,
+        "inputIndex": input_index,
         "title": meta.get("title"),
         "channelId": meta.get("channel_id"),
         "channelName": meta.get("uploader"),
         "language": language,
         "hasAutoCaptions": has_auto,
+        "listingSignature": listing_signature,
         "captionFormat": caption_format,
+        "optionsKey": options_key,
         "captions": captions_payload if error is None else None,
         "duration": meta.get("duration"),
         "publishedAt": meta.get("upload_date_iso"),
         "thumbnailUrl": meta.get("thumbnail"),
         "requestedFormat": caption_format,
         "error": error,
+        "errorKind": error_kind,
         "createdAt": created_at,
     }
 
+def process_url(
+    yt: YouTubeClient,
+    url: str,
+    *,
+    formats: List[str],
+    language: Optional[str],
+    languages: Optional[Union[str, List[str]]] = None,
+    index: Optional[int] = None,
+    metadata: bool = True,
+    postprocess: Optional[PostProcessor] = None,
+) -> Tuple[Dict[str, Any], Segments]:
+    """
+    Fetch metadata and captions for a single URL and build its output item.
+    Every requested format is rendered from the one fetch; with several formats
+    `captions` maps format -> payload. Returns (item, segments), where segments
+    is the normalized CaptionTrack (None on failure) for segment-level exports.
+    With `languages` (a list, or "all"), the video is listed once and every
+    available requested track is fetched: `captions` and `hasAutoCaptions` are
+    then keyed by language, `language` lists the languages returned, and
+    segments is a {language: CaptionTrack} dict.
+    Never raises: failures are reported through the item's `error` field, and
+    `errorKind` says whether retrying could help (permanent, transient or
+    throttled).
+    `index` is the URL's position in the full input list (`inputIndex`), which
+    lets merge.py put sharded outputs back in input order. With `metadata`
+    False the yt-dlp lookup is skipped and metadata fields stay null.
+    `listingSignature` fingerprints the transcript listing the captions came
+    from and `optionsKey` the settings above, so a later `--since` run can
+    tell whether the video or the options changed.
+    `postprocess` (overlap removal, re-chunking) runs on every fetched track
+    before it is rendered; segments are returned post-processed.
+    """
+    caption_format: Union[str, List[str]] = formats[0] if len(formats) == 1 else list(formats)
+    key = output_options_key(
+        formats=formats, language=language, languages=languages, metadata=metadata, postprocess=postprocess
+    )
+    metrics: Optional[Metrics] = yt.metrics
+    start_t = time.time()
+    vid = parse_video_id(url)
+    if not vid:
+        LOG.warning("Unable to parse video id from URL: %s", url)
+        if metrics is not None:
+            metrics.inc("items", status="error")
+            metrics.inc("errors", error_class="InvalidURL")
+        return build_item_schema(
+            video_id="",
+            video_url=url,
+            meta={},
+            language=None,
+            has_auto=None,
+            caption_format=caption_format,
+            captions_payload=None,
+            error="INVALID_URL",
+            input_index=index,
+            error_kind=PERMANENT,
+            options_key=key,
+        ), None
+
+    meta: Dict[str, Any] = {}
+    if metadata:
+        try:
+            meta = yt.video_metadata(vid)
+        except Exception as e:  # noqa: BLE001
+            LOG.exception("Metadata fetch failed for %s: %s", vid, e)
+
+    def render(track: CaptionTrack) -> Any:
+        if metrics is not None:
+            with metrics.stage("format"):
+                rendered = render_formats(track, formats)
+        else:
+            rendered = render_formats(track, formats)
+        return rendered[formats[0]] if len(formats) == 1 else rendered
+
+    def clean(track: CaptionTrack, is_auto: bool) -> CaptionTrack:
+        if postprocess is None or not postprocess.enabled:
+            return track
+        if metrics is not None:
+            with metrics.stage("postprocess"):
+                return postprocess(track, is_auto)
+        return postprocess(track, is_auto)
+
+    captions: Segments = None
+    lang: Any
+    auto: Any
+    try:
+        if languages:
+            tracks = yt.fetch_caption_tracks(vid, languages)
+            if not tracks:
+                wanted = "any language" if languages == ALL_LANGUAGES else ", ".join(languages)
+                raise LookupError(f"No transcripts available for {wanted}")
+            LOG.debug("Fetched %d caption tracks for %s", len(tracks), vid)
+            captions = {code: clean(track, is_auto) for code, (track, is_auto) in tracks.items()}
+            payload: Any = {code: render(track) for code, track in captions.items()}
+            lang = list(tracks)
+            auto = {code: is_auto for code, (_, is_auto) in tracks.items()}
+        else:
+            captions, lang, auto = yt.fetch_captions(vid, preferred_lang=language)
+            LOG.debug("Fetched %d caption segments for %s", len(captions), vid)
+            captions = clean(captions, bool(auto))
+            payload = render(captions)
+        item = build_item_schema(
+            video_id=vid,
+            video_url=url,
+            meta=meta,
+            language=lang,
+            has_auto=auto,
+            caption_format=caption_format,
+            captions_payload=payload,
+            error=None,
+            input_index=index,
+            listing_signature=yt.listing_signature(vid),
+            options_key=key,
+        )
+        if metrics is not None:
+            metrics.inc("items", status="ok")
+    except Exception as e:  # noqa: BLE001
+        LOG.exception("Caption extraction failed for %s: %s", vid, e)
+        if metrics is not None:
+            metrics.inc("items", status="error")
+            metrics.inc("errors", error_class=type(e).__name__)
+        captions = None
+        item = build_item_schema(
+            video_id=vid,
+            video_url=url,
+            meta=meta,
+            language=None,
+            has_auto=None,
+            caption_format=caption_format,
+            captions_payload=None,
+            error=str(e),
+            input_index=index,
+            error_kind=classify_error(e),
+            options_key=key,
+        )
+    finally:
+        dur = time.time() - start_t
+        LOG.info("Processed %s in %.2fs", vid or url, dur)
+        if metrics is not None:
+            metrics.observe("video", dur)
+    return item, captions
+
+def segments_from_item(item: Dict[str, Any]) -> Segments:
+    """
+    Segments of a record copied from a previous run, when it was exported with
+    timestamps (otherwise None: segment tables and the index skip it).
+    """
+    tracks = dict(tracks_from_item(item))
+    if isinstance(item.get("language"), list):
+        return tracks or None
+    return next(iter(tracks.values()), None)
+
+def parse_formats(value: str) -> List[str]:
+    formats = []
+    for fmt in value.split(","):
+        fmt = fmt.strip()
+        if fmt not in CaptionFormat.ALL:
+            raise argparse.ArgumentTypeError(f"invalid caption format: {fmt!r}")
+        if fmt not in formats:
+            formats.append(fmt)
+    if not formats:
+        raise argparse.ArgumentTypeError("no caption format given")
+    return formats
+
+def shard_arg(value: str) -> Tuple[int, int]:
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+def parse_languages(value: str) -> Union[str, List[str]]:
+    if value.strip().lower() == ALL_LANGUAGES:
+        return ALL_LANGUAGES
+    languages = []
+    for lang in value.split(","):
+        lang = lang.strip()
+        if lang and lang not in languages:
+            languages.append(lang)
+    if not languages:
+        raise argparse.ArgumentTypeError("no language given")
+    return languages
+
+def add_client_arguments(p: argparse.ArgumentParser) -> None:
+    """
+    Options that shape the YouTubeClient (concurrency, rate limiting, retries,
+    cache, record/replay transport); shared with the long-running service.
+    """
+    p.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of worker threads fetching videos in parallel.",
+    )
+    p.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="Maximum upstream requests per second across all workers (unlimited when omitted).",
+    )
+    p.add_argument(
+        "--latency-target",
+        type=float,
+        default=None,
+        help="Seconds; slower responses shrink the in-flight window like throttling does.",
+    )
+    p.add_argument(
+        "--caption-retries",
+        type=int,
+        default=4,
+        help="Attempts per transcript request on throttling/network errors.",
+    )
+    p.add_argument(
+        "--metadata-retries",
+        type=int,
+        default=2,
+        help="Attempts per yt-dlp metadata request on throttling/network errors.",
+    )
+    p.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for the on-disk transcript/metadata cache (disabled when omitted).",
+    )
+    p.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=7 * 24,
+        help="Hours a cached entry stays valid.",
+    )
+    p.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=512,
+        help="Size cap for the cache; least recently used entries are evicted beyond it.",
+    )
+    replay = p.add_mutually_exclusive_group()
+    replay.add_argument(
+        "--record",
+        default=None,
+        metavar="DIR",
+        help="Save every upstream response (listings, transcripts, yt-dlp info) as replay fixtures in DIR.",
+    )
+    replay.add_argument(
+        "--replay",
+        default=None,
+        metavar="DIR",
+        help="Serve upstream requests from fixtures in DIR (see --record) instead of the network.",
+    )
+    p.add_argument(
+        "--replay-latency",
+        type=float,
+        default=0.0,
+        help="Seconds of synthetic latency per replayed request (mean, +-50%% jitter).",
+    )
+    p.add_argument(
+        "--replay-error-rate",
+        type=float,
+        default=0.0,
+        help="Chance that a replayed request fails with a connection reset.",
+    )
+    p.add_argument(
+        "--replay-throttle-rate",
+        type=float,
+        default=0.0,
+        help="Chance that a replayed request fails with a 429.",
+    )
+
+def build_client(args: argparse.Namespace) -> YouTubeClient:
+    cache = None
+    if args.cache_dir:
+        os.makedirs(args.cache_dir, exist_ok=True)
+        cache = TranscriptCache(
+            args.cache_dir,
+            ttl_seconds=args.cache_ttl * 3600,
+            max_bytes=args.cache_max_mb * 1024 * 1024,
+        )
+    rate = RateController(
+        limiter=AIMDLimiter(
+            args.concurrency, maximum=args.concurrency, latency_target=args.latency_target
+        ),
+        bucket=TokenBucket(args.rate_limit) if args.rate_limit else None,
+        retries={
+            "captions": RetryPolicy(attempts=args.caption_retries),
+            "metadata": RetryPolicy(attempts=args.metadata_retries),
+        },
+    )
+    transport: Any = LiveTransport()
+    if args.record:
+        transport = RecordingTransport(transport, args.record)
+    elif args.replay:
+        transport = ReplayTransport(
+            args.replay,
+            latency=args.replay_latency,
+            error_rate=args.replay_error_rate,
+            throttle_rate=args.replay_throttle_rate,
+        )
+    return YouTubeClient(cache=cache, rate=rate, metrics=Metrics(), transport=transport)
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(
         description="Extract structured YouTube transcripts at scale."
     )
     p.add_argument(
         "inputs",
-        nargs="+",
-        help="One or more YouTube URLs or a single path to a text file with URLs (one per line).",
+        nargs="*",
+        help=(
+            "YouTube URLs, and/or paths to text files with one URL per line (optionally gzip'd), "
+            "or - to read them from stdin."
+        ),
     )
     p.add_argument(
         "--format",
         dest="fmt",
-        default="array_with_timestamps",
-        choices=[
-            "array",
-            "array_with_timestamps",
-            "xml",
-            "xml_with_timestamps",
-            "one_line_text",
-        ],
-        help="Output caption format.",
+        default=[CaptionFormat.ARRAY_TS],
+        type=parse_formats,
+        help=(
+            "Output caption format, or a comma-separated list rendered from a single fetch "
+            f"({', '.join(CaptionFormat.ALL)})."
+        ),
     )
     p.add_argument(
         "--language",
@@ -103,10 +523,68 @@ def parse_args() -> argparse.Namespace:
         help="Preferred language code (e.g., en). If not available, falls back to first available.",
     )
     p.add_argument(
-        "--concurrency",
+        "--languages",
+        type=parse_languages,
+        default=None,
+        help=(
+            "Comma-separated languages (e.g. en,es,de) or 'all': list each video once, fetch every "
+            "available requested track concurrently and key captions by language. Overrides --language."
+        ),
+    )
+    p.add_argument(
+        "--no-metadata",
+        action="store_true",
+        help="Skip the yt-dlp metadata lookup (title, channel, duration, ...); captions only.",
+    )
+    p.add_argument(
+        "--merge-overlaps",
+        choices=MERGE_MODES,
+        default=MERGE_OFF,
+        help=(
+            "Remove the rolling, overlapping fragments of auto-generated captions (auto), of every "
+            "track (all), or not at all (off)."
+        ),
+    )
+    p.add_argument(
+        "--chunk-seconds",
+        type=float,
+        default=None,
+        help="Re-chunk captions into windows of at most this many seconds.",
+    )
+    p.add_argument(
+        "--chunk-chars",
         type=int,
-        default=4,
-        help="Number of concurrent fetches (used for batching, not threads).",
+        default=None,
+        help="Re-chunk captions into windows of at most this many characters.",
+    )
+    add_client_arguments(p)
+    p.add_argument(
+        "--completion-order",
+        action="store_true",
+        help="Emit items as they finish instead of in input order.",
+    )
+    p.add_argument(
+        "--shard",
+        type=shard_arg,
+        default=None,
+        metavar="I/N",
+        help="Only process the inputs of shard I out of N (0-based), chosen by a stable hash of the video id.",
+    )
+    p.add_argument(
+        "--bloom-capacity",
+        type=int,
+        default=None,
+        metavar="N",
+        help=(
+            "Drop duplicate inputs with a Bloom filter sized for N distinct videos instead of an exact "
+            "set, for inputs of tens of millions of lines; a few in a million new videos may be skipped."
+        ),
+    )
+    p.add_argument(
+        "--bloom-error-rate",
+        type=float,
+        default=1e-6,
+        help="False-positive rate of the --bloom-capacity filter.",
     )
     p.add_argument(
         "--out",
@@ -118,8 +596,96 @@ def parse_args() -> argparse.Namespace:
         "--export",
         dest="export",
         default="json",
-        choices=["json", "csv", "ndjson", "all"],
-        help="Export format(s).",
+        choices=["json", "csv", "ndjson", "parquet", "arrow", "all"],
+        help="Export format(s). parquet/arrow write a per-video and a per-segment table (needs pyarrow).",
+    )
+    p.add_argument(
+        "--rotate-records",
+        type=int,
+        default=None,
+        help="Start a new JSON/CSV/NDJSON shard after this many records (writes a manifest).",
+    )
+    p.add_argument(
+        "--rotate-mb",
+        type=float,
+        default=None,
+        help="Start a new shard once the current one reaches this size on disk.",
+    )
+    p.add_argument(
+        "--compress",
+        default=None,
+        choices=["gzip", "zstd"],
+        help="Compress JSON/CSV/NDJSON outputs while streaming (zstd needs the zstandard package).",
+    )
+    p.add_argument(
+        "--compress-level",
+        type=int,
+        default=None,
+        help="Compression level (gzip 1-9, default 6; zstd 1-22, default 3).",
+    )
+    p.add_argument(
+        "--index",
+        metavar="DIR",
+        default=None,
+        help="Append caption segments to the inverted index in DIR (see search_index.py); one writer at a time.",
+    )
+    p.add_argument(
+        "--since",
+        metavar="NDJSON",
+        default=None,
+        help="Refresh against a previous run's NDJSON output: unchanged records are copied without fetching.",
+    )
+    p.add_argument(
+        "--max-age",
+        type=float,
+        default=30.0,
+        help="With --since, re-fetch records older than this many days (by createdAt).",
+    )
+    p.add_argument(
+        "--retry-delay",
+        type=float,
+        default=30.0,
+        help="Seconds to wait before the end-of-run retry pass over transient failures; negative disables the pass.",
+    )
+    p.add_argument(
+        "--retry-concurrency",
+        type=int,
+        default=None,
+        help="Workers for the retry pass (default: a quarter of --concurrency).",
+    )
+    p.add_argument(
+        "--job-dir",
+        default=None,
+        help=(
+            "Run as a checkpointed job: outputs and a progress journal go to this directory (overrides --out). "
+            "Stdin input is copied into it first, so that a resumed job reads the same URLs."
+        ),
+    )
+    p.add_argument(
+        "--resume",
+        metavar="JOBDIR",
+        default=None,
+        help="Resume the job in JOBDIR, skipping completed items and appending to its outputs.",
+    )
+    p.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between refreshes of the metrics summary (JSON) and Prometheus textfile; 0 writes them only at the end.",
+    )
+    p.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Profile a sample of each pipeline stage's calls with cProfile and tracemalloc; writes "
+            "<base>_profile_<stage>.pstats files and a <base>_profile.txt report to the output directory."
+        ),
+    )
+    p.add_argument(
+        "--profile-sample",
+        type=float,
+        default=0.01,
+        help="Fraction of stage calls profiled with --profile (1 profiles every call).",
     )
     p.add_argument(
         "--log-level",
@@ -127,7 +693,18 @@ def parse_args() -> argparse.Namespace:
         choices=["DEBUG", "INFO", "WARNING", "ERROR"],
         help="Logging level.",
     )
-    return p.parse_args()
+    args = p.parse_args()
+    if not args.inputs and not args.resume:
+        p.error("at least one input URL or file is required")
+    if args.since and not (args.since.endswith(".ndjson") and os.path.isfile(args.since)):
+        p.error("--since needs a previous run's (uncompressed) .ndjson output")
+    if (args.chunk_seconds is not None and args.chunk_seconds <= 0) or (
+        args.chunk_chars is not None and args.chunk_chars <= 0
+    ):
+        p.error("--chunk-seconds and --chunk-chars must be positive")
+    if not 0 < args.profile_sample <= 1:
+        p.error("--profile-sample must be in (0, 1]")
+    return args
 
 def main() -> None:
     args = parse_args()
@@ -135,100 +712,252 @@ def main() -> None:
         level=getattr(logging, args.log_level),
         format="%(asctime)s %(levelname)s %(name)s: %(message)s",
     )
-    os.makedirs(args.outdir, exist_ok=True)
+
+    journal: Optional[JobJournal] = None
+    jobdir = args.resume or args.job_dir
+    if args.resume:
+        for key, value in load_job_settings(args.resume).items():
+            if key in JOB_SETTINGS:
+                setattr(args, key, value)
+        if isinstance(args.fmt, str):
+            args.fmt = parse_formats(args.fmt)
+        if args.shard is not None:
+            args.shard = tuple(args.shard)
+    elif args.job_dir:
+        if os.path.exists(os.path.join(args.job_dir, JOURNAL_FILE)):
+            LOG.error("%s already contains a job; use --resume to continue it.", args.job_dir)
+            sys.exit(2)
+        if "-" in args.inputs:
+            spool = os.path.join(args.job_dir, JOB_STDIN)
+            os.makedirs(args.job_dir, exist_ok=True)
+            with open(spool, "wb") as f:
+                shutil.copyfileobj(sys.stdin.buffer, f)
+            args.inputs = [spool if p == "-" else p for p in args.inputs]
+        args.inputs = [os.path.abspath(p) if os.path.exists(p) else p for p in args.inputs]
+        args.since = os.path.abspath(args.since) if args.since else None
+        args.index = os.path.abspath(args.index) if args.index else None
+        save_job_settings(args.job_dir, {k: getattr(args, k) for k in JOB_SETTINGS})
 
     urls = load_urls(args.inputs)
-    if not urls:
+    first = next(urls, None)
+    if first is None:
         LOG.error("No input URLs found.")
         sys.exit(2)
+    urls = itertools.chain([first], urls)
 
-    yt = YouTubeClient()
-    results: List[Dict[str, Any]] = []
-
-    # Simple batching to keep memory reasonable and allow progress
-    batch_size = max(1, args.concurrency)
-    caption_format = args.fmt
-
-    for i in range(0, len(urls), batch_size):
-        batch = urls[i : i + batch_size]
-        LOG.info("Processing batch %d..%d / %d", i + 1, i + len(batch), len(urls))
-        for url in batch:
-            start_t = time.time()
-            vid = parse_video_id(url)
-            if not vid:
-                LOG.warning("Unable to parse video id from URL: %s", url)
-                item = build_item_schema(
-                    video_id="",
-                    video_url=url,
-                    meta={},
-                    language=None,
-                    has_auto=None,
-                    caption_format=caption_format,
-                    captions_payload=None,
-                    error="INVALID_URL",
-                )
-                results.append(item)
-                continue
-
-            try:
-                meta = yt.video_metadata(vid)
-            except Exception as e:  # noqa: BLE001
-                LOG.exception("Metadata fetch failed for %s: %s", vid, e)
-                meta = {}
-
-            try:
-                captions, lang, auto = yt.fetch_captions(vid, preferred_lang=args.language)
-                LOG.debug("Fetched %d caption segments for %s", len(captions or []), vid)
-                payload: Any
-                if caption_format in (CaptionFormat.XML, CaptionFormat.XML_TS):
-                    payload = captions_to_xml(captions or [], with_timestamps=(caption_format == CaptionFormat.XML_TS))
-                elif caption_format == CaptionFormat.ONE_LINE:
-                    payload = one_line_text(captions or [])
-                else:
-                    payload = parse_captions_payload(captions or [], caption_format)
-                item = build_item_schema(
-                    video_id=vid,
-                    video_url=url,
-                    meta=meta,
-                    language=lang,
-                    has_auto=auto,
-                    caption_format=caption_format,
-                    captions_payload=payload,
-                    error=None,
-                )
-            except Exception as e:  # noqa: BLE001
-                LOG.exception("Caption extraction failed for %s: %s", vid, e)
-                item = build_item_schema(
-                    video_id=vid,
-                    video_url=url,
-                    meta=meta,
-                    language=None,
-                    has_auto=None,
-                    caption_format=caption_format,
-                    captions_payload=None,
-                    error=str(e),
-                )
-            finally:
-                dur = time.time() - start_t
-                LOG.info("Processed %s in %.2fs", vid or url, dur)
-            results.append(item)
-
-    # Export
-    basename = f"youtube_transcripts_{int(time.time())}"
-    export = ExportCoordinator(outdir=args.outdir, basename=basename)
-    if args.export in ("json", "all"):
-        export.write_json(results)
-    if args.export in ("csv", "all"):
-        export.write_csv(results)
-    if args.export in ("ndjson", "all"):
-        export.write_ndjson(results)
+    if jobdir:
+        journal = JobJournal(jobdir)
+        outdir, basename = jobdir, JOB_BASENAME
+        if journal.complete:
+            LOG.info("Job in %s is already complete; nothing to resume.", jobdir)
+            journal.close()
+            return
+        if journal.done:
+            LOG.info("Resuming: %d items already done", len(journal.done))
+    else:
+        outdir, basename = args.outdir, f"{JOB_BASENAME}_{int(time.time())}"
+        if args.shard is not None:
+            basename += "_shard{}of{}".format(*args.shard)
 
+    yt = build_client(args)
+    cache, rate, metrics = yt.cache, yt.rate, yt.metrics
+    if args.profile:
+        metrics.profiler = StageProfiler(sample=args.profile_sample)
+
+    # (position in the expanded input list, url); positions survive sharding and
+    # resume as long as the inputs (and the playlists they name) are unchanged.
+    # Playlists and channels are expanded page by page as the pool pulls work.
+    seen: Any = SeenSet()
+    if args.bloom_capacity:
+        seen = BloomFilter(args.bloom_capacity, args.bloom_error_rate)
+    work: Iterator[Tuple[int, str]] = enumerate(expand_sources(urls, yt, seen))
+    if args.shard is not None:
+        shard_index, shard_count = args.shard
+        work = ((i, u) for i, u in work if shard_of(url_key(u), shard_count) == shard_index)
+        LOG.info("Shard %d/%d of the inputs", shard_index, shard_count)
+    if journal is not None and journal.done:
+        done_keys = journal.done
+        work = ((i, u) for i, u in work if url_key(u) not in done_keys)
+
+    # Items stream straight from the worker pool into the writers, so memory is
+    # bounded by in-flight items rather than job size.
+    export = ExportCoordinator(outdir=outdir, basename=basename)
+    kinds = ["json", "csv", "ndjson"] if args.export == "all" else [args.export]
     # Also drop a compact JSON for quick inspection
-    compact_path = os.path.join(args.outdir, f"{basename}_compact.json")
-    with open(compact_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    kinds.append("compact_json")
+    shards = None
+    if args.rotate_records or args.rotate_mb or args.compress:
+        shards = ShardPolicy(
+            max_records=args.rotate_records,
+            max_bytes=int(args.rotate_mb * 1024 * 1024) if args.rotate_mb else None,
+            compression=args.compress,
+            level=args.compress_level,
+        )
+
+    def collect(m: Metrics) -> None:
+        for key, value in rate.stats.items():
+            m.set("upstream_calls", value, outcome=key)
+        m.set("concurrency_limit", rate.limiter.limit)
+        if cache is not None:
+            for key, value in cache.stats().items():
+                m.set("cache", value, stat=key)
+
+    reporter = MetricsReporter(
+        metrics, os.path.join(outdir, basename), interval=args.metrics_interval, collect=collect
+    )
+
+    # The index is flushed before each journal commit, so it always covers the
+    # committed items; items redone after a crash are superseded, not duplicated.
+    index = IndexWriter(args.index) if args.index else None
+
+    postprocess = PostProcessor(
+        merge=args.merge_overlaps, max_seconds=args.chunk_seconds, max_chars=args.chunk_chars
+    )
+
+    # With --since, records that errored, aged out, were made with other
+    # options or whose transcript listing changed are re-fetched; the rest are
+    # copied from the previous output after a single listing call.
+    refresher: Optional[Refresher] = None
+    if args.since:
+        refresher = Refresher(
+            PreviousRun(args.since),
+            max_age=args.max_age * 86400,
+            options_key=output_options_key(
+                formats=args.fmt,
+                language=args.language,
+                languages=args.languages,
+                metadata=not args.no_metadata,
+                postprocess=postprocess,
+            ),
+        )
+        LOG.info("Loaded %d records from %s", len(refresher.previous), args.since)
+
+    def fetch(entry: Tuple[int, str]) -> Tuple[Dict[str, Any], Segments]:
+        index, url = entry
+        item, segments = process_url(
+            yt,
+            url,
+            formats=args.fmt,
+            language=args.language,
+            languages=args.languages,
+            index=index,
+            metadata=not args.no_metadata,
+            postprocess=postprocess,
+        )
+        if refresher is not None and item["videoId"]:
+            refresher.compare(item["videoId"], item)
+        return item, segments
 
-    LOG.info("Done. Wrote outputs to %s", os.path.abspath(args.outdir))
+    def worker(entry: Tuple[int, str]) -> Tuple[Dict[str, Any], Segments]:
+        index, url = entry
+        vid = parse_video_id(url)
+        if refresher is not None and vid:
+            outcome, prior = refresher.check(vid, lambda v: yt.listing_signature(v, refresh=True))
+            metrics.inc("refresh", outcome=outcome)
+            if prior is not None:
+                return dict(prior, inputIndex=index, videoUrl=url), segments_from_item(prior)
+        return fetch(entry)
+
+    # Transient and throttled failures go to the dead-letter file instead of
+    # the outputs; a slower pass at the end retries them once and writes the
+    # results (appended after the in-order records). What still fails stays in
+    # the dead-letter file, which later runs accept as input.
+    dead_letters = DeadLetterQueue(os.path.join(outdir, basename + DEAD_LETTER_SUFFIX))
+    hold_back = args.retry_delay >= 0
+
+    def retryable(item: Dict[str, Any]) -> bool:
+        return item.get("errorKind") in (TRANSIENT, THROTTLED)
+
+    progress_every = max(1, args.concurrency)
+    done = 0
+    resume_offsets = journal.offsets if journal is not None and args.resume else None
+    with export.open_stream(kinds, resume_offsets=resume_offsets, shards=shards) as stream:
+
+        def emit(item: Dict[str, Any], segments: Segments) -> None:
+            nonlocal done
+            with metrics.stage("export"):
+                stream.write(item, segments)
+            if index is not None:
+                with metrics.stage("index"):
+                    index.add_item(item, segments)
+            if journal is not None:
+                journal.mark_done(item["videoId"] or item["videoUrl"])
+                if journal.sync_due():
+                    if index is not None:
+                        index.flush()
+                    journal.commit(stream.sync())
+            done += 1
+            if done % progress_every == 0:
+                LOG.info("Progress %d", done)
+            reporter.maybe_write()
+
+        for item, segments in run_parallel(
+            worker, work, workers=args.concurrency, ordered=not args.completion_order
+        ):
+            if retryable(item):
+                dead_letters.add(item)
+                metrics.inc("dead_letters", error_kind=item["errorKind"])
+                if hold_back:
+                    continue
+            emit(item, segments)
+
+        if hold_back and dead_letters.count:
+            entries = dead_letters.drain()
+            workers = args.retry_concurrency or max(1, args.concurrency // 4)
+            LOG.info(
+                "Retrying %d transient failures in %.0fs with %d workers", len(entries), args.retry_delay, workers
+            )
+            time.sleep(args.retry_delay)
+            attempts = {e["inputIndex"]: e.get("attempts", 1) for e in entries}
+            for item, segments in run_parallel(
+                fetch, [(e["inputIndex"], e["videoUrl"]) for e in entries], workers=workers
+            ):
+                if retryable(item):
+                    dead_letters.add(item, attempts=attempts[item["inputIndex"]] + 1)
+                metrics.inc("dead_letter_retries", outcome="failed" if retryable(item) else "resolved")
+                emit(item, segments)
+        dead_letters.close()
+        if dead_letters.count:
+            LOG.warning("%d items still failing; see %s", dead_letters.count, dead_letters.path)
+
+        if index is not None:
+            index.close()
+        if journal is not None:
+            journal.commit(stream.sync())
+    if journal is not None:
+        # Only after close() has finalized the outputs
+        journal.mark_complete()
+        journal.close()
+
+    yt.close()
+    reporter.write(final=True)
+    if metrics.profiler is not None:
+        LOG.info("Stage profile: %s", metrics.profiler.write(os.path.join(outdir, basename)))
+    if refresher is not None:
+        refresher.previous.close()
+        diff = refresher.summary()
+        with open(os.path.join(outdir, f"{basename}_diff.json"), "w", encoding="utf-8") as f:
+            json.dump(diff, f, indent=2)
+        LOG.info(
+            "Refresh: %d unchanged, %d re-fetched %s, %d new, %d removed, %d with changed captions",
+            diff["unchanged"],
+            sum(diff["refetched"].values()),
+            diff["refetched"],
+            diff["new"],
+            diff["removed"],
+            diff["contentChanged"],
+        )
+    LOG.info(
+        "Upstream: %(calls)d calls, %(retries)d retries, %(throttled)d throttled, %(gave_up)d gave up",
+        rate.stats,
+    )
+    if cache is not None:
+        LOG.info(
+            "Cache: %(hits)d hits, %(misses)d misses, %(evictions)d evictions, %(bytes)d bytes stored",
+            cache.stats(),
+        )
+        cache.close()
+    LOG.info("Done: %d items. Wrote outputs to %s", done, os.path.abspath(outdir))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,445 @@
+from __future__ import annotations
+
+import heapq
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# On-disk layout of an index directory:
+#
+#   manifest.json       {"version": 1, "segments": ["seg-00000", ...], (append order)
+#                        "tiers": {"seg-00000": merge generation, ...}}
+#   seg-NNNNN/docs.json [[videoId, language], ...]; a doc id is a position here
+#   seg-NNNNN/lexicon.bin
+#       header  "YTIX" u32 version, u32 term count, u32 reserved
+#       entries term count x (u64 term offset, u32 term length, u32 doc freq,
+#               u64 postings offset), sorted by UTF-8 term bytes
+#       blob    the term bytes
+#   seg-NNNNN/postings.bin
+#       per term, per doc: varint doc-id delta, varint occurrence count, then
+#       per occurrence: varint token-position delta, varint segment-idx delta,
+#       zigzag varint start-ms delta (deltas restart for every doc)
+#
+# Fixed-width lexicon entries allow binary search straight off an mmap;
+# postings are only decoded for the terms a query touches.
+
+MAGIC = b"YTIX"
+VERSION = 1
+MANIFEST = "manifest.json"
+_HEADER = struct.Struct("<4sIII")
+_ENTRY = struct.Struct("<QIIQ")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: str) -> List[str]:
+    return [t.lower() for t in _TOKEN_RE.findall(text)]
+
+def _varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(buf: Any, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+Occurrence = Tuple[int, int, int]  # (token position, segment idx, start ms)
+
+def encode_doc(out: bytearray, doc_delta: int, occurrences: List[Occurrence]) -> None:
+    _varint(out, doc_delta)
+    _varint(out, len(occurrences))
+    last_pos = last_seg = last_ms = 0
+    for pos, seg, ms in occurrences:
+        _varint(out, pos - last_pos)
+        _varint(out, seg - last_seg)
+        _varint(out, _zigzag(ms - last_ms))
+        last_pos, last_seg, last_ms = pos, seg, ms
+
+def decode_postings(buf: Any, start: int, end: int) -> Iterator[Tuple[int, List[Occurrence]]]:
+    pos = start
+    doc = 0
+    while pos < end:
+        delta, pos = _read_varint(buf, pos)
+        doc += delta
+        count, pos = _read_varint(buf, pos)
+        occurrences = []
+        p = s = ms = 0
+        for _ in range(count):
+            d, pos = _read_varint(buf, pos)
+            p += d
+            d, pos = _read_varint(buf, pos)
+            s += d
+            d, pos = _read_varint(buf, pos)
+            ms += _unzigzag(d)
+            occurrences.append((p, s, ms))
+        yield doc, occurrences
+
+def _read_manifest(directory: str) -> List[str]:
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["segments"]
+
+def _read_tiers(directory: str) -> Dict[str, int]:
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        # Indexes written before tiers were recorded count as fresh flushes
+        return json.load(f).get("tiers", {})
+
+def _write_manifest(directory: str, segments: List[str], tiers: Dict[str, int]) -> None:
+    tmp = os.path.join(directory, MANIFEST + ".tmp")
+    tiers = {name: tiers.get(name, 0) for name in segments}
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": VERSION, "segments": segments, "tiers": tiers}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(directory, MANIFEST))
+
+def _write_segment(path: str, docs: List[List[str]], postings: Iterable[Tuple[bytes, int, bytes]]) -> None:
+    """
+    `postings` yields (term bytes, doc freq, encoded postings) in term order.
+    """
+    os.makedirs(path, exist_ok=True)
+    entries = []
+    blob = bytearray()
+    with open(os.path.join(path, "postings.bin"), "wb") as f:
+        offset = 0
+        for term, df, data in postings:
+            entries.append(_ENTRY.pack(len(blob), len(term), df, offset))
+            blob += term
+            f.write(data)
+            offset += len(data)
+        f.flush()
+        os.fsync(f.fileno())
+    with open(os.path.join(path, "lexicon.bin"), "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(entries), 0))
+        f.writelines(entries)
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    with open(os.path.join(path, "docs.json"), "w", encoding="utf-8") as f:
+        json.dump(docs, f, ensure_ascii=False)
+
+class IndexWriter:
+    """
+    Buffers documents (one caption track each) as per-term encoded postings
+    and writes them out as a new immutable segment on `flush()`.
+    A video indexed again in a later segment supersedes its older copy.
+    Frequent flushes (one per job checkpoint) would pile up small segments,
+    so `flush()` also merges tiers like a counter in base `merge_factor`:
+    flushed segments are tier 0, and once the newest `merge_factor` segments
+    share a tier they are merged into one of the next tier. A doc is
+    rewritten once per tier it climbs, and there are at most
+    `merge_factor - 1` segments per tier. `close()` compacts the index fully
+    once it has more than `compact_after` segments.
+    """
+
+    def __init__(
+        self, directory: str, *, max_docs: int = 50_000, compact_after: int = 16, merge_factor: int = 8
+    ) -> None:
+        if merge_factor < 2:
+            raise ValueError("merge_factor must be at least 2")
+        self.directory = directory
+        self.max_docs = max_docs
+        self.compact_after = compact_after
+        self.merge_factor = merge_factor
+        os.makedirs(directory, exist_ok=True)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._docs: List[List[str]] = []
+        self._postings: Dict[str, bytearray] = {}
+        self._last_doc: Dict[str, int] = {}
+        self._df: Dict[str, int] = {}
+
+    def add(self, video_id: str, language: Optional[str], track: Any) -> None:
+        doc = len(self._docs)
+        self._docs.append([video_id, language or ""])
+        occurrences: Dict[str, List[Occurrence]] = {}
+        position = 0
+        for idx, (start, text) in enumerate(zip(track.starts, track.texts())):
+            ms = int(round(start * 1000))
+            for term in tokenize(text):
+                occurrences.setdefault(term, []).append((position, idx, ms))
+                position += 1
+        for term, occ in occurrences.items():
+            buf = self._postings.get(term)
+            if buf is None:
+                buf = self._postings[term] = bytearray()
+            encode_doc(buf, doc - self._last_doc.get(term, 0), occ)
+            self._last_doc[term] = doc
+            self._df[term] = self._df.get(term, 0) + 1
+        if len(self._docs) >= self.max_docs:
+            self.flush()
+
+    def add_item(self, item: Dict[str, Any], segments: Any) -> None:
+        """
+        Index a runner item with its CaptionTrack, or {language: track} dict.
+        """
+        if not segments or not item.get("videoId"):
+            return
+        if isinstance(segments, dict):
+            for language, track in segments.items():
+                self.add(item["videoId"], language, track)
+        else:
+            language = item.get("language")
+            self.add(item["videoId"], language if isinstance(language, str) else None, segments)
+
+    def flush(self) -> Optional[str]:
+        """
+        Write buffered docs as a new segment; returns its name (None if empty).
+        """
+        if not self._docs:
+            return None
+        segments = _read_manifest(self.directory)
+        name = "seg-%05d" % (int(segments[-1][4:]) + 1 if segments else 0)
+        terms = sorted(self._postings, key=lambda t: t.encode("utf-8"))
+        _write_segment(
+            os.path.join(self.directory, name),
+            self._docs,
+            ((t.encode("utf-8"), self._df[t], bytes(self._postings[t])) for t in terms),
+        )
+        tiers = _read_tiers(self.directory)
+        _write_manifest(self.directory, segments + [name], tiers)
+        self._reset()
+        self._merge_tiers()
+        return name
+
+    def _merge_tiers(self) -> None:
+        while True:
+            names = _read_manifest(self.directory)
+            tiers = _read_tiers(self.directory)
+            newest = [tiers.get(name, 0) for name in names[-self.merge_factor :]]
+            if len(newest) < self.merge_factor or len(set(newest)) > 1:
+                return
+            _replace_segments(self.directory, names, self.merge_factor, newest[0] + 1)
+
+    def close(self) -> None:
+        self.flush()
+        if len(_read_manifest(self.directory)) > self.compact_after:
+            compact_index(self.directory)
+
+class Hit(NamedTuple):
+    video_id: str
+    language: str
+    segment: int
+    start_ms: int
+
+class _Segment:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(os.path.join(path, "docs.json"), "r", encoding="utf-8") as f:
+            self.docs: List[List[str]] = json.load(f)
+        self._lex_file = open(os.path.join(path, "lexicon.bin"), "rb")
+        self._post_file = open(os.path.join(path, "postings.bin"), "rb")
+        self.lexicon = mmap.mmap(self._lex_file.fileno(), 0, access=mmap.ACCESS_READ)
+        size = os.fstat(self._post_file.fileno()).st_size
+        self.postings: Any = mmap.mmap(self._post_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.postings_size = size
+        magic, version, self.n_terms, _ = _HEADER.unpack_from(self.lexicon, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a transcript index segment")
+        self._blob = _HEADER.size + _ENTRY.size * self.n_terms
+
+    def _entry(self, i: int) -> Tuple[bytes, int, int, int]:
+        term_off, term_len, df, post_off = _ENTRY.unpack_from(self.lexicon, _HEADER.size + _ENTRY.size * i)
+        start = self._blob + term_off
+        if i + 1 < self.n_terms:
+            post_end = _ENTRY.unpack_from(self.lexicon, _HEADER.size + _ENTRY.size * (i + 1))[3]
+        else:
+            post_end = self.postings_size
+        return self.lexicon[start : start + term_len], df, post_off, post_end
+
+    def lookup(self, term: str) -> Optional[Tuple[int, int, int]]:
+        key = term.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            t, df, start, end = self._entry(mid)
+            if t < key:
+                lo = mid + 1
+            elif t > key:
+                hi = mid
+            else:
+                return df, start, end
+        return None
+
+    def terms(self) -> Iterator[Tuple[bytes, int, int]]:
+        for i in range(self.n_terms):
+            t, _, start, end = self._entry(i)
+            yield t, start, end
+
+    def postings_for(self, term: str) -> Dict[int, List[Occurrence]]:
+        found = self.lookup(term)
+        if found is None:
+            return {}
+        _, start, end = found
+        return dict(decode_postings(self.postings, start, end))
+
+    def close(self) -> None:
+        self.lexicon.close()
+        if self.postings_size:
+            self.postings.close()
+        self._lex_file.close()
+        self._post_file.close()
+
+def _live_docs(segments: List[_Segment]) -> List[Set[int]]:
+    """
+    Per segment, the docs not superseded: a (videoId, language) indexed again
+    later hides its older docs.
+    """
+    result: List[Set[int]] = []
+    seen: Set[Tuple[str, str]] = set()
+    for seg in reversed(segments):
+        live = set()
+        for doc in range(len(seg.docs) - 1, -1, -1):
+            video_id, language = seg.docs[doc]
+            if (video_id, language) not in seen:
+                seen.add((video_id, language))
+                live.add(doc)
+        result.append(live)
+    result.reverse()
+    return result
+
+class TranscriptIndex:
+    """
+    Read side: term and phrase queries over every segment of an index
+    directory, answering with (videoId, language, segment idx, start ms).
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.segments = [_Segment(os.path.join(directory, name)) for name in _read_manifest(directory)]
+        self._live = _live_docs(self.segments)
+
+    def search(self, query: str, *, limit: Optional[int] = None) -> List[Hit]:
+        """
+        One word is a term query; several words are a phrase (consecutive
+        tokens, possibly spanning caption segments). Hits point at the
+        segment where the phrase starts.
+        """
+        terms = tokenize(query)
+        hits: List[Hit] = []
+        if not terms:
+            return hits
+        for seg, live in zip(self.segments, self._live):
+            lists = [seg.postings_for(t) for t in terms]
+            if not all(lists):
+                continue
+            docs = set(lists[0]).intersection(*lists[1:]) & live
+            for doc in sorted(docs):
+                positions = [{occ[0] for occ in postings[doc]} for postings in lists[1:]]
+                video_id, language = seg.docs[doc]
+                for pos, idx, ms in lists[0][doc]:
+                    if all(pos + i + 1 in p for i, p in enumerate(positions)):
+                        hits.append(Hit(video_id, language, idx, ms))
+                        if limit is not None and len(hits) >= limit:
+                            return hits
+        return hits
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "segments": len(self.segments),
+            "docs": sum(len(live) for live in self._live),
+            "terms": sum(seg.n_terms for seg in self.segments),
+        }
+
+    def close(self) -> None:
+        for seg in self.segments:
+            seg.close()
+
+    def __enter__(self) -> "TranscriptIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+def _merge_segments(directory: str, names: List[str], name: str) -> None:
+    """
+    Write segment `name` holding the live docs of `names` (consecutive
+    segments, oldest first). Terms are merged k-way across the sorted
+    lexicons, so only one term's postings are decoded at a time.
+    """
+    segments = [_Segment(os.path.join(directory, n)) for n in names]
+    try:
+        remap: List[Dict[int, int]] = []
+        docs: List[List[str]] = []
+        for seg, live in zip(segments, _live_docs(segments)):
+            mapping = {}
+            for doc in sorted(live):
+                mapping[doc] = len(docs)
+                docs.append(seg.docs[doc])
+            remap.append(mapping)
+
+        def merged() -> Iterator[Tuple[bytes, int, bytes]]:
+            def tagged(i: int) -> Iterator[Tuple[bytes, int, int, int]]:
+                for term, start, end in segments[i].terms():
+                    yield term, i, start, end
+
+            streams = [tagged(i) for i in range(len(segments))]
+            current: Optional[bytes] = None
+            out = bytearray()
+            df = last = 0
+            for term, i, start, end in heapq.merge(*streams):
+                if term != current:
+                    if current is not None and df:
+                        yield current, df, bytes(out)
+                    current, out, df, last = term, bytearray(), 0, 0
+                seg = segments[i]
+                for doc, occ in decode_postings(seg.postings, start, end):
+                    new = remap[i].get(doc)
+                    if new is None:
+                        continue
+                    encode_doc(out, new - last, occ)
+                    last = new
+                    df += 1
+            if current is not None and df:
+                yield current, df, bytes(out)
+
+        _write_segment(os.path.join(directory, name), docs, merged())
+    finally:
+        for seg in segments:
+            seg.close()
+
+def _replace_segments(directory: str, names: List[str], count: int, tier: int) -> None:
+    """
+    Merge the last `count` segments of the manifest `names` into one of `tier`.
+    """
+    name = "seg-%05d" % (int(names[-1][4:]) + 1)
+    _merge_segments(directory, names[-count:], name)
+    tiers = _read_tiers(directory)
+    tiers[name] = tier
+    _write_manifest(directory, names[:-count] + [name], tiers)
+    for old in names[-count:]:
+        shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+
+def compact_index(directory: str) -> Dict[str, int]:
+    """
+    Merge every segment into one, dropping superseded docs.
+    """
+    names = _read_manifest(directory)
+    if len(names) > 1:
+        tiers = _read_tiers(directory)
+        _replace_segments(directory, names, len(names), max(tiers.get(name, 0) for name in names) + 1)
+    with TranscriptIndex(directory) as index:
+        return index.stats()
@@ -0,0 +1,100 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict
+
+# Local imports
+try:
+    from extractors.captions_parser import tracks_from_item
+    from outputs.readers import iter_records
+    from search.index import IndexWriter, TranscriptIndex, compact_index
+except ImportError:
+    # Support running via `python src/search_index.py` from repo root
+    sys.path.append(os.path.dirname(__file__))
+    from extractors.captions_parser import tracks_from_item
+    from outputs.readers import iter_records
+    from search.index import IndexWriter, TranscriptIndex, compact_index
+
+LOG = logging.getLogger("search_index")
+
+def build_index(directory: str, paths: Any) -> Dict[str, int]:
+    """
+    Append the items of export files to the index as one new segment.
+    """
+    counts = {"records": 0, "tracks": 0, "skipped": 0}
+    writer = IndexWriter(directory)
+    for path in paths:
+        for row in iter_records(path):
+            counts["records"] += 1
+            found = False
+            for language, track in tracks_from_item(row):
+                writer.add(row["videoId"], language, track)
+                counts["tracks"] += 1
+                found = True
+            if not found:
+                counts["skipped"] += 1
+    writer.close()
+    return counts
+
+def format_ms(ms: int) -> str:
+    seconds, ms = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return "%d:%02d:%02d.%03d" % (hours, minutes, seconds, ms)
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Build and query an on-disk inverted index of transcripts.")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Append export files (JSON/NDJSON/CSV, manifests) to an index.")
+    build.add_argument("index", help="Index directory (created if missing).")
+    build.add_argument("inputs", nargs="+", help="Export files written with array_with_timestamps captions.")
+
+    query = sub.add_parser("query", help="Find a word or phrase; prints videoId, language, segment and time.")
+    query.add_argument("index", help="Index directory.")
+    query.add_argument("text", help="One word (term query) or several (phrase query).")
+    query.add_argument("--limit", type=int, default=None, help="Stop after this many hits.")
+    query.add_argument("--json", action="store_true", help="Print hits as JSON lines.")
+
+    stats = sub.add_parser("stats", help="Show segment, document and term counts.")
+    stats.add_argument("index", help="Index directory.")
+
+    compact = sub.add_parser("compact", help="Merge all segments into one, dropping superseded videos.")
+    compact.add_argument("index", help="Index directory.")
+
+    p.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging level.",
+    )
+    return p.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    if args.command == "build":
+        counts = build_index(args.index, args.inputs)
+        LOG.info(
+            "Indexed %(tracks)d tracks from %(records)d records (%(skipped)d without timestamped captions)", counts
+        )
+    elif args.command == "compact":
+        LOG.info("Compacted: %s", compact_index(args.index))
+    else:
+        with TranscriptIndex(args.index) as index:
+            if args.command == "stats":
+                print(json.dumps(index.stats()))
+                return
+            for hit in index.search(args.text, limit=args.limit):
+                if args.json:
+                    print(json.dumps(hit._asdict(), ensure_ascii=False))
+                else:
+                    print(f"{hit.video_id}\t{hit.language}\t{hit.segment}\t{hit.start_ms}\t{format_ms(hit.start_ms)}")
+
+if __name__ == "__main__":
+    main()
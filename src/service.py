@@ -0,0 +1,244 @@
+import argparse
+import json
+import logging
+import os
+import signal
+import socketserver
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# Local imports
+try:
+    from extractors.captions_parser import CaptionFormat
+    from extractors.sources import expand_sources
+    from extractors.youtube_client import ALL_LANGUAGES, YouTubeClient
+    from outputs.writers.json_writer import iter_json_chunks, make_encoder
+    from pipeline.executor import run_parallel
+    from pipeline.singleflight import SingleFlight
+    from runner import Segments, add_client_arguments, build_client, process_url, url_key
+except ImportError:
+    # Support running via `python src/service.py` from repo root
+    sys.path.append(os.path.dirname(__file__))
+    from extractors.captions_parser import CaptionFormat
+    from extractors.sources import expand_sources
+    from extractors.youtube_client import ALL_LANGUAGES, YouTubeClient
+    from outputs.writers.json_writer import iter_json_chunks, make_encoder
+    from pipeline.executor import run_parallel
+    from pipeline.singleflight import SingleFlight
+    from runner import Segments, add_client_arguments, build_client, process_url, url_key
+
+LOG = logging.getLogger("service")
+
+class RequestError(ValueError):
+    pass
+
+def _formats(value: Any) -> List[str]:
+    formats = [value] if isinstance(value, str) else list(value or [CaptionFormat.ARRAY_TS])
+    for fmt in formats:
+        if fmt not in CaptionFormat.ALL:
+            raise RequestError(f"unknown caption format: {fmt}")
+    return formats
+
+def _languages(value: Any) -> Union[None, str, List[str]]:
+    if value is None or value == ALL_LANGUAGES:
+        return value
+    if isinstance(value, str):
+        value = value.split(",")
+    languages = [str(v).strip() for v in value if str(v).strip()]
+    if not languages:
+        raise RequestError("languages must be 'all' or a non-empty list")
+    return languages
+
+class TranscriptService:
+    """
+    Long-lived extraction service around one warm YouTubeClient (yt-dlp
+    instances, HTTP sessions, cache and rate limiter all stay alive between
+    jobs). Speaks JSON lines: each request line is a job, answered with one
+    line per item as results arrive and a final `done` line.
+
+    Request: {"id": ..., "urls": [...] (videos, playlists or channels),
+    "format": "array" | [...], "language": "en", "languages": [...] | "all",
+    "metadata": true, "ordered": true}; or {"op": "stats"} / {"op": "ping"}.
+
+    Identical videos requested concurrently (by one job or several) are
+    fetched once: later callers wait for the in-flight fetch and share it.
+    """
+
+    def __init__(self, client: YouTubeClient, *, workers: int = 4) -> None:
+        self.client = client
+        self.workers = workers
+        self.flights = SingleFlight()
+
+    def _process(self, entry: Tuple[int, str], opts: Dict[str, Any]) -> Tuple[Dict[str, Any], Segments]:
+        index, url = entry
+        languages = opts["languages"]
+        key = (
+            url_key(url),
+            tuple(opts["formats"]),
+            opts["language"],
+            tuple(languages) if isinstance(languages, list) else languages,
+            opts["metadata"],
+        )
+        (item, segments), shared = self.flights.do(
+            key,
+            lambda: process_url(
+                self.client,
+                url,
+                formats=opts["formats"],
+                language=opts["language"],
+                languages=languages,
+                metadata=opts["metadata"],
+            ),
+        )
+        if shared and self.client.metrics is not None:
+            self.client.metrics.inc("coalesced")
+        item = dict(item, inputIndex=index, videoUrl=url)
+        return item, segments
+
+    def run_job(self, request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        job_id = request.get("id")
+        urls = request.get("urls")
+        if not isinstance(urls, list) or not all(isinstance(u, str) for u in urls):
+            raise RequestError("urls must be a list of strings")
+        opts = {
+            "formats": _formats(request.get("format")),
+            "language": request.get("language"),
+            "languages": _languages(request.get("languages")),
+            "metadata": bool(request.get("metadata", True)),
+        }
+        count = 0
+        for item, _ in run_parallel(
+            lambda entry: self._process(entry, opts),
+            enumerate(expand_sources(urls, self.client)),
+            workers=self.workers,
+            ordered=bool(request.get("ordered", True)),
+        ):
+            count += 1
+            yield {"id": job_id, "item": item}
+        yield {"id": job_id, "done": True, "count": count}
+
+    def handle_line(self, line: Union[str, bytes]) -> Iterator[Dict[str, Any]]:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("request must be a JSON object")
+        except ValueError as e:
+            yield {"error": f"bad request: {e}"}
+            return
+        op = request.get("op", "extract")
+        try:
+            if op == "ping":
+                yield {"id": request.get("id"), "ok": True}
+            elif op == "stats":
+                metrics = self.client.metrics
+                yield {"id": request.get("id"), "stats": metrics.summary() if metrics is not None else {}}
+            elif op == "extract":
+                yield from self.run_job(request)
+            else:
+                raise RequestError(f"unknown op: {op}")
+        except RequestError as e:
+            yield {"id": request.get("id"), "error": str(e)}
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: Any
+
+    def handle(self) -> None:
+        service: TranscriptService = self.server.service
+        encoder = make_encoder(compact=True)
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                for message in service.handle_line(line):
+                    self.wfile.write(("".join(iter_json_chunks(encoder, message)) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                LOG.info("Client disconnected mid-job")
+                return
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def make_server(
+    service: TranscriptService,
+    *,
+    socket_path: Optional[str] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> socketserver.BaseServer:
+    """
+    A threading JSON-lines server on a Unix socket (`socket_path`) or TCP
+    (`host`, `port`); one thread per connection. Call `serve_forever()`.
+    """
+    server: Any
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixServer(socket_path, _Handler)
+    else:
+        server = _TCPServer((host, port), _Handler)
+    server.service = service
+    return server
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Serve transcript extraction over JSON lines with a warm client and cache."
+    )
+    p.add_argument(
+        "--socket",
+        default=None,
+        help="Unix socket path to listen on.",
+    )
+    p.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="TCP host when no --socket is given.",
+    )
+    p.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="TCP port when no --socket is given.",
+    )
+    add_client_arguments(p)
+    p.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging level.",
+    )
+    return p.parse_args()
+
+def _stop(signum: int, frame: Any) -> None:
+    raise KeyboardInterrupt
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    yt = build_client(args)
+    server = make_server(
+        TranscriptService(yt, workers=args.concurrency), socket_path=args.socket, host=args.host, port=args.port
+    )
+    signal.signal(signal.SIGTERM, _stop)
+    LOG.info("Listening on %s", args.socket or "%s:%d" % server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        LOG.info("Shutting down")
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+        yt.close()
+        if yt.cache is not None:
+            yt.cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.cache import TranscriptCache, captions_key
+
+SEGMENTS = [{"start": 0.0, "end": 1.5, "text": "Hello"}]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_hit_miss_and_ttl_expiry():
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as td:
+        cache = TranscriptCache(td, ttl_seconds=60, clock=clock)
+        key = captions_key("vid1", "en")
+        assert cache.get(key) is None
+        cache.put(key, {"segments": SEGMENTS, "language": "en", "auto": False})
+        assert cache.get(key)["segments"] == SEGMENTS
+        clock.now += 61
+        assert cache.get(key) is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+        cache.close()
+
+def test_size_cap_evicts_least_recently_used():
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as td:
+        cache = TranscriptCache(td, max_bytes=5_000, clock=clock)
+        payload = [{"start": float(i), "end": i + 1.0, "text": os.urandom(16).hex()} for i in range(60)]
+        for vid in ("a", "b", "c"):
+            clock.now += 1
+            cache.put(captions_key(vid, None), payload)
+        clock.now += 1
+        cache.get(captions_key("a", None))  # refresh "a" so "b" is the oldest
+        clock.now += 1
+        cache.put(captions_key("d", None), payload)
+        assert cache.stats()["evictions"] >= 1
+        assert cache.get(captions_key("b", None)) is None
+        assert cache.get(captions_key("d", None)) == payload
+        assert cache.stats()["bytes"] <= 5_000
+        cache.close()
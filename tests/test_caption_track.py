@@ -0,0 +1,47 @@
+import json
+import os
+import sys
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.caption_track import CaptionTrack, Segment
+from extractors.captions_parser import parse_captions_payload, CaptionFormat
+from outputs.writers.json_writer import iter_json_chunks, json_default, make_encoder
+
+SAMPLE = [
+    {"start": 0.0, "end": 1.5, "text": "Hello"},
+    {"start": 1.5, "end": 3.0, "text": "world!"},
+    {"start": 3.0, "end": 4.0, "text": "New\nline"},
+]
+
+def test_iteration_and_indexing():
+    track = CaptionTrack.from_segments(SAMPLE)
+    assert len(track) == 3
+    assert track[1] == Segment(1.5, 3.0, "world!")
+    assert track[-1].text == "New\nline"
+    assert [s.text for s in track] == ["Hello", "world!", "New\nline"]
+
+def test_slicing_rebases_text_offsets():
+    track = CaptionTrack.from_segments(SAMPLE)
+    tail = track[1:]
+    assert list(tail.texts()) == ["world!", "New\nline"]
+    assert tail.starts.tolist() == [1.5, 3.0]
+    assert list(track[::2].texts()) == ["Hello", "New\nline"]
+    assert len(track[5:]) == 0
+
+def test_round_trips_and_matches_dict_payload():
+    track = CaptionTrack.from_segments(SAMPLE)
+    assert CaptionTrack.from_dict(json.loads(json.dumps(track.to_dict()))) == track
+    assert parse_captions_payload(track, CaptionFormat.ARRAY_TS) == SAMPLE
+    assert json.loads(json.dumps(track, default=json_default)) == SAMPLE
+
+def test_streaming_encoder_writes_tracks_from_columns():
+    track = CaptionTrack.from_segments(SAMPLE + [{"start": 4.0, "end": float("nan"), "text": "100% \"quoted\""}])
+    row = {"videoId": "v", "captions": {"en": {"array_with_timestamps": track}, "de": CaptionTrack()}, "top": track}
+    for indent, compact in ((None, False), (None, True), (2, False), (4, False)):
+        separators = (",", ":") if compact else None
+        expected = json.dumps(row, ensure_ascii=False, indent=indent, separators=separators, default=json_default)
+        encoder = make_encoder(indent=indent, compact=compact)
+        assert "".join(iter_json_chunks(encoder, row)) == expected
+
@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pipeline.dead_letter import DeadLetterQueue
+from runner import load_urls
+
+def _item(vid, index, error, kind):
+    return {"videoUrl": f"https://youtu.be/{vid}", "videoId": vid, "inputIndex": index, "error": error, "errorKind": kind}
+
+def test_dead_letters_drain_and_feed_a_later_run():
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "job_dead_letter.ndjson")
+        dlq = DeadLetterQueue(path)
+        dlq.close()
+        assert not os.path.exists(path) and dlq.drain() == []
+
+        dlq.add(dict(_item("vid0001", 4, "timed out", "transient"), title=None))
+        dlq.add(_item("vid0002", 7, "HTTP Error 429", "throttled"))
+        with open(path, encoding="utf-8") as f:
+            first = json.loads(f.readline())
+        assert set(first) == {"videoUrl", "videoId", "inputIndex", "error", "errorKind", "attempts", "failedAt"}
+
+        entries = dlq.drain()
+        assert [e["inputIndex"] for e in entries] == [4, 7] and dlq.count == 0
+        assert not os.path.exists(path)
+
+        # What fails again is re-queued, and the file is a valid runner input
+        dlq.add(dict(entries[1], error="HTTP Error 429"), attempts=2)
+        dlq.close()
+        assert list(load_urls([path])) == ["https://youtu.be/vid0002"]
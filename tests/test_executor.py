@@ -0,0 +1,39 @@
+import os
+import sys
+import threading
+import time
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pipeline.executor import run_parallel
+
+def _slow_echo(x):
+    # Later items finish first so ordering is actually exercised
+    time.sleep(0.01 * (5 - x))
+    return x
+
+def test_ordered_results_keep_input_order():
+    out = list(run_parallel(_slow_echo, range(5), workers=4))
+    assert out == [0, 1, 2, 3, 4]
+
+def test_completion_order_yields_everything():
+    out = list(run_parallel(_slow_echo, range(5), workers=4, ordered=False))
+    assert sorted(out) == [0, 1, 2, 3, 4]
+    assert out[0] != 0
+
+def test_requests_overlap_across_workers():
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def fn(x):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return x
+
+    list(run_parallel(fn, range(16), workers=8))
+    assert state["peak"] > 1
@@ -51,4 +51,39 @@ def test_export_json_csv_ndjson():
         with open(p_nd, "r", encoding="utf-8") as f:
             line = f.readline()
         rec = json.loads(line)
-        assert rec["videoId"] == "vid1"
\ No newline at end of file
+        assert rec["videoId"] == "vid1"
+
+def test_streamed_outputs_match_batch_writers():
+    rows = ROWS + [dict(ROWS[0], videoId="vid2", captions=None, error="INVALID_URL")]
+    with tempfile.TemporaryDirectory() as td:
+        batch = ExportCoordinator(outdir=td, basename="batch")
+        streamed = ExportCoordinator(outdir=td, basename="stream")
+        with streamed.open_stream(["json", "csv", "ndjson"]) as stream:
+            for r in rows:
+                stream.write(r)
+        pairs = [
+            (batch.write_json(rows), stream.paths["json"]),
+            (batch.write_csv(rows), stream.paths["csv"]),
+            (batch.write_ndjson(rows), stream.paths["ndjson"]),
+        ]
+        for expected, actual in pairs:
+            with open(expected, encoding="utf-8") as a, open(actual, encoding="utf-8") as b:
+                assert a.read() == b.read()
+
+def test_stream_with_no_rows_is_still_valid():
+    with tempfile.TemporaryDirectory() as td:
+        with ExportCoordinator(outdir=td, basename="empty").open_stream(["json", "csv"]) as stream:
+            pass
+        assert json.load(open(stream.paths["json"], encoding="utf-8")) == []
+        with open(stream.paths["csv"], encoding="utf-8") as f:
+            assert f.readline().startswith("videoId,videoUrl,inputIndex,title")
+
+def test_compact_json_is_really_compact():
+    with tempfile.TemporaryDirectory() as td:
+        with ExportCoordinator(outdir=td, basename="c").open_stream(["compact_json"]) as stream:
+            for r in ROWS + ROWS:
+                stream.write(r)
+        with open(stream.paths["compact_json"], encoding="utf-8") as f:
+            text = f.read()
+        assert "\n" not in text and '", "' not in text and '": ' not in text
+        assert [r["videoId"] for r in json.loads(text)] == ["vid1", "vid1"]
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+
+# Heavy dependencies that must only load when a run actually needs them
+LAZY = ("yt_dlp", "youtube_transcript_api", "pyarrow", "zstandard")
+
+def test_importing_the_cli_does_not_load_heavy_dependencies():
+    code = (
+        f"import sys; sys.path.insert(0, {os.path.abspath(SRC)!r}); import runner; "
+        f"print(','.join(m for m in {LAZY!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    assert out.stdout.strip() == ""
+
+def test_help_runs_without_optional_packages():
+    out = subprocess.run(
+        [sys.executable, os.path.join(SRC, "runner.py"), "--help"], check=True, capture_output=True, text=True
+    )
+    assert "--no-metadata" in out.stdout
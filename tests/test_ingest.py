@@ -0,0 +1,82 @@
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.sources import FixtureExtractor, expand_sources
+from pipeline.ingest import BloomFilter, SeenSet, read_lines
+from runner import load_urls
+
+FORMS = [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?t=42",
+    "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    "https://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+    "https://youtube.com/shorts/dQw4w9WgXcQ",
+]
+
+class _Stdin:
+    def __init__(self, data):
+        self.buffer = io.BufferedReader(io.BytesIO(data))
+
+def test_inputs_stream_from_files_gzip_and_stdin():
+    with tempfile.TemporaryDirectory() as td:
+        plain = os.path.join(td, "urls.txt")
+        with open(plain, "w", encoding="utf-8") as f:
+            f.write(FORMS[0] + "\n\n  " + FORMS[1] + "  \n")
+        packed = os.path.join(td, "more.txt.gz")
+        with gzip.open(packed, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"videoUrl": "https://youtu.be/vid0002", "error": "x"}) + "\n")
+            f.write(json.dumps({"videoId": "", "videoUrl": None}) + "\n")
+        assert list(read_lines(plain)) == FORMS[:2]
+        stdin, sys.stdin = sys.stdin, _Stdin(gzip.compress(b"https://youtu.be/fromstdin\n"))
+        try:
+            urls = load_urls([plain, "https://youtu.be/inline1", packed, "-"])
+            assert next(urls) == FORMS[0]
+            assert list(urls) == [
+                FORMS[1],
+                "https://youtu.be/inline1",
+                "https://youtu.be/vid0002",
+                "https://youtu.be/fromstdin",
+            ]
+            assert not sys.stdin.buffer.closed
+        finally:
+            sys.stdin = stdin
+
+def test_every_url_form_of_a_video_is_fetched_once():
+    for seen in (None, SeenSet(), BloomFilter(1000)):
+        urls = list(expand_sources(FORMS + ["not a url", "not a url"], FixtureExtractor({}), seen))
+        assert urls == [FORMS[0], "not a url", "not a url"]
+
+def test_seen_sets():
+    seen = SeenSet()
+    keys = ["dQw4w9WgXcQ", "AAAAAAAAAAA", "vid0001", "dQw4w9WgXcR", "-_-_-_-_-_4"]
+    assert [seen.add(k) for k in keys] == [True] * 5
+    assert [seen.add(k) for k in keys] == [False] * 5
+    assert all(k in seen for k in keys) and "dQw4w9WgXcA" not in seen and len(seen) == 5
+    # Enough ids to grow the table several times
+    many = ["%011d" % n for n in range(20000)]
+    assert all(seen.add(k) for k in many) and not any(seen.add(k) for k in many)
+    assert len(seen) == 20005
+
+    bloom = BloomFilter(20000, 1e-4)
+    assert bloom.hashes == 13 and 380_000 < bloom.bits < 390_000
+    added = sum(bloom.add(k) for k in many)
+    assert all(k in bloom for k in many) and added >= 19990
+    assert sum(("x%010d" % n) in bloom for n in range(20000)) <= 10
+
+def test_malformed_json_lines_are_skipped(caplog):
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "previous.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"videoUrl": "https://youtu.be/vid0001"}) + "\n")
+            f.write('{"videoUrl": "https://youtu.be/vid0002", "capt\n')
+            f.write(json.dumps({"videoUrl": "https://youtu.be/vid0003"}) + "\n")
+        assert list(load_urls([path])) == ["https://youtu.be/vid0001", "https://youtu.be/vid0003"]
+    assert "Skipping malformed JSON line" in caplog.text
+
@@ -0,0 +1,45 @@
+import json
+import os
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from outputs.exporters import ExportCoordinator
+from pipeline.journal import JOURNAL_FILE, JobJournal
+
+def _row(vid):
+    return {"videoId": vid, "videoUrl": f"https://youtu.be/{vid}", "captions": ["hi"], "error": None}
+
+def test_resume_truncates_uncommitted_rows_and_appends():
+    with tempfile.TemporaryDirectory() as td:
+        ec = ExportCoordinator(outdir=td, basename="job")
+        kinds = ["json", "ndjson", "csv"]
+        journal = JobJournal(td, sync_every=2)
+        stream = ec.open_stream(kinds)
+        for vid in ("a", "b", "c"):
+            stream.write(_row(vid))
+            journal.mark_done(vid)
+            if journal.sync_due():
+                journal.commit(stream.sync())
+        # Simulate a crash: "c" reached the files but was never committed
+        stream.sync()
+        journal.close()
+        with open(os.path.join(td, JOURNAL_FILE), "a", encoding="utf-8") as f:
+            f.write('{"done": ["x"')
+
+        journal = JobJournal(td)
+        assert journal.done == {"a", "b"} and not journal.complete
+        with ec.open_stream(kinds, resume_offsets=journal.offsets) as stream:
+            for vid in ("c", "d"):
+                stream.write(_row(vid))
+        journal.close()
+
+        with open(stream.paths["json"], encoding="utf-8") as f:
+            assert [r["videoId"] for r in json.load(f)] == ["a", "b", "c", "d"]
+        with open(stream.paths["ndjson"], encoding="utf-8") as f:
+            assert [json.loads(ln)["videoId"] for ln in f] == ["a", "b", "c", "d"]
+        with open(stream.paths["csv"], encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert lines[0].startswith("videoId,") and len(lines) == 5
@@ -0,0 +1,108 @@
+import io
+import json
+import os
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import outputs.readers as readers
+from merge import merge_files
+from outputs.exporters import ExportCoordinator
+from outputs.readers import iter_records
+from pipeline.partition import parse_shard, shard_of
+
+def _row(i, vid=None):
+    vid = vid or f"vid{i:03d}"
+    return {"videoId": vid, "videoUrl": f"https://youtu.be/{vid}", "inputIndex": i, "captions": [{"text": f"t{i}"}]}
+
+def test_shard_assignment_is_stable_and_covers_everything():
+    assert parse_shard("2/4") == (2, 4)
+    for bad in ("4/4", "x", "1/0"):
+        try:
+            parse_shard(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(bad)
+    keys = [f"vid{i}" for i in range(200)]
+    shards = [shard_of(k, 4) for k in keys]
+    assert shards == [shard_of(k, 4) for k in keys]
+    assert set(shards) == {0, 1, 2, 3}
+
+def test_json_array_is_read_incrementally(monkeypatch):
+    monkeypatch.setattr(readers, "_CHUNK", 7)
+    doc = json.dumps([{"a": "x" * 20, "n": 12345}, 678, "s", [1, 2]], indent=2)
+    assert list(readers.iter_json_array(io.StringIO(doc))) == json.loads(doc)
+    assert list(readers.iter_json_array(io.StringIO("[]"))) == []
+
+def test_merge_orders_and_dedups_across_formats():
+    rows = [_row(i) for i in range(12)]
+    rows.append(_row(12, vid="vid002"))  # duplicate input further down the list
+    with tempfile.TemporaryDirectory() as td:
+        paths = []
+        for shard, kind in enumerate(("json", "ndjson", "csv")):
+            ec = ExportCoordinator(outdir=td, basename=f"s{shard}")
+            with ec.open_stream([kind]) as stream:
+                for r in rows:
+                    if shard_of(r["videoId"], 3) == shard:
+                        stream.write(r)
+            paths.append(stream.paths[kind])
+
+        out = os.path.join(td, "merged.ndjson")
+        assert merge_files(paths, out) == 12
+        merged = list(iter_records(out))
+    assert [int(r["inputIndex"]) for r in merged] == list(range(12))
+
+def test_csv_shards_merge_back_to_typed_json():
+    full = dict(
+        _row(0),
+        language="en",
+        hasAutoCaptions=False,
+        captionFormat="array_with_timestamps",
+        captions=[{"start": 0.0, "end": 1.5, "text": "[Music] hi"}],
+        duration=212,
+        title=None,
+        error=None,
+    )
+    multi = {"en": {"array": ["a"], "xml": "<c/>"}}
+    rows = [
+        full,
+        dict(full, inputIndex=1, videoId="vid001", captionFormat="one_line_text", captions="[Music] hi", duration=3.5),
+        dict(
+            full,
+            inputIndex=2,
+            videoId="vid002",
+            language=["en", "de"],
+            hasAutoCaptions={"en": False, "de": True},
+            captionFormat=["array", "xml"],
+            captions=multi,
+        ),
+        dict(full, inputIndex=3, videoId="", language=None, hasAutoCaptions=None, captions=None, error="INVALID_URL"),
+    ]
+    with tempfile.TemporaryDirectory() as td:
+        with ExportCoordinator(outdir=td, basename="s").open_stream(["csv"]) as stream:
+            for r in rows:
+                stream.write(r)
+        out = os.path.join(td, "merged.json")
+        assert merge_files([stream.paths["csv"]], out) == 4
+        assert list(iter_records(out)) == rows
+
+def test_merge_takes_a_retry_tail_as_its_own_run():
+    rows = [_row(i) for i in (0, 1, 3, 5)] + [_row(i) for i in (2, 4)]
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "job.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r) + "\n" for r in rows))
+        out = os.path.join(td, "merged.json")
+        assert merge_files([path], out) == 6
+        assert [r["inputIndex"] for r in iter_records(out)] == list(range(6))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(_row(i)) + "\n" for i in (5, 4, 3, 2, 1, 0)))
+        try:
+            merge_files([path], out)
+        except ValueError as e:
+            assert "not in input order" in str(e)
+        else:
+            raise AssertionError("unordered input accepted")
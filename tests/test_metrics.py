@@ -0,0 +1,57 @@
+import json
+import os
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pipeline.metrics import Histogram, Metrics, MetricsReporter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_histogram_quantiles_fall_in_the_right_bucket():
+    h = Histogram()
+    for _ in range(90):
+        h.observe(0.02)
+    for _ in range(10):
+        h.observe(3.0)
+    assert 0.01 <= h.quantile(0.5) <= 0.025
+    assert 2.5 <= h.quantile(0.99) <= 5.0
+    assert h.count == 100 and abs(h.sum - (90 * 0.02 + 30.0)) < 1e-9
+
+def test_summary_and_prometheus_textfile():
+    clock = FakeClock()
+    m = Metrics(clock=clock)
+    with m.stage("fetch"):
+        clock.now += 0.2
+    m.inc("items", status="ok")
+    m.inc("items", status="ok")
+    m.inc("items", status="error")
+    m.inc("errors", error_class="TranscriptsDisabled")
+    m.set("cache", 5, stat="hits")
+    clock.now = 10.0
+
+    with tempfile.TemporaryDirectory() as td:
+        reporter = MetricsReporter(m, os.path.join(td, "run"), interval=0, clock=clock)
+        reporter.maybe_write()  # interval 0: only the final write happens
+        assert not os.path.exists(reporter.json_path)
+        reporter.write(final=True)
+        with open(reporter.json_path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+        with open(reporter.prom_path, "r", encoding="utf-8") as f:
+            prom = f.read()
+
+    assert summary["final"] is True
+    assert summary["items"] == 3 and summary["itemsPerSecond"] == 0.3
+    assert summary["stages"]["fetch"]["count"] == 1
+    assert summary["counters"]["errors"] == {"error_class=TranscriptsDisabled": 1}
+    assert 'yt_transcripts_stage_seconds_bucket{stage="fetch",le="0.25"} 1' in prom
+    assert 'yt_transcripts_stage_seconds_bucket{stage="fetch",le="+Inf"} 1' in prom
+    assert 'yt_transcripts_items_total{status="ok"} 2' in prom
+    assert 'yt_transcripts_cache{stat="hits"} 5' in prom
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+pytest.importorskip("pyarrow")
+
+from extractors.caption_track import CaptionTrack
+from outputs.exporters import ExportCoordinator
+from outputs.writers.parquet_writer import ColumnarExportWriter, read_table
+
+TRACK = CaptionTrack.from_segments(
+    [{"start": 0.0, "end": 1.5, "text": "Hello"}, {"start": 1.5, "end": 3.0, "text": "world!"}]
+)
+
+def _row(vid, error=None):
+    return {"videoId": vid, "videoUrl": f"https://youtu.be/{vid}", "language": "en", "error": error}
+
+@pytest.mark.parametrize("kind", ["parquet", "arrow"])
+def test_video_and_segment_tables(kind):
+    with tempfile.TemporaryDirectory() as td:
+        with ExportCoordinator(outdir=td, basename="t").open_stream([kind]) as stream:
+            stream.write(_row("vid1"), TRACK)
+            stream.write(_row("vid2", error="NoTranscriptFound"), None)
+        videos = read_table(os.path.join(td, "t_videos"))
+        segments = read_table(os.path.join(td, "t_segments"))
+        assert videos.column("videoId").to_pylist() == ["vid1", "vid2"]
+        assert videos.column("segmentCount").to_pylist() == [2, 0]
+        assert str(videos.schema.field("language").type).startswith("dictionary")
+        assert segments.column("idx").to_pylist() == [0, 1]
+        assert segments.column("end").to_pylist() == [1.5, 3.0]
+        assert segments.column("text").to_pylist() == ["Hello", "world!"]
+
+def test_multi_language_items_tag_segments_with_language():
+    with tempfile.TemporaryDirectory() as td:
+        with ExportCoordinator(outdir=td, basename="t").open_stream(["parquet"]) as stream:
+            row = dict(_row("vid1"), language=["en", "es"], hasAutoCaptions={"en": False, "es": True})
+            stream.write(row, {"en": TRACK, "es": TRACK[:1]})
+        videos = read_table(os.path.join(td, "t_videos"))
+        segments = read_table(os.path.join(td, "t_segments"))
+        assert videos.column("language").to_pylist() == ["en,es"]
+        assert videos.column("segmentCount").to_pylist() == [3]
+        assert segments.column("language").to_pylist() == ["en", "en", "es"]
+        assert segments.column("idx").to_pylist() == [0, 1, 0]
+
+@pytest.mark.parametrize("kind", ["parquet", "arrow"])
+def test_checkpoints_rewrite_the_last_part_and_resume_from_rows(kind):
+    with tempfile.TemporaryDirectory() as td:
+        base = os.path.join(td, "t")
+        writer = ColumnarExportWriter(base, fmt=kind, row_group_size=5)
+        for vid in ("vid1", "vid2"):
+            writer.write(_row(vid), TRACK)
+            checkpoint = writer.sync()
+        assert checkpoint == {"videos": (0, 2), "segments": (0, 4)}
+        # Written after the checkpoint, then lost in a crash
+        writer.write(_row("vid3"), TRACK)
+        writer.sync()
+        assert len(os.listdir(base + "_segments")) == 1
+        assert read_table(base + "_segments").num_rows == 6
+
+        resumed = ColumnarExportWriter(base, fmt=kind, row_group_size=5, resume=checkpoint)
+        resumed.write(_row("vid4"), TRACK)
+        # The segment buffer reached row_group_size and became a finished part
+        assert resumed.sync() == {"videos": (0, 3), "segments": (1, 0)}
+        resumed.close()
+        assert read_table(base + "_videos").column("videoId").to_pylist() == ["vid1", "vid2", "vid4"]
+        assert read_table(base + "_segments").num_rows == 6
+        assert len(os.listdir(base + "_videos")) == len(os.listdir(base + "_segments")) == 1
+
@@ -1,11 +1,15 @@
+import io
+import json
 import os
 import sys
 
 # Allow running tests directly from repo root
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from extractors.captions_parser import parse_captions_payload, CaptionFormat, one_line_text
-from extractors.xml_formatter import captions_to_xml
+from extractors.captions_parser import parse_captions_payload, CaptionFormat, one_line_text, render_formats
+from extractors.xml_formatter import captions_to_xml, write_captions_xml
+from outputs.exporters import csv_row
+from outputs.writers.json_writer import iter_json_chunks, make_encoder
 
 SAMPLE = [
     {"start": 0.0, "end": 1.5, "text": "Hello"},
@@ -33,4 +37,26 @@ def test_xml_without_ts():
 
 def test_xml_with_ts():
     xml = captions_to_xml(SAMPLE, with_timestamps=True)
-    assert 'start="0.00"' in xml and 'end="1.50"' in xml
\ No newline at end of file
+    assert 'start="0.00"' in xml and 'end="1.50"' in xml
+
+def test_render_formats_from_one_fetch():
+    out = render_formats(SAMPLE, [CaptionFormat.ONE_LINE, CaptionFormat.XML, CaptionFormat.ARRAY])
+    assert out[CaptionFormat.ONE_LINE] == "Hello world! New line"
+    assert out[CaptionFormat.XML] == captions_to_xml(SAMPLE, with_timestamps=False)
+    assert out[CaptionFormat.ARRAY] == ["Hello", "world!", "New\nline"]
+
+def test_xml_streams_into_file_handle():
+    buf = io.StringIO()
+    write_captions_xml(buf, SAMPLE, with_timestamps=True)
+    assert buf.getvalue() == captions_to_xml(SAMPLE, with_timestamps=True)
+
+def test_xml_payloads_stream_into_row_writers():
+    xml = render_formats(SAMPLE + [{"start": 4.0, "end": 5.0, "text": 'say "hi" \u00e9'}], [CaptionFormat.XML_TS])
+    document = str(xml[CaptionFormat.XML_TS])
+    row = {"videoId": "v", "captions": xml}
+    for indent in (None, 2):
+        plain = {"videoId": "v", "captions": {CaptionFormat.XML_TS: document}}
+        expected = json.dumps(plain, ensure_ascii=False, indent=indent)
+        assert "".join(iter_json_chunks(make_encoder(indent=indent), row)) == expected
+    assert csv_row({"captions": xml[CaptionFormat.XML_TS]})["captions"] == document
+
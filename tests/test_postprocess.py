@@ -0,0 +1,53 @@
+import os
+import sys
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.caption_track import CaptionTrack, Segment
+from extractors.postprocess import MERGE_ALL, MERGE_OFF, PostProcessor, merge_overlaps, rechunk
+
+ROLLING = [
+    Segment(0.0, 4.0, "hello everyone and"),
+    Segment(2.0, 6.0, "everyone and welcome to the"),
+    Segment(4.0, 8.0, "welcome to the show"),
+    Segment(6.0, 8.5, "welcome to the show"),
+    Segment(9.0, 10.0, "I said no"),
+    Segment(10.0, 11.0, "no  way\n"),
+    Segment(11.0, 11.5, "   "),
+]
+
+def test_merge_overlaps_drops_repeats_and_time_overlap():
+    assert list(merge_overlaps(ROLLING)) == [
+        Segment(0.0, 2.0, "hello everyone and"),
+        Segment(2.0, 4.0, "welcome to the"),
+        Segment(4.0, 8.5, "show"),
+        Segment(9.0, 10.0, "I said no"),
+        # One shared word is kept: it is speech, not overlap
+        Segment(10.0, 11.5, "no way"),
+    ]
+    assert list(merge_overlaps([])) == []
+
+def test_rechunk_by_duration_and_characters():
+    merged = list(merge_overlaps(ROLLING))
+    assert list(rechunk(merged, max_seconds=5)) == [
+        Segment(0.0, 4.0, "hello everyone and welcome to the"),
+        Segment(4.0, 8.5, "show"),
+        Segment(9.0, 11.5, "I said no no way"),
+    ]
+    assert list(rechunk(merged, max_chars=20)) == [
+        Segment(0.0, 2.0, "hello everyone and"),
+        Segment(2.0, 8.5, "welcome to the show"),
+        Segment(9.0, 11.5, "I said no no way"),
+    ]
+    # A segment longer than the limit stays whole
+    assert list(rechunk([Segment(0.0, 9.0, "long")], max_seconds=1)) == [Segment(0.0, 9.0, "long")]
+
+def test_post_processor_builds_a_track():
+    track = CaptionTrack.from_segments(ROLLING)
+    assert PostProcessor(merge=MERGE_OFF)(track, True) is track
+    assert PostProcessor()(track, False) is track
+    out = PostProcessor(merge=MERGE_ALL, max_seconds=5)(track, False)
+    assert isinstance(out, CaptionTrack)
+    assert list(out.texts()) == ["hello everyone and welcome to the", "show", "I said no no way"]
+    assert out.starts.tolist() == [0.0, 4.0, 9.0] and out.ends.tolist() == [4.0, 8.5, 11.5]
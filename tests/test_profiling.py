@@ -0,0 +1,58 @@
+import os
+import pstats
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pipeline.metrics import Metrics
+from pipeline.profiling import PROFILE_SUFFIX, StageProfiler
+
+def build_rows(n):
+    return [{"i": i, "text": "x" * 50} for i in range(n)]
+
+def test_stages_are_profiled_and_reported():
+    metrics = Metrics()
+    metrics.profiler = StageProfiler(sample=1.0, top=5)
+    kept = []
+    for _ in range(3):
+        with metrics.stage("format"):
+            kept.append(build_rows(2000))
+    with metrics.stage("export"):
+        sum(range(1000))
+
+    summary = metrics.profiler.summary()
+    assert list(summary) == ["format", "export"]
+    fmt = summary["format"]
+    assert fmt["calls"] == fmt["sampled"] == 3 and fmt["peakBytes"] > 0
+    assert any(f.startswith("build_rows (tests/test_profiling.py") and nc == 3 for f, _, _, nc in fmt["functions"])
+    # The rows built inside the stage and kept are attributed to their line
+    where, size, count = fmt["allocations"][0]
+    assert where.startswith("tests/test_profiling.py:") and count >= 6000
+    assert metrics.summary()["stages"]["format"]["count"] == 3
+
+    with tempfile.TemporaryDirectory() as td:
+        base = os.path.join(td, "run")
+        path = metrics.profiler.write(base)
+        assert path == base + PROFILE_SUFFIX
+        with open(path, encoding="utf-8") as f:
+            report = f.read()
+        assert "== format: 3/3 calls sampled" in report and "build_rows" in report
+        stats = pstats.Stats(base + "_profile_format.pstats")
+        assert stats.total_calls > 0
+
+def test_sampling_profiles_a_fraction_of_calls():
+    profiler = StageProfiler(sample=0.1, memory=False, seed=3)
+    for _ in range(500):
+        with profiler.stage("fetch"):
+            pass
+    # Nested stages run unprofiled inside a sampled one
+    profiler.sample = 1.0
+    with profiler.stage("export"):
+        with profiler.stage("index"):
+            pass
+    summary = profiler.summary()
+    assert summary["fetch"]["calls"] == 500 and 30 <= summary["fetch"]["sampled"] <= 70
+    assert summary["fetch"]["peakBytes"] is None and summary["fetch"]["allocations"] == []
+    assert "index" not in summary and summary["export"]["sampled"] == 1
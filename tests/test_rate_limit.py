@@ -0,0 +1,116 @@
+import os
+import sys
+import threading
+import time
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.rate_limit import AIMDLimiter, RateController, RetryPolicy, TokenBucket, classify_error
+from pipeline.executor import run_parallel
+
+class TooManyRequests(Exception):
+    pass
+
+class NoTranscriptFound(Exception):
+    pass
+
+class FakeBackend:
+    """
+    Local stand-in for YouTube: answers 429 whenever more than `capacity`
+    requests are in flight at once.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.active = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def fetch(self, video_id):
+        with self.lock:
+            self.active += 1
+            over = self.active > self.capacity
+            if over:
+                self.throttled += 1
+        try:
+            if over:
+                raise TooManyRequests("HTTP Error 429: Too Many Requests")
+            time.sleep(0.005)
+            return video_id
+        finally:
+            with self.lock:
+                self.active -= 1
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def test_token_bucket_spaces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(10, burst=1, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        bucket.acquire()
+    assert abs(clock.now - 0.4) < 1e-9
+
+def test_aimd_halves_on_throttle_and_grows_on_success():
+    limiter = AIMDLimiter(8, maximum=16, cooldown=0.0)
+    limiter.on_throttle()
+    assert limiter.limit == 4
+    for _ in range(4):
+        limiter.on_success(0.1)
+    assert 4.9 < limiter.limit < 5.1
+
+def test_network_errors_shrink_window_gently():
+    limiter = AIMDLimiter(8, cooldown=0.0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise ConnectionError("Connection reset by peer")
+        return "ok"
+
+    rate = RateController(limiter=limiter, retries={"metadata": RetryPolicy(attempts=3)}, sleep=lambda s: None)
+    assert rate.call("metadata", flaky) == "ok"
+    assert 6 <= limiter.limit < 8
+
+def test_permanent_errors_are_not_retried():
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise NoTranscriptFound("no transcript")
+
+    rate = RateController(limiter=AIMDLimiter(2), retries={"captions": RetryPolicy(attempts=5)}, sleep=lambda s: None)
+    try:
+        rate.call("captions", fn)
+    except NoTranscriptFound:
+        pass
+    assert len(calls) == 1
+
+def test_errors_are_classified_for_the_dead_letter_queue():
+    assert classify_error(NoTranscriptFound("no en")) == "permanent"
+    assert classify_error(TooManyRequests("slow down")) == "throttled"
+    assert classify_error(RuntimeError("HTTP Error 429: Too Many Requests")) == "throttled"
+    assert classify_error(ConnectionResetError("reset by peer")) == "transient"
+    assert classify_error(ValueError("bad payload")) == "permanent"
+
+def test_controller_converges_under_injected_throttling():
+    backend = FakeBackend(capacity=3)
+    rate = RateController(
+        limiter=AIMDLimiter(12, cooldown=0.01),
+        retries={"captions": RetryPolicy(attempts=20, base_delay=0.001, max_delay=0.01)},
+        seed=1,
+    )
+    ids = [f"vid{i}" for i in range(60)]
+    out = list(run_parallel(lambda v: rate.call("captions", backend.fetch, v), ids, workers=12))
+    assert out == ids
+    assert backend.throttled > 0 and rate.stats["retries"] >= backend.throttled
+    assert rate.limiter.limit < 12
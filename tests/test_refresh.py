@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.caption_track import CaptionTrack
+from pipeline.refresh import PreviousRun, Refresher, options_key, parse_created_at
+
+NOW = parse_created_at("2025-11-10T12:00:00Z")
+CAPTIONS = [{"start": 0.0, "end": 1.0, "text": "Hi"}]
+KEY = options_key({"formats": ["array_with_timestamps"], "language": "en"})
+
+def _rec(vid, *, created="2025-11-09T12:00:00.5Z", error=None, sig="s1", key=KEY):
+    return {
+        "videoId": vid,
+        "language": "en",
+        "listingSignature": sig,
+        "captionFormat": "array_with_timestamps",
+        "optionsKey": key,
+        "captions": CAPTIONS,
+        "error": error,
+        "createdAt": created,
+    }
+
+def test_refresh_outcomes_and_summary():
+    rows = [
+        _rec("same"),
+        _rec("bad", error="TranscriptsDisabled"),
+        _rec("old", created="2025-10-01T00:00:00Z"),
+        _rec("fmt", key=options_key({"formats": ["array_with_timestamps"], "language": "de"})),
+        _rec("legacy", key=None),
+        _rec("nosig", sig=None),
+        _rec("moved", sig="s0"),
+        _rec("gone"),
+        {"videoId": "", "error": "INVALID_URL"},
+    ]
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "prev.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(json.dumps(r) for r in rows) + "\n")
+        previous = PreviousRun(path)
+        refresher = Refresher(previous, max_age=7 * 86400, options_key=KEY, clock=lambda: NOW)
+        listed = []
+
+        def signature(vid):
+            listed.append(vid)
+            return "s1"
+
+        vids = ("same", "bad", "old", "fmt", "legacy", "nosig", "moved", "fresh")
+        outcomes = {vid: refresher.check(vid, signature)[0] for vid in vids}
+        assert refresher.check("same", signature)[1] == rows[0]
+        refresher.compare("moved", {"captions": CaptionTrack.from_segments(CAPTIONS), "error": None})
+        refresher.compare("old", {"captions": ["Hi"], "error": None})
+        previous.close()
+
+    assert outcomes == {
+        "same": "unchanged",
+        "bad": "errored",
+        "old": "stale",
+        "fmt": "options_changed",
+        "legacy": "options_changed",
+        "nosig": "unsigned",
+        "moved": "listing_changed",
+        "fresh": "new",
+    }
+    assert listed == ["same", "moved", "same"]
+    assert refresher.summary() == {
+        "previous": 8,
+        "unchanged": 2,
+        "refetched": {"errored": 1, "stale": 1, "options_changed": 2, "unsigned": 1, "listing_changed": 1},
+        "new": 1,
+        "removed": 1,
+        "contentChanged": 1,
+    }
@@ -0,0 +1,135 @@
+import glob
+import io
+import json
+import os
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.caption_track import CaptionTrack
+from extractors.postprocess import MERGE_AUTO, PostProcessor
+from extractors.transport import write_synthetic_fixtures
+from pipeline.journal import load_job_settings
+from runner import JOB_STDIN, main, output_options_key, process_url
+
+TRACK = CaptionTrack.from_segments([{"start": 0.0, "end": 1.0, "text": "Hi"}])
+
+class StubClient:
+    metrics = None
+
+    def __init__(self):
+        self.metadata_calls = 0
+
+    def video_metadata(self, video_id):
+        self.metadata_calls += 1
+        return {"title": f"T {video_id}"}
+
+    def fetch_captions(self, video_id, preferred_lang=None):
+        return TRACK, "en", False
+
+    def fetch_caption_tracks(self, video_id, languages):
+        return {"en": (TRACK, False), "de": (TRACK, True)}
+
+    def listing_signature(self, video_id, refresh=False):
+        return "sig"
+
+def test_no_metadata_skips_the_lookup():
+    yt = StubClient()
+    item, segments = process_url(yt, "https://youtu.be/abcdefg", formats=["array"], language=None, metadata=False)
+    assert yt.metadata_calls == 0
+    assert item["title"] is None and item["captions"] == ["Hi"] and segments == TRACK
+
+def test_records_carry_the_key_of_every_output_option():
+    def key(**options):
+        return process_url(StubClient(), "https://youtu.be/abcdefg", **options)[0]["optionsKey"]
+
+    base = dict(formats=["array"], language="en")
+    assert key(**base) == output_options_key(**base)
+    variants = [
+        key(**base),
+        key(formats=["array", "xml"], language="en"),
+        key(formats=["array"], language="de"),
+        key(**base, metadata=False),
+        key(**base, languages=["en", "de"]),
+    ]
+    assert len(set(variants)) == len(variants)
+
+def test_languages_key_captions_by_language():
+    yt = StubClient()
+    item, segments = process_url(
+        yt, "https://youtu.be/abcdefg", formats=["array"], language=None, languages=["en", "de"], index=3
+    )
+    assert item["language"] == ["en", "de"]
+    assert item["hasAutoCaptions"] == {"en": False, "de": True}
+    assert item["captions"] == {"en": ["Hi"], "de": ["Hi"]}
+    assert item["inputIndex"] == 3 and item["title"] == "T abcdefg"
+    assert set(segments) == {"en", "de"}
+
+def test_postprocess_runs_on_auto_tracks_before_rendering():
+    rolling = CaptionTrack.from_segments(
+        [
+            {"start": 0.0, "end": 4.0, "text": "so today we"},
+            {"start": 2.0, "end": 6.0, "text": "today we look at"},
+        ]
+    )
+
+    class RollingClient(StubClient):
+        def fetch_caption_tracks(self, video_id, languages):
+            return {"en": (rolling, False), "de": (rolling, True)}
+
+    item, segments = process_url(
+        RollingClient(),
+        "https://youtu.be/abcdefg",
+        formats=["array"],
+        language=None,
+        languages=["en", "de"],
+        postprocess=PostProcessor(merge=MERGE_AUTO),
+    )
+    assert item["captions"] == {"en": ["so today we", "today we look at"], "de": ["so today we", "look at"]}
+    assert segments["de"].ends.tolist() == [2.0, 6.0] and segments["en"] is rolling
+
+def test_since_refetches_when_postprocessing_options_change():
+    def run(td, name, *options):
+        outdir = os.path.join(td, name)
+        argv = sys.argv
+        sys.argv = ["runner.py", *urls, "--replay", fixtures, "--export", "ndjson", "--out", outdir, *options]
+        try:
+            main()
+        finally:
+            sys.argv = argv
+        return glob.glob(os.path.join(outdir, "*.ndjson"))[0], glob.glob(os.path.join(outdir, "*_diff.json"))
+
+    with tempfile.TemporaryDirectory() as td:
+        fixtures = os.path.join(td, "fixtures")
+        urls = [f"https://youtu.be/{vid}" for vid in write_synthetic_fixtures(fixtures, videos=3, segments=20)]
+        first, _ = run(td, "first")
+        chunked, diffs = run(td, "chunked", "--since", first, "--chunk-seconds", "30")
+        with open(diffs[0], encoding="utf-8") as f:
+            assert json.load(f)["refetched"] == {"options_changed": 3}
+        _, diffs = run(td, "again", "--since", chunked, "--chunk-seconds", "30")
+        with open(diffs[0], encoding="utf-8") as f:
+            assert json.load(f)["unchanged"] == 3
+
+def test_job_copies_stdin_inputs_so_resume_reads_them_again():
+    class Stdin:
+        buffer = io.BufferedReader(io.BytesIO(b"https://youtu.be/aaaaaaa1\nhttps://youtu.be/bbbbbbb2\n"))
+
+    with tempfile.TemporaryDirectory() as td:
+        fixtures, jobdir = os.path.join(td, "fixtures"), os.path.join(td, "job")
+        write_synthetic_fixtures(fixtures, videos=2, segments=5)
+        argv, stdin = sys.argv, sys.stdin
+        sys.argv = ["runner.py", "-", "--replay", fixtures, "--export", "ndjson", "--job-dir", jobdir]
+        sys.stdin = Stdin()
+        try:
+            main()
+        finally:
+            sys.argv, sys.stdin = argv, stdin
+        spool = os.path.join(jobdir, JOB_STDIN)
+        assert load_job_settings(jobdir)["inputs"] == [spool]
+        with open(spool, encoding="utf-8") as f:
+            assert f.read().split() == ["https://youtu.be/aaaaaaa1", "https://youtu.be/bbbbbbb2"]
+        with open(glob.glob(os.path.join(jobdir, "*.ndjson"))[0], encoding="utf-8") as f:
+            assert [json.loads(line)["videoId"] for line in f] == ["aaaaaaa1", "bbbbbbb2"]
+
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.caption_track import CaptionTrack
+from search.index import IndexWriter, TranscriptIndex, compact_index, decode_postings, encode_doc
+from search_index import build_index
+
+def _track(*texts):
+    return CaptionTrack.from_segments(
+        [{"start": i * 1.5, "end": i * 1.5 + 1.5, "text": t} for i, t in enumerate(texts)]
+    )
+
+def test_postings_round_trip_with_backwards_timestamps():
+    buf = bytearray()
+    encode_doc(buf, 3, [(0, 0, 5000), (4, 1, 4200), (9, 7, 900000)])
+    encode_doc(buf, 2, [(1, 0, 0)])
+    assert list(decode_postings(bytes(buf), 0, len(buf))) == [
+        (3, [(0, 0, 5000), (4, 1, 4200), (9, 7, 900000)]),
+        (5, [(1, 0, 0)]),
+    ]
+
+def test_term_and_phrase_queries_across_appends():
+    with tempfile.TemporaryDirectory() as td:
+        writer = IndexWriter(td)
+        writer.add("vid1", "en", _track("Hello world", "the quick brown", "fox jumps"))
+        writer.add("vid2", "en", _track("a brown fox", "hello again"))
+        writer.flush()
+        # A later job appends a segment; vid1 re-indexed there replaces its old copy
+        writer.add("vid3", "de", _track("Brown fox"))
+        writer.add("vid1", "en", _track("nothing here"))
+        writer.flush()
+
+        with TranscriptIndex(td) as index:
+            assert index.stats() == {"segments": 2, "docs": 3, "terms": 13}
+            assert [(h.video_id, h.segment, h.start_ms) for h in index.search("hello")] == [("vid2", 1, 1500)]
+            # Phrase spanning two caption segments of vid1 is gone with the old copy
+            assert index.search("brown fox") == [("vid2", "en", 0, 0), ("vid3", "de", 0, 0)]
+            assert index.search("fox brown") == []
+            assert len(index.search("brown fox", limit=1)) == 1
+
+        assert compact_index(td) == {"segments": 1, "docs": 3, "terms": 7}
+        with TranscriptIndex(td) as index:
+            assert [h.video_id for h in index.search("fox")] == ["vid2", "vid3"]
+            assert index.search("nothing here") == [("vid1", "en", 0, 0)]
+
+def test_frequent_flushes_merge_tiers_incrementally():
+    with tempfile.TemporaryDirectory() as td:
+        writer = IndexWriter(td, merge_factor=3)
+        counts = []
+        for i in range(40):
+            # A flush per item, as with a journal commit per item
+            writer.add(f"vid{i % 30}", "en", _track(f"item {i}", "shared words"))
+            writer.flush()
+            with TranscriptIndex(td) as index:
+                counts.append(index.stats()["segments"])
+        # 40 in base 3 is 1111: one segment in each of four tiers
+        assert counts[-1] == 4 and max(counts) <= 2 * 4
+        with TranscriptIndex(td) as index:
+            assert index.stats()["docs"] == 30
+            # vid5 was indexed again as item 35
+            assert index.search("item 5") == []
+            assert [h.video_id for h in index.search("item 35")] == ["vid5"]
+            assert [h.video_id for h in index.search("item 29")] == ["vid29"]
+            assert len(index.search("shared words")) == 30
+
+def test_build_from_ndjson_export():
+    rows = [
+        {"videoId": "v1", "language": "en", "captions": [{"start": 2.25, "end": 3, "text": "Good morning"}]},
+        {"videoId": "v2", "language": ["en", "es"], "captions": {
+            "en": {"array_with_timestamps": [{"start": 0, "end": 1, "text": "morning"}], "array": ["morning"]},
+            "es": {"array_with_timestamps": [{"start": 0.5, "end": 1, "text": "buenos dias"}], "array": ["x"]},
+        }},
+        {"videoId": "v3", "language": "en", "captions": ["no timestamps"]},
+    ]
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "out.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(json.dumps(r) for r in rows) + "\n")
+        counts = build_index(os.path.join(td, "idx"), [path])
+        assert counts == {"records": 3, "tracks": 3, "skipped": 1}
+        with TranscriptIndex(os.path.join(td, "idx")) as index:
+            assert index.search("morning") == [("v1", "en", 0, 2250), ("v2", "en", 0, 0)]
+            assert index.search("buenos DIAS") == [("v2", "es", 0, 500)]
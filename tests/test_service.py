@@ -0,0 +1,85 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.caption_track import CaptionTrack
+from pipeline.metrics import Metrics
+from service import TranscriptService, make_server
+
+class StubBackend:
+    """
+    Stands in for YouTubeClient: slow enough that concurrent requests overlap.
+    """
+
+    def __init__(self):
+        self.metrics = Metrics()
+        self.lock = threading.Lock()
+        self.fetches = 0
+
+    def video_metadata(self, video_id):
+        return {"title": f"T {video_id}"}
+
+    def fetch_captions(self, video_id, preferred_lang=None):
+        with self.lock:
+            self.fetches += 1
+        time.sleep(0.2)
+        return CaptionTrack.from_segments([{"start": 0.0, "end": 1.0, "text": video_id}]), "en", False
+
+    def listing_signature(self, video_id, refresh=False):
+        return "sig"
+
+def _request(path, payload):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(path)
+        f = s.makefile("rwb")
+        f.write((json.dumps(payload) + "\n").encode("utf-8"))
+        f.flush()
+        out = []
+        for line in f:
+            msg = json.loads(line)
+            out.append(msg)
+            if msg.get("done") or "error" in msg or "stats" in msg:
+                return out
+    return out
+
+def test_concurrent_jobs_share_one_fetch_per_video():
+    backend = StubBackend()
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "svc.sock")
+        server = make_server(TranscriptService(backend, workers=4), socket_path=path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            results = {}
+
+            def job(name, urls):
+                results[name] = _request(path, {"id": name, "urls": urls, "format": "array"})
+
+            threads = [
+                threading.Thread(target=job, args=("a", ["https://youtu.be/vid0001", "https://youtu.be/vid0002"])),
+                threading.Thread(target=job, args=("b", ["https://www.youtube.com/watch?v=vid0001"])),
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            bad = _request(path, {"id": "c", "urls": "nope"})
+            stats = _request(path, {"op": "stats"})
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    assert backend.fetches == 2
+    assert [m["item"]["captions"] for m in results["a"][:-1]] == [["vid0001"], ["vid0002"]]
+    assert results["a"][-1] == {"id": "a", "done": True, "count": 2}
+    only_b = results["b"][0]["item"]
+    assert only_b["videoUrl"] == "https://www.youtube.com/watch?v=vid0001" and only_b["inputIndex"] == 0
+    assert bad == [{"id": "c", "error": "urls must be a list of strings"}]
+    assert stats[0]["stats"]["counters"]["coalesced"] == {"total": 1}
@@ -0,0 +1,47 @@
+import os
+import sys
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.sources import FixtureExtractor, expand_sources, is_collection_url
+
+PLAYLIST = "https://www.youtube.com/playlist?list=PL123"
+CHANNEL = "https://www.youtube.com/@someone"
+VIDEOS_TAB = "https://www.youtube.com/@someone/videos"
+
+def _video(vid):
+    return {"_type": "url", "ie_key": "Youtube", "id": vid, "url": f"https://www.youtube.com/watch?v={vid}"}
+
+FIXTURE = {
+    PLAYLIST: [[_video("vid0001"), _video("vid0002")], [_video("vid0003")]],
+    CHANNEL: [[{"_type": "url", "ie_key": "YoutubeTab", "url": VIDEOS_TAB}]],
+    VIDEOS_TAB: [[_video("vid0003"), {"_type": "url", "id": "vid0004", "url": "vid0004"}]],
+}
+
+def test_collection_urls():
+    assert is_collection_url(PLAYLIST) and is_collection_url(CHANNEL)
+    assert is_collection_url("https://www.youtube.com/channel/UCabc/videos")
+    assert not is_collection_url("https://www.youtube.com/watch?v=vid0001&list=PL123")
+    assert not is_collection_url("not a url")
+
+def test_expansion_is_lazy_and_drops_duplicates():
+    extractor = FixtureExtractor(FIXTURE)
+    urls = expand_sources(
+        ["https://youtu.be/vid0002", PLAYLIST, CHANNEL, "not a url", "https://www.youtube.com/watch?v=vid0004"],
+        extractor,
+    )
+    assert next(urls) == "https://youtu.be/vid0002"
+    assert next(urls) == "https://www.youtube.com/watch?v=vid0001"
+    # Only the first page has been fetched so far
+    assert extractor.fetched == [(PLAYLIST, 0)]
+    assert list(urls) == [
+        "https://www.youtube.com/watch?v=vid0003",
+        "https://www.youtube.com/watch?v=vid0004",
+        "not a url",
+    ]
+    assert extractor.fetched == [(PLAYLIST, 0), (PLAYLIST, 1), (CHANNEL, 0), (VIDEOS_TAB, 0)]
+
+def test_failed_expansion_passes_the_url_through():
+    missing = "https://www.youtube.com/playlist?list=PLgone"
+    assert list(expand_sources([missing], FixtureExtractor({}))) == [missing]
@@ -0,0 +1,114 @@
+import os
+import sys
+import tempfile
+
+# Allow running tests directly from repo root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from extractors.rate_limit import PERMANENT, THROTTLED, TRANSIENT, classify_error
+from extractors.transport import RecordingTransport, ReplayTransport, write_synthetic_fixtures
+from extractors.youtube_client import YouTubeClient
+from runner import process_url
+
+class TranscriptsDisabled(Exception):
+    pass
+
+class FakeTranscript:
+    def __init__(self, language_code, is_generated, raw):
+        self.language_code = language_code
+        self.is_generated = is_generated
+        self.raw = raw
+
+    def fetch(self):
+        if self.raw is None:
+            raise TranscriptsDisabled("no captions here")
+        return self.raw
+
+class FakeUpstream:
+    def __init__(self):
+        self.calls = []
+
+    def list_transcripts(self, video_id):
+        self.calls.append(("list", video_id))
+        raw = None if video_id == "disabled1" else [{"text": "hello there", "start": 0.0, "duration": 1.5}]
+        return [FakeTranscript("es", True, raw), FakeTranscript("en", False, raw)]
+
+    def video_info(self, video_id):
+        self.calls.append(("info", video_id))
+        return {"title": "Title " + video_id, "uploader": "U", "duration": 2, "upload_date": "20240102"}
+
+    def extract_flat(self, url):
+        self.calls.append(("flat", url))
+        return {"_type": "playlist", "entries": iter([{"id": "aaaaaaa1"}, {"id": "bbbbbbb2"}])}
+
+    def close(self):
+        pass
+
+def _run(yt, video_id, **kwargs):
+    return process_url(yt, f"https://youtu.be/{video_id}", formats=["array"], language="en", **kwargs)
+
+def test_record_then_replay_gives_the_same_items():
+    with tempfile.TemporaryDirectory() as td:
+        upstream = FakeUpstream()
+        live = YouTubeClient(transport=RecordingTransport(upstream, td))
+        recorded = [_run(live, vid)[0] for vid in ("aaaaaaa1", "disabled1")]
+        assert list(live.flat_entries("https://www.youtube.com/playlist?list=PL1")) == [
+            {"id": "aaaaaaa1"},
+            {"id": "bbbbbbb2"},
+        ]
+        live.close()
+
+        replay = YouTubeClient(transport=ReplayTransport(td))
+        replayed = [_run(replay, vid)[0] for vid in ("aaaaaaa1", "disabled1")]
+        entries = list(replay.flat_entries("https://www.youtube.com/playlist?list=PL1"))
+        replay.close()
+
+    for a, b in zip(recorded, replayed):
+        a.pop("createdAt")
+        b.pop("createdAt")
+        assert a == b
+    assert replayed[0]["title"] == "Title aaaaaaa1"
+    assert replayed[0]["captions"] == ["hello there"]
+    assert replayed[0]["language"] == "en" and replayed[0]["hasAutoCaptions"] is False
+    # The recorded error comes back under its own name, so it classifies alike
+    assert replayed[1]["error"] == "no captions here"
+    assert replayed[1]["errorKind"] == PERMANENT
+    assert entries == [{"id": "aaaaaaa1"}, {"id": "bbbbbbb2"}]
+
+def test_replay_serves_unknown_videos_from_templates_with_injected_failures():
+    slept = []
+    with tempfile.TemporaryDirectory() as td:
+        ids = write_synthetic_fixtures(td, videos=3, segments=50, languages=("en", "de"))
+        replay = ReplayTransport(td, latency=0.2, seed=1, sleep=slept.append)
+        info = replay.video_info("zzzzzzz9")
+        assert info["id"] == "zzzzzzz9" and info["title"].startswith("Synthetic video")
+        # Stable: the same unknown id always maps to the same recording
+        assert replay.video_info("zzzzzzz9")["title"] == info["title"]
+        listing = replay.list_transcripts(ids[0])
+        assert [(t.language_code, t.is_generated) for t in listing] == [("en", False), ("de", True)]
+        assert len(listing[1].fetch()) == 50
+        assert len(slept) == 4 and all(0.1 <= s <= 0.3 for s in slept)
+
+        flaky = ReplayTransport(td, error_rate=0.5, throttle_rate=0.2, seed=7)
+        kinds = []
+        for _ in range(200):
+            try:
+                flaky.video_info(ids[0])
+                kinds.append(None)
+            except Exception as e:  # noqa: BLE001
+                kinds.append(classify_error(e))
+    assert {THROTTLED, TRANSIENT, None} == set(kinds)
+    assert 20 <= kinds.count(THROTTLED) <= 60
+    assert 80 <= kinds.count(TRANSIENT) <= 120
+
+def test_refetch_after_a_refresh_check_reuses_its_listing():
+    upstream = FakeUpstream()
+    yt = YouTubeClient(transport=upstream)
+    assert yt.listing_signature("aaaaaaa1", refresh=True) is not None
+    track, lang, auto = yt.fetch_captions("aaaaaaa1", "en")
+    assert list(track.texts()) == ["hello there"] and lang == "en" and auto is False
+    assert upstream.calls.count(("list", "aaaaaaa1")) == 1
+    # The kept listing is used once: a later fetch lists upstream again
+    yt.fetch_captions("aaaaaaa1", "en")
+    assert upstream.calls.count(("list", "aaaaaaa1")) == 2
+    yt.close()